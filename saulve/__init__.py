@@ -1,4 +1,59 @@
-from .app import App
-from .puzzle import Puzzle, solved, with_input
+"""Saulve, a framework for computer programming challenges.
 
-__all__ = ['App', 'Puzzle', 'solved', 'with_input']
+Attributes are imported on first access, so that importing a saulve
+submodule, such as the command line interface, does not import the whole
+package.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .app import App
+    from .puzzle import (
+        Puzzle,
+        budget,
+        limits,
+        solved,
+        with_input,
+        with_input_file,
+        with_inputs,
+    )
+
+__all__ = [
+    'App',
+    'Puzzle',
+    'budget',
+    'limits',
+    'solved',
+    'with_input',
+    'with_input_file',
+    'with_inputs',
+]
+
+# Module defining each public attribute
+_ATTRIBUTE_MODULES = {
+    'App': '.app',
+    'Puzzle': '.puzzle',
+    'budget': '.puzzle',
+    'limits': '.puzzle',
+    'solved': '.puzzle',
+    'with_input': '.puzzle',
+    'with_input_file': '.puzzle',
+    'with_inputs': '.puzzle',
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _ATTRIBUTE_MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    module = importlib.import_module(_ATTRIBUTE_MODULES[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -1,46 +1,119 @@
 import sys
 
 from .challenges.base import Challenge, ChallengeLoader
-from .errors import ChallengeNotFound, SaulveError
+from .errors import (
+    ChallengeNotFound,
+    ModuleImportError,
+    SaulveError,
+    ValidationError,
+    WrongAttributeType,
+)
 from .import_module import append_module_path, import_instance
 
 __all__ = ['App', 'import_app']
 
 
+def parse_reference(reference: str) -> tuple[str, str]:
+    """Split a reference to a module attribute, either written as
+    'package.module:attribute' or 'package.module.attribute'.
+
+    Returns:
+        The module name and the attribute name.
+
+    Raises:
+        ValidationError: If the reference is malformed.
+    """
+    if ':' in reference:
+        module_name, _, attr = reference.partition(':')
+    else:
+        module_name, _, attr = reference.rpartition('.')
+
+    if not module_name or not attr.isidentifier() or not all(
+        part.isidentifier() for part in module_name.split('.')
+    ):
+        raise ValidationError(f"'{reference}' is not a valid reference.")
+
+    return module_name, attr
+
+
 class App:
+    """Holds the challenges of an application.
+
+    Attributes:
+        loaders: Registered challenge loaders, or references to loaders not
+            imported yet, by challenge id.
+    """
+
     def __init__(self) -> None:
-        self.loaders: dict[str, ChallengeLoader] = {}
+        self.loaders: dict[str, ChallengeLoader | str] = {}
 
     def register_challenge(
         self,
         challenge_id: str,
-        loader: ChallengeLoader,
+        loader: ChallengeLoader | str,
     ) -> None:
         """
+        Arguments:
+            challenge_id: Id of the challenge.
+            loader: The challenge loader, or a reference to it written as
+                'package.module:attribute'. A referenced loader is only
+                imported when its challenge is used, keeping unused
+                challenges out of the application startup.
+
         Raises:
             SaulveError: If a challenge is already registered with the given
                 id.
+            ValidationError: If the loader reference is malformed.
         """
         if challenge_id in self.loaders:
             raise SaulveError(
                 f"A challenge with id '{challenge_id} is already registered."
             )
 
+        if isinstance(loader, str):
+            parse_reference(loader)
+
         self.loaders[challenge_id] = loader
 
-    def get_challenge(self, challenge_id: str) -> Challenge:
+    def get_loader(self, challenge_id: str) -> ChallengeLoader:
         """
         Raises:
             ChallengeNotFound: If no challenge with this id exist.
+            ModuleImportError: If a referenced loader can't be imported.
         """
         try:
-            challenge = self.loaders[challenge_id]
+            loader = self.loaders[challenge_id]
         except KeyError as e:
             raise ChallengeNotFound(
                 f"No challenge exists with id {challenge_id}"
             ) from e
 
-        return challenge.load()
+        if isinstance(loader, str):
+            loader = self._import_loader(loader)
+            self.loaders[challenge_id] = loader
+
+        return loader
+
+    @staticmethod
+    def _import_loader(reference: str) -> ChallengeLoader:
+        module_name, attr = parse_reference(reference)
+        try:
+            loader = import_instance(module_name, attr, object)
+        except ImportError as e:
+            raise ModuleImportError(
+                f'Could not import loader {reference}: {e}'
+            ) from e
+        if not isinstance(loader, ChallengeLoader):
+            raise WrongAttributeType(reference, ChallengeLoader)
+
+        return loader
+
+    def get_challenge(self, challenge_id: str) -> Challenge:
+        """
+        Raises:
+            ChallengeNotFound: If no challenge with this id exist.
+        """
+        return self.get_loader(challenge_id).load()
 
 
 def import_app(app_module_name: str) -> App:
@@ -0,0 +1,236 @@
+"""Benchmark puzzle solution steps.
+
+Each step of a puzzle is run several times after some warmup rounds.
+Results can be saved as a JSON baseline, later runs being compared against
+it to detect performance regressions.
+"""
+
+import gc
+import json
+import math
+import statistics
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple
+
+from .errors import SaulveError
+from .puzzle.core import Puzzle, PuzzleSolution, PuzzleStep, StepStatus
+
+__all__ = [
+    'Regression',
+    'StepBenchmark',
+    'benchmark_puzzle',
+    'benchmark_step',
+    'compare_to_baseline',
+    'load_baseline',
+    'save_baseline',
+]
+
+# Bumped each time the baseline file format changes
+BASELINE_VERSION = 1
+
+
+class StepBenchmark(NamedTuple):
+    """Timings of the repeated runs of a solution step.
+
+    Attributes:
+        step: Index of the step in its puzzle, starting from 0.
+        times: Wall time of each timed run, in seconds.
+    """
+    step: int
+    times: list[float]
+
+    @property
+    def min(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def p95(self) -> float:
+        """95th percentile, using the nearest rank method."""
+        ordered = sorted(self.times)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    @property
+    def stddev(self) -> float:
+        if len(self.times) < 2:
+            return 0.0
+        return statistics.stdev(self.times)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            'min': self.min,
+            'median': self.median,
+            'p95': self.p95,
+            'stddev': self.stddev,
+        }
+
+
+class Regression(NamedTuple):
+    """A step whose median time is slower than its baseline."""
+    step: int
+    median: float
+    baseline: float
+
+    @property
+    def ratio(self) -> float:
+        if self.baseline == 0:
+            return math.inf
+        return self.median / self.baseline
+
+
+@contextmanager
+def _gc_disabled() -> Iterator[None]:
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _check_run(solution: PuzzleSolution, index: int) -> float:
+    """Get the wall time of a step run.
+
+    Raises:
+        SaulveError: If the step did not run to its end.
+    """
+    if (
+        solution.status not in (StepStatus.COMPLETED, StepStatus.OVER_BUDGET)
+        or solution.metrics is None
+    ):
+        raise SaulveError(
+            f'Step {index + 1} can not be benchmarked, it '
+            f'{solution.status.value}.'
+        )
+
+    return solution.metrics.wall_time
+
+
+def benchmark_step(
+    step: PuzzleStep,
+    index: int,
+    repeat: int = 5,
+    warmup: int = 1,
+    disable_gc: bool = True,
+) -> StepBenchmark:
+    """Run a solution step several times and collect its timings.
+
+    Arguments:
+        step: The step to benchmark.
+        index: Index of the step in its puzzle.
+        repeat: Number of timed runs.
+        warmup: Number of runs done before timing the step.
+        disable_gc: Disable the garbage collector during timed runs. A full
+            collection is done before each run.
+
+    Raises:
+        SaulveError: If a run of the step exceeded its limits.
+    """
+    for _ in range(warmup):
+        _check_run(step.run_step(), index)
+
+    times = []
+    for _ in range(repeat):
+        if disable_gc:
+            gc.collect()
+            with _gc_disabled():
+                solution = step.run_step()
+        else:
+            solution = step.run_step()
+
+        times.append(_check_run(solution, index))
+
+    return StepBenchmark(index, times)
+
+
+def benchmark_puzzle(
+    puzzle: Puzzle,
+    repeat: int = 5,
+    warmup: int = 1,
+    disable_gc: bool = True,
+) -> list[StepBenchmark]:
+    """Benchmark every solution step of a puzzle.
+
+    See `benchmark_step` for arguments details.
+    """
+    if repeat < 1:
+        raise ValueError('At least one timed run is required.')
+
+    return [
+        benchmark_step(step, index, repeat, warmup, disable_gc)
+        for index, step in enumerate(puzzle.steps)
+    ]
+
+
+def load_baseline(path: Path) -> dict[str, list[dict[str, float]]]:
+    """Read benchmark summaries from a baseline file, by puzzle id.
+
+    Raises:
+        SaulveError: If the file is not a valid baseline.
+    """
+    try:
+        content = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        raise SaulveError(f'Could not read baseline {path}: {e}') from e
+
+    if (
+        not isinstance(content, dict)
+        or content.get('version') != BASELINE_VERSION
+        or not isinstance(content.get('puzzles'), dict)
+    ):
+        raise SaulveError(f'{path} is not a supported baseline file.')
+
+    puzzles: dict[str, list[dict[str, float]]] = content['puzzles']
+    return puzzles
+
+
+def save_baseline(
+    path: Path,
+    puzzle_id: str,
+    benchmarks: list[StepBenchmark],
+) -> None:
+    """Save a puzzle benchmark summary in a baseline file.
+
+    Other puzzles already saved in the file are kept.
+    """
+    puzzles: dict[str, Any] = {}
+    if path.exists():
+        puzzles = load_baseline(path)
+
+    puzzles[puzzle_id] = [benchmark.summary() for benchmark in benchmarks]
+
+    path.write_text(
+        json.dumps({'version': BASELINE_VERSION, 'puzzles': puzzles}),
+        encoding='utf-8',
+    )
+
+
+def compare_to_baseline(
+    benchmarks: list[StepBenchmark],
+    baseline: list[dict[str, float]],
+    threshold: float = 0.1,
+) -> list[Regression]:
+    """Find steps whose median time regressed against a baseline.
+
+    Arguments:
+        benchmarks: Benchmarks of a puzzle steps.
+        baseline: Benchmark summaries of the same puzzle steps.
+        threshold: Relative slowdown above which a step is considered as
+            regressed (0.1 means 10% slower).
+    """
+    regressions = []
+
+    for benchmark, reference in zip(benchmarks, baseline, strict=False):
+        if benchmark.median > reference['median'] * (1 + threshold):
+            regressions.append(Regression(
+                benchmark.step,
+                benchmark.median,
+                reference['median'],
+            ))
+
+    return regressions
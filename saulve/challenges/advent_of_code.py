@@ -4,13 +4,20 @@
 import re
 import types
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 from saulve import Puzzle
-from saulve.errors import PuzzleNotFound, ValidationError
+from saulve.errors import MissingAttribute, PuzzleNotFound, ValidationError
 from saulve.import_module import import_instance
 
 from .base import Challenge, ChallengeLoader, PuzzleView
+from .discovery import (
+    LazyPuzzle,
+    discover_puzzle,
+    puzzle_view,
+    resolve_puzzle,
+)
+from .manifest import DiscoveryManifest, list_directory
 
 YEAR_REGEX = re.compile(r'^year_(?P<year>\d{4})$')
 PUZZLE_REGEX = re.compile(r'^day_(?P<day>\d{1,2})\.py$')
@@ -19,58 +26,145 @@ PUZZLE_REGEX = re.compile(r'^day_(?P<day>\d{1,2})\.py$')
 class AdventOfCodePuzzle(NamedTuple):
     year: int
     day: int
-    puzzle: Puzzle
+    puzzle: Puzzle | LazyPuzzle
 
     def __repr__(self) -> str:
         return f'<{self.__class__}: {self.year}-{self.day:02}>'
 
 
+def parse_puzzle_id(*args: str) -> tuple[int, int]:
+    """Get the year and day of a puzzle from its id.
+
+    Raises:
+        ValidationError: If the id is not a valid year and day.
+    """
+    if len(args) != 2:
+        raise ValidationError('YEAR and DAY expected.')
+
+    try:
+        year = int(args[0])
+    except ValueError as e:
+        raise ValidationError(f"'{args[0]} is not a valid year.") from e
+
+    try:
+        day = int(args[1])
+    except ValueError as e:
+        raise ValidationError(f"'{args[1]} is not a valid day.") from e
+
+    return year, day
+
+
 class Calendar(Challenge):
+    """Advent of code puzzles, indexed by year and day.
+
+    Puzzles are kept sorted by year and day.
+    """
+
     def __init__(self, puzzles: list[AdventOfCodePuzzle]) -> None:
-        self.puzzles = puzzles
+        self._index: dict[tuple[int, int], AdventOfCodePuzzle] = {}
+        for puzzle in puzzles:
+            self._index.setdefault((puzzle.year, puzzle.day), puzzle)
+
+        self.puzzles = [self._index[key] for key in sorted(self._index)]
 
     def find(self) -> list[PuzzleView]:
         return [
-            PuzzleView(
-                id=f'{puzzle.year} {puzzle.day:02}',
-                name=puzzle.puzzle.name,
+            puzzle_view(
+                f'{puzzle.year} {puzzle.day:02}',
+                puzzle.puzzle,
+                puzzle.year,
+                puzzle.day,
             )
             for puzzle in self.puzzles
         ]
 
     def get(self, *args: str) -> Puzzle:
-        if len(args) != 2:
-            raise ValidationError('YEAR and DAY expected.')
-
-        try:
-            year = int(args[0])
-        except ValueError as e:
-            raise ValidationError(f"'{args[0]} is not a valid year.") from e
+        year, day = parse_puzzle_id(*args)
 
         try:
-            day = int(args[1])
-        except ValueError as e:
-            raise ValidationError(f"'{args[1]} is not a valid day.") from e
-
-        for puzzle in self.puzzles:
-            if puzzle.year == year and puzzle.day == day:
-                return puzzle.puzzle
+            puzzle = self._index[(year, day)]
+        except KeyError as e:
+            raise PuzzleNotFound(f'Puzzle {year} {day:02} not found.') from e
 
-        raise PuzzleNotFound(f'Puzzle {year} {day:02} not found.')
+        return resolve_puzzle(puzzle.puzzle)
 
 
 class AdventOfCodeLoader(ChallengeLoader):
-    def __init__(self, challenge_module: types.ModuleType) -> None:
+    def __init__(
+        self,
+        challenge_module: types.ModuleType,
+        lazy: bool = False,
+        cache: bool = True,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
+        """
+        Arguments:
+            challenge_module: The module to load puzzle from
+            lazy: If set, puzzle modules are statically scanned and only
+                imported when their puzzle is requested.
+            cache: If set, lazy discovery results are kept in an on disk
+                manifest so that only modified files are scanned again.
+            cache_dir: Where to store the discovery manifest. Defaults to
+                the challenge package __pycache__ directory.
+        """
         self.challenge_module = challenge_module
+        self.lazy = lazy
+        self.cache = cache
+        self.cache_dir = cache_dir
+
+    def _load_puzzle(
+        self,
+        puzzle_module: str,
+        path: Path,
+        manifest: Optional[DiscoveryManifest],
+    ) -> Puzzle | LazyPuzzle:
+        if not self.lazy:
+            return import_instance(puzzle_module, 'puzzle', Puzzle)
+
+        puzzle = discover_puzzle(puzzle_module, path, manifest)
+        if puzzle is None:
+            raise MissingAttribute(puzzle_module, 'puzzle')
+
+        return puzzle
+
+    @property
+    def challenge_path(self) -> Path:
+        assert self.challenge_module.__file__ is not None
+        return Path(self.challenge_module.__file__).parent
+
+    def load_one(self, *args: str) -> Puzzle:
+        year, day = parse_puzzle_id(*args)
+        year_dir = self.challenge_path / f'year_{year:04}'
+
+        for day_name in dict.fromkeys([f'day_{day:02}', f'day_{day}']):
+            if (year_dir / f'{day_name}.py').is_file():
+                return import_instance(
+                    '.'.join([
+                        self.challenge_module.__name__,
+                        year_dir.name,
+                        day_name,
+                    ]),
+                    'puzzle',
+                    Puzzle,
+                )
+
+        raise PuzzleNotFound(f'Puzzle {year} {day:02} not found.')
 
     def load(self) -> Challenge:
         puzzles: list[AdventOfCodePuzzle] = []
 
-        assert self.challenge_module.__file__ is not None
-        challenge_path = Path(self.challenge_module.__file__).parent
+        challenge_path = self.challenge_path
 
-        for year_dir in challenge_path.iterdir():
-            if not year_dir.is_dir():
+        manifest = None
+        if self.lazy and self.cache:
+            manifest = DiscoveryManifest.for_package(
+                challenge_path,
+                self.challenge_module.__name__,
+                self.cache_dir,
+            )
+
+        for year_dir in list_directory(challenge_path, manifest):
+            if not year_dir.is_dir:
                 continue
 
             if (m := YEAR_REGEX.match(year_dir.name)) is None:
@@ -78,8 +172,8 @@ class AdventOfCodeLoader(ChallengeLoader):
 
             year = int(m.group('year'))
 
-            for day_file in year_dir.iterdir():
-                if not day_file.is_file():
+            for day_file in list_directory(year_dir.path, manifest):
+                if day_file.is_dir:
                     continue
 
                 if (m := PUZZLE_REGEX.match(day_file.name)) is None:
@@ -90,10 +184,17 @@ class AdventOfCodeLoader(ChallengeLoader):
                 puzzle_module = '.'.join([
                     self.challenge_module.__name__,
                     year_dir.name,
-                    day_file.with_suffix('').name,
+                    day_file.path.stem,
                 ])
-                puzzle = import_instance(puzzle_module, 'puzzle', Puzzle)
+                puzzle = self._load_puzzle(
+                    puzzle_module,
+                    day_file.path,
+                    manifest,
+                )
 
                 puzzles.append(AdventOfCodePuzzle(year, day, puzzle))
 
+        if manifest is not None:
+            manifest.save()
+
         return Calendar(puzzles)
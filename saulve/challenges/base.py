@@ -1,12 +1,39 @@
-from typing import NamedTuple, Protocol
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    NamedTuple,
+    Optional,
+    Protocol,
+    runtime_checkable,
+)
 
-from ..puzzle import Puzzle
+if TYPE_CHECKING:
+    from ..puzzle import Puzzle
 
 
 class PuzzleView(NamedTuple):
-    """A representation of a puzzle for display purpose."""
+    """A representation of a puzzle for display and filtering purpose.
+
+    Metadata are None when unknown to the challenge.
+
+    Attributes:
+        id: Id of the puzzle, its words separated with spaces.
+        name: The puzzle name.
+        year: Year of the puzzle, for calendar challenges.
+        day: Day of the puzzle, for calendar challenges.
+        steps: Number of solution steps.
+        solved_steps: Number of steps declaring their expected answer.
+        has_budget: Whether a step declares a budget.
+        answers: Expected answer of each step, None if it is unknown.
+    """
     id: str
     name: str
+    year: Optional[int] = None
+    day: Optional[int] = None
+    steps: Optional[int] = None
+    solved_steps: Optional[int] = None
+    has_budget: Optional[bool] = None
+    answers: Optional[tuple[Optional[str], ...]] = None
 
 
 class Challenge(Protocol):
@@ -16,7 +43,7 @@ class Challenge(Protocol):
     def find(self) -> list[PuzzleView]:
         """Get all known puzzles"""
 
-    def get(self, *args: str) -> Puzzle:
+    def get(self, *args: str) -> 'Puzzle':
         """Get a single puzzle.
 
         Arguments:
@@ -29,6 +56,32 @@ class Challenge(Protocol):
         """
 
 
+@runtime_checkable
 class ChallengeLoader(Protocol):
+    """Loads a challenge.
+
+    Loaders may also have a `load_one(*args)` method, loading a single
+    puzzle without loading the whole challenge. See `load_one`.
+    """
+
     def load(self) -> Challenge:
         ...
+
+
+def load_one(loader: ChallengeLoader, *args: str) -> 'Puzzle':
+    """Load a single puzzle, with the `load_one` method of the loader if it
+    has one, or by loading the whole challenge.
+
+    Arguments:
+        loader: The challenge loader.
+        *args (str): Id of the puzzle, as given to `Challenge.get`.
+
+    Raises:
+        PuzzleNotFound: If no puzzle exists for the given id
+        ValidationError: If the argument aren't valid for puzzle selection
+    """
+    load: Optional[Callable[..., 'Puzzle']] = getattr(loader, 'load_one', None)
+    if load is None:
+        return loader.load().get(*args)
+
+    return load(*args)
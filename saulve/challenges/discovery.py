@@ -0,0 +1,578 @@
+"""Import free puzzle discovery.
+
+Puzzle modules are statically scanned to find their puzzle name without
+executing them. The module is only imported when its puzzle is actually
+needed.
+"""
+
+import ast
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from saulve.errors import MissingAttribute
+from saulve.import_module import import_instance
+from saulve.puzzle import Puzzle
+from saulve.puzzle.decorators import get_step_budget, get_step_solutions
+
+from .base import PuzzleView
+
+if TYPE_CHECKING:
+    from .manifest import DiscoveryManifest
+
+__all__ = [
+    'LazyPuzzle',
+    'ModuleScan',
+    'PuzzleInfo',
+    'discover_puzzle',
+    'puzzle_info',
+    'puzzle_view',
+    'resolve_puzzle',
+    'scan_module',
+    'scan_puzzle',
+    'scan_puzzle_name',
+]
+
+# Name of the module attribute holding the puzzle instance
+PUZZLE_ATTRIBUTE = 'puzzle'
+
+
+class NotStaticallyResolvable(Exception):
+    """Raised when a puzzle module cannot be understood without importing
+    it.
+    """
+
+
+def _bound_name(node: ast.AST) -> Optional[str]:
+    """Returns the name bound by a node, if any."""
+    if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+        return node.id
+
+    if isinstance(node, ast.alias):
+        return node.asname or node.name.split('.')[0]
+
+    if isinstance(
+        node,
+        (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef),
+    ):
+        return node.name
+
+    return None
+
+
+def _binds_puzzle(node: ast.AST) -> bool:
+    """Check if any statement in the node may bind the puzzle attribute."""
+    return any(
+        _bound_name(child) in (PUZZLE_ATTRIBUTE, '*')
+        for child in ast.walk(node)
+    )
+
+
+def _puzzle_assignment(stmt: ast.stmt) -> Optional[ast.expr]:
+    """Returns the assigned value if the statement is a plain
+    `puzzle = ...` assignment.
+    """
+    if isinstance(stmt, ast.Assign):
+        if (
+            len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Name)
+            and stmt.targets[0].id == PUZZLE_ATTRIBUTE
+        ):
+            return stmt.value
+    elif isinstance(stmt, ast.AnnAssign):
+        if (
+            isinstance(stmt.target, ast.Name)
+            and stmt.target.id == PUZZLE_ATTRIBUTE
+        ):
+            return stmt.value
+
+    return None
+
+
+def _static_puzzle_name(value: ast.expr) -> str:
+    """Extracts the name of a `Puzzle(name='...')` call.
+
+    Raises:
+        NotStaticallyResolvable: If the expression is not a Puzzle instanciation
+            with a literal name.
+    """
+    if not isinstance(value, ast.Call):
+        raise NotStaticallyResolvable()
+
+    func = value.func
+    if isinstance(func, ast.Name):
+        func_name = func.id
+    elif isinstance(func, ast.Attribute):
+        func_name = func.attr
+    else:
+        raise NotStaticallyResolvable()
+
+    if func_name != Puzzle.__name__:
+        raise NotStaticallyResolvable()
+
+    name_node: Optional[ast.expr] = None
+    if value.args:
+        name_node = value.args[0]
+    for keyword in value.keywords:
+        if keyword.arg == 'name':
+            name_node = keyword.value
+
+    if not (
+        isinstance(name_node, ast.Constant)
+        and isinstance(name_node.value, str)
+    ):
+        raise NotStaticallyResolvable()
+
+    return name_node.value
+
+
+def _is_solution_decorator(node: ast.AST) -> bool:
+    """Check if a node is the `puzzle.solution` attribute."""
+    return (
+        isinstance(node, ast.Attribute)
+        and node.attr == 'solution'
+        and isinstance(node.value, ast.Name)
+        and node.value.id == PUZZLE_ATTRIBUTE
+    )
+
+
+def _decorator_name(node: ast.expr) -> Optional[str]:
+    """Get the name of a decorator factory call, such as 'solved' for
+    `saulve.solved(12)`.
+    """
+    if not isinstance(node, ast.Call):
+        return None
+
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+
+    return None
+
+
+def _argument(
+    call: ast.Call,
+    position: int,
+    name: str,
+) -> Optional[ast.expr]:
+    for keyword in call.keywords:
+        if keyword.arg == name:
+            return keyword.value
+
+    return call.args[position] if len(call.args) > position else None
+
+
+def _literal_dict(node: ast.expr) -> dict[str, ast.expr]:
+    """Get the values of a dict literal having string keys.
+
+    Raises:
+        NotStaticallyResolvable: If the node is not a dict literal with
+            string keys.
+    """
+    if not isinstance(node, ast.Dict):
+        raise NotStaticallyResolvable()
+
+    items: dict[str, ast.expr] = {}
+    for key, value in zip(node.keys, node.values, strict=True):
+        if not (isinstance(key, ast.Constant) and isinstance(key.value, str)):
+            raise NotStaticallyResolvable()
+        items[key.value] = value
+
+    return items
+
+
+def _literal_answer(node: ast.expr) -> Optional[str]:
+    """Get an expected answer, as displayed once solved, if it is given as a
+    literal.
+    """
+    try:
+        answer = ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return None
+
+    if not isinstance(answer, (int, str)):
+        return None
+
+    return str(answer)
+
+
+class StepsInfo(NamedTuple):
+    """Solution steps statically found in a module.
+
+    Attributes:
+        steps: Number of steps.
+        solved_steps: Number of steps declaring their expected answer.
+        has_budget: Whether a step declares a budget.
+        answers: Expected answer of each step, None if it is not declared or
+            not given as a literal.
+    """
+    steps: int = 0
+    solved_steps: int = 0
+    has_budget: bool = False
+    answers: tuple[Optional[str], ...] = ()
+
+    def __add__(self, other: tuple) -> 'StepsInfo':
+        assert isinstance(other, StepsInfo)
+        return StepsInfo(
+            self.steps + other.steps,
+            self.solved_steps + other.solved_steps,
+            self.has_budget or other.has_budget,
+            self.answers + other.answers,
+        )
+
+
+def _scan_step(decorators: list[ast.expr]) -> StepsInfo:
+    """Get the steps registered for a solution function, from the
+    decorators applied to it.
+
+    Raises:
+        NotStaticallyResolvable: If the registered steps can't be counted
+            without executing the module.
+    """
+    names = [_decorator_name(decorator) for decorator in decorators]
+    has_budget = 'budget' in names
+
+    # Outermost decorators are checked first, as by get_step_solutions
+    solved = [
+        decorator
+        for decorator, name in zip(decorators, names, strict=True)
+        if name == 'solved'
+    ]
+    is_solved = bool(solved)
+    answer: Optional[str] = None
+    if solved:
+        assert isinstance(solved[0], ast.Call)
+        expected = _argument(solved[0], 0, 'solution')
+        answer = None if expected is None else _literal_answer(expected)
+
+    cases = [
+        decorator
+        for decorator, name in zip(decorators, names, strict=True)
+        if name == 'with_inputs'
+    ]
+    if not cases:
+        return StepsInfo(1, int(is_solved), has_budget, (answer,))
+
+    call, = cases
+    assert isinstance(call, ast.Call)
+    inputs = _argument(call, 0, 'inputs')
+    solutions = _argument(call, 1, 'solutions')
+    if inputs is None:
+        raise NotStaticallyResolvable()
+
+    case_names = list(_literal_dict(inputs))
+    case_solutions = {} if solutions is None else _literal_dict(solutions)
+    answers = tuple(
+        _literal_answer(case_solutions[name])
+        if name in case_solutions else answer
+        for name in case_names
+    )
+    solved_steps = sum(
+        is_solved or name in case_solutions for name in case_names
+    )
+
+    return StepsInfo(len(case_names), solved_steps, has_budget, answers)
+
+
+def _solution_call_decorators(call: ast.Call) -> list[ast.expr]:
+    """Get the decorators applied to the function registered by a
+    `puzzle.solution(...)` call, such as `solved(12)` in
+    `puzzle.solution(solved(12)(fn))`.
+    """
+    decorators: list[ast.expr] = []
+    node = call.args[0] if call.args else None
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Call):
+        decorators.append(node.func)
+        node = node.args[0] if node.args else None
+
+    return decorators
+
+
+def _count_steps(stmt: ast.stmt) -> StepsInfo:
+    """Count the solution steps registered by a top level statement.
+
+    Raises:
+        NotStaticallyResolvable: If steps are registered in a way that can't
+            be counted without executing the module.
+    """
+    registrations = sum(
+        _is_solution_decorator(node) for node in ast.walk(stmt)
+    )
+
+    info = StepsInfo()
+    decorating = 0
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        for index, decorator in enumerate(stmt.decorator_list):
+            if _is_solution_decorator(decorator):
+                decorating += 1
+                # Only decorators below puzzle.solution apply to the step
+                info += _scan_step(stmt.decorator_list[index + 1:])
+    elif (
+        isinstance(stmt, ast.Expr)
+        and isinstance(stmt.value, ast.Call)
+        and _is_solution_decorator(stmt.value.func)
+    ):
+        decorating = 1
+        info = _scan_step(_solution_call_decorators(stmt.value))
+
+    if registrations != decorating:
+        raise NotStaticallyResolvable()
+
+    return info
+
+
+class PuzzleInfo(NamedTuple):
+    """Puzzle metadata, statically found in a module or read from a loaded
+    puzzle.
+
+    Attributes:
+        name: The puzzle name.
+        steps: Number of solution steps.
+        solved_steps: Number of steps declaring their expected answer, with
+            `solved` or `with_inputs`.
+        has_budget: Whether a step declares a budget.
+        answers: Expected answer of each step, as displayed once solved.
+            None if it is not declared, or not given as a literal to a
+            statically scanned step.
+    """
+    name: str
+    steps: int
+    solved_steps: int = 0
+    has_budget: bool = False
+    answers: tuple[Optional[str], ...] = ()
+
+    @classmethod
+    def of(cls, puzzle: Puzzle) -> 'PuzzleInfo':
+        """Get the metadata of a loaded puzzle."""
+        solutions = [get_step_solutions(step.fn) for step in puzzle.steps]
+
+        return cls(
+            puzzle.name,
+            len(puzzle.steps),
+            sum(bool(expected) for expected in solutions),
+            any(get_step_budget(step.fn).is_set for step in puzzle.steps),
+            tuple(
+                str(expected[0]) if expected else None
+                for expected in solutions
+            ),
+        )
+
+
+def scan_puzzle(source: str) -> Optional[PuzzleInfo]:
+    """Statically find the puzzle declared in a module source.
+
+    Only a single top level `puzzle = Puzzle(name='...')` assignment can be
+    understood. Any other way of binding the `puzzle` attribute requires the
+    module to be imported.
+    Steps are counted from the top level `@puzzle.solution` decorated
+    functions and `puzzle.solution(...)` calls, along with their `solved`,
+    `budget` and `with_inputs` decorators. Inputs and solutions of
+    `with_inputs` must be given as dict literals with string keys. Expected
+    answers are only known when given as literals.
+
+    Returns:
+        The puzzle metadata or None if the module does not declare any
+        puzzle.
+
+    Raises:
+        NotStaticallyResolvable: If the module may declare a puzzle but it
+            can't be understood without importing it.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        raise NotStaticallyResolvable() from e
+
+    puzzle_name: Optional[str] = None
+    steps = StepsInfo()
+
+    for stmt in tree.body:
+        if (value := _puzzle_assignment(stmt)) is not None:
+            if puzzle_name is not None:
+                raise NotStaticallyResolvable()
+            puzzle_name = _static_puzzle_name(value)
+        elif _binds_puzzle(stmt):
+            raise NotStaticallyResolvable()
+        else:
+            steps += _count_steps(stmt)
+
+    if puzzle_name is None:
+        return None
+
+    return PuzzleInfo(puzzle_name, *steps)
+
+
+def scan_puzzle_name(source: str) -> Optional[str]:
+    """Statically find the name of the puzzle declared in a module source.
+
+    Returns:
+        The puzzle name or None if the module does not declare any puzzle.
+
+    Raises:
+        NotStaticallyResolvable: If the module may declare a puzzle but its
+            name can't be found without importing it.
+    """
+    info = scan_puzzle(source)
+
+    return info.name if info is not None else None
+
+
+class ModuleScan(NamedTuple):
+    """The result of statically scanning a module.
+
+    Attributes:
+        is_static: False if the module must be imported to find its puzzle.
+        puzzle: The puzzle found in the module. Always None if the module
+            is not static.
+    """
+    is_static: bool
+    puzzle: Optional[PuzzleInfo]
+
+
+def scan_module(path: Path) -> ModuleScan:
+    """Statically scan a puzzle module file."""
+    try:
+        puzzle = scan_puzzle(path.read_text(encoding='utf-8'))
+    except (NotStaticallyResolvable, UnicodeDecodeError):
+        return ModuleScan(is_static=False, puzzle=None)
+
+    return ModuleScan(is_static=True, puzzle=puzzle)
+
+
+class LazyPuzzle:
+    """A reference to a puzzle whose module is imported on first use.
+
+    Arguments:
+        module_name: Module declaring the puzzle, in dot notation.
+        name: The puzzle name, as statically found in the module.
+        steps: The number of statically found solution steps.
+        info: The puzzle metadata statically found in the module.
+    """
+
+    def __init__(
+        self,
+        module_name: str,
+        name: str,
+        steps: Optional[int] = None,
+        info: Optional[PuzzleInfo] = None,
+    ) -> None:
+        self.module_name = module_name
+        self.name = name
+        self.steps = steps
+        self.info = info
+        self._puzzle: Optional[Puzzle] = None
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}: {self.module_name}>'
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._puzzle is not None
+
+    def load(self) -> Puzzle:
+        """Import the puzzle module and return its puzzle.
+
+        Raises:
+            MissingAttribute: If the module has no puzzle attribute.
+            WrongAttributeType: If the puzzle attribute is not a Puzzle.
+        """
+        if self._puzzle is None:
+            self._puzzle = import_instance(
+                self.module_name,
+                PUZZLE_ATTRIBUTE,
+                Puzzle,
+            )
+
+        return self._puzzle
+
+
+def discover_puzzle(
+    module_name: str,
+    path: Path,
+    manifest: Optional['DiscoveryManifest'] = None,
+) -> Puzzle | LazyPuzzle | None:
+    """Get a puzzle from a module, importing the module only if its source
+    can't be statically understood.
+
+    Arguments:
+        module_name: The puzzle module name, in dot notation.
+        path: The puzzle module file.
+        manifest: A cache of previous scans. Only modified files are scanned
+            again.
+
+    Returns:
+        None if the module does not declare any puzzle.
+
+    Raises:
+        WrongAttributeType: If the module had to be imported and its puzzle
+            attribute is not a Puzzle.
+    """
+    if manifest is None:
+        scan = scan_module(path)
+    else:
+        scan = manifest.scan(path)
+
+    if not scan.is_static:
+        return _import_puzzle(module_name)
+
+    if scan.puzzle is None:
+        return None
+
+    return LazyPuzzle(
+        module_name,
+        scan.puzzle.name,
+        scan.puzzle.steps,
+        scan.puzzle,
+    )
+
+
+def _import_puzzle(module_name: str) -> Optional[Puzzle]:
+    try:
+        return import_instance(module_name, PUZZLE_ATTRIBUTE, Puzzle)
+    except MissingAttribute:
+        return None
+
+
+def puzzle_info(puzzle: Puzzle | LazyPuzzle) -> Optional[PuzzleInfo]:
+    """Get the metadata of a puzzle without importing its module.
+
+    Returns:
+        None if the metadata of a lazy puzzle is unknown.
+    """
+    if isinstance(puzzle, LazyPuzzle):
+        return puzzle.info
+
+    return PuzzleInfo.of(puzzle)
+
+
+def puzzle_view(
+    puzzle_id: str,
+    puzzle: Puzzle | LazyPuzzle,
+    year: Optional[int] = None,
+    day: Optional[int] = None,
+) -> PuzzleView:
+    """Get the view of a puzzle, with its metadata, without importing its
+    module.
+    """
+    info = puzzle_info(puzzle)
+    if info is None:
+        return PuzzleView(puzzle_id, puzzle.name, year, day)
+
+    return PuzzleView(
+        puzzle_id,
+        puzzle.name,
+        year,
+        day,
+        info.steps,
+        info.solved_steps,
+        info.has_budget,
+        info.answers,
+    )
+
+
+def resolve_puzzle(puzzle: Puzzle | LazyPuzzle) -> Puzzle:
+    """Get an actual puzzle, importing its module if needed."""
+    if isinstance(puzzle, LazyPuzzle):
+        return puzzle.load()
+
+    return puzzle
@@ -0,0 +1,194 @@
+"""Select puzzles by their metadata.
+
+Filters are evaluated against the views returned by `Challenge.find`, so that
+puzzles are selected without being loaded when the challenge is lazily
+discovered.
+
+A filter is made of terms, all of which must match:
+
+    year:2022        Puzzles of 2022
+    year:2015..2018  Puzzles from 2015 to 2018, inclusive
+    day:..10         Puzzles of the first 10 days. Bounds are optional
+    steps:2          Puzzles having 2 solution steps
+    name:signal      Puzzles whose name contains 'signal', ignoring case
+    name~^[A-C]      Puzzles whose name matches a regular expression
+    solved           Puzzles whose steps all declare their expected answer
+    unsolved         Puzzles having a step without expected answer
+    budget           Puzzles having a step with a budget
+    2022 01          Other words select puzzles whose id starts with them
+    2022 1           Numbers in ids are compared as numbers, ignoring padding
+
+Puzzles whose metadata are unknown to the challenge never match a term on
+these metadata.
+"""
+
+import re
+from typing import NamedTuple, Optional, Sequence
+
+from saulve.errors import ValidationError
+
+from .base import PuzzleView
+
+__all__ = ['Bounds', 'PuzzleFilter', 'id_starts_with', 'parse_bounds']
+
+FIELD_REGEX = re.compile(
+    r'^(?P<field>[a-z]+)(?P<operator>[:~])(?P<value>.*)$'
+)
+
+
+def _same_id_part(part: str, word: str) -> bool:
+    """Compare numeric parts as numbers, so that `1` selects day `01`."""
+    if part.isdigit() and word.isdigit():
+        return int(part) == int(word)
+
+    return part == word
+
+
+def id_starts_with(puzzle_id: str, words: Sequence[str]) -> bool:
+    """Check if the words of a puzzle id start with the given words.
+    Numeric words are compared as numbers.
+    """
+    id_parts = puzzle_id.split()[:len(words)]
+    return len(id_parts) == len(words) and all(
+        _same_id_part(part, word)
+        for part, word in zip(id_parts, words, strict=True)
+    )
+
+
+class Bounds(NamedTuple):
+    """An inclusive range of integers. Missing bounds are unlimited."""
+    low: Optional[int] = None
+    high: Optional[int] = None
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, int):
+            return False
+
+        return (
+            (self.low is None or value >= self.low)
+            and (self.high is None or value <= self.high)
+        )
+
+
+def parse_bounds(value: str) -> Bounds:
+    """Parse an integer, or an inclusive `low..high` range of integers.
+
+    Raises:
+        ValidationError: If the value is not an integer or a range.
+    """
+    low, separator, high = value.partition('..')
+
+    try:
+        if not separator:
+            return Bounds(int(value), int(value))
+
+        return Bounds(
+            int(low) if low else None,
+            int(high) if high else None,
+        )
+    except ValueError as e:
+        raise ValidationError(f"'{value}' is not a number or range.") from e
+
+
+class PuzzleFilter(NamedTuple):
+    """Puzzle selection criteria, None when not filtered on.
+
+    Attributes:
+        ids: Words the puzzle id must start with.
+        years: Range of the puzzle year.
+        days: Range of the puzzle day.
+        steps: Range of the number of solution steps.
+        names: Patterns the puzzle name must match.
+        solved: Whether all steps must declare, or not, their expected
+            answer.
+        has_budget: Whether a step must have a budget.
+    """
+    ids: tuple[str, ...] = ()
+    years: Optional[Bounds] = None
+    days: Optional[Bounds] = None
+    steps: Optional[Bounds] = None
+    names: tuple[re.Pattern[str], ...] = ()
+    solved: Optional[bool] = None
+    has_budget: Optional[bool] = None
+
+    @classmethod
+    def parse(cls, terms: Sequence[str]) -> 'PuzzleFilter':
+        """Parse the terms of a filter.
+
+        Raises:
+            ValidationError: If a term is not valid.
+        """
+        ids: list[str] = []
+        names: list[re.Pattern[str]] = []
+        bounds: dict[str, Bounds] = {}
+        solved: Optional[bool] = None
+        has_budget: Optional[bool] = None
+
+        for term in terms:
+            if term in ('solved', 'unsolved'):
+                solved = term == 'solved'
+                continue
+            if term == 'budget':
+                has_budget = True
+                continue
+
+            match = FIELD_REGEX.match(term)
+            if match is None:
+                ids.append(term)
+                continue
+
+            field, operator, value = match.group('field', 'operator', 'value')
+            if field == 'name' and operator == ':':
+                names.append(re.compile(re.escape(value), re.IGNORECASE))
+            elif field == 'name':
+                try:
+                    names.append(re.compile(value))
+                except re.error as e:
+                    raise ValidationError(
+                        f"Invalid name pattern '{value}': {e}."
+                    ) from e
+            elif field in ('year', 'day', 'steps') and operator == ':':
+                bounds[field] = parse_bounds(value)
+            else:
+                raise ValidationError(f"Unknown filter '{term}'.")
+
+        return cls(
+            ids=tuple(ids),
+            years=bounds.get('year'),
+            days=bounds.get('day'),
+            steps=bounds.get('steps'),
+            names=tuple(names),
+            solved=solved,
+            has_budget=has_budget,
+        )
+
+    def matches(self, view: PuzzleView) -> bool:
+        """Check if a puzzle matches all the filter criteria."""
+        if not id_starts_with(view.id, self.ids):
+            return False
+
+        if self.years is not None and view.year not in self.years:
+            return False
+        if self.days is not None and view.day not in self.days:
+            return False
+        if self.steps is not None and view.steps not in self.steps:
+            return False
+
+        if not all(pattern.search(view.name) for pattern in self.names):
+            return False
+
+        if self.solved is not None:
+            if view.steps is None or view.solved_steps is None:
+                return False
+            is_solved = 0 < view.steps == view.solved_steps
+            if self.solved != is_solved:
+                return False
+
+        if self.has_budget is not None and view.has_budget != self.has_budget:
+            return False
+
+        return True
+
+    def select(self, views: Sequence[PuzzleView]) -> list[PuzzleView]:
+        """Get the puzzles matching the filter."""
+        return [view for view in views if self.matches(view)]
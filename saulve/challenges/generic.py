@@ -16,17 +16,24 @@ from saulve.puzzle import Puzzle
 
 from .base import Challenge as BaseChallenge
 from .base import ChallengeLoader, PuzzleView
+from .discovery import (
+    LazyPuzzle,
+    discover_puzzle,
+    puzzle_view,
+    resolve_puzzle,
+)
+from .manifest import DiscoveryManifest, list_directory
 
 logger = logging.getLogger(__name__)
 
 
 class Challenge(BaseChallenge):
-    def __init__(self, puzzles: dict[str, Puzzle]) -> None:
+    def __init__(self, puzzles: dict[str, Puzzle | LazyPuzzle]) -> None:
         self.puzzles = puzzles
 
     def find(self) -> list[PuzzleView]:
         return [
-            PuzzleView(id=key, name=puzzle.name)
+            puzzle_view(key, puzzle)
             for key, puzzle in self.puzzles.items()
         ]
 
@@ -37,16 +44,21 @@ class Challenge(BaseChallenge):
         puzzle_id = args[0]
 
         try:
-            return self.puzzles[puzzle_id]
+            puzzle = self.puzzles[puzzle_id]
         except KeyError as e:
             raise PuzzleNotFound(f"Puzzle '{puzzle_id}' not found.") from e
 
+        return resolve_puzzle(puzzle)
+
 
 class GenericLoader(ChallengeLoader):
     def __init__(
         self,
         challenge_module: types.ModuleType,
         id_regexp: Optional[str] = None,
+        lazy: bool = False,
+        cache: bool = True,
+        cache_dir: Optional[Path] = None,
     ) -> None:
         """
         Arguments:
@@ -54,11 +66,20 @@ class GenericLoader(ChallengeLoader):
             id_regexp: An optional regexp to use to extract an identifier from
                 loaded puzzle name. If not set or if the regexp does not match,
                 the puzzle module name will set as id.
+            lazy: If set, puzzle modules are statically scanned and only
+                imported when their puzzle is requested.
+            cache: If set, lazy discovery results are kept in an on disk
+                manifest so that only modified files are scanned again.
+            cache_dir: Where to store the discovery manifest. Defaults to
+                the challenge package __pycache__ directory.
         """
         self.challenge_module = challenge_module
         self.id_regexp = (
             re.compile(id_regexp) if id_regexp is not None else None
         )
+        self.lazy = lazy
+        self.cache = cache
+        self.cache_dir = cache_dir
 
     def _generate_puzzle_id(self, puzzle_module_name: str) -> str:
         puzzle_module = puzzle_module_name.split('.')[-1]
@@ -74,29 +95,87 @@ class GenericLoader(ChallengeLoader):
         except IndexError:
             return puzzle_module
 
-    def load(self) -> Challenge:
-        puzzles: dict[str, Puzzle] = {}
+    def _load_puzzle(
+        self,
+        puzzle_module_name: str,
+        path: Path,
+        manifest: Optional[DiscoveryManifest],
+    ) -> Puzzle | LazyPuzzle | None:
+        if self.lazy:
+            return discover_puzzle(puzzle_module_name, path, manifest)
+
+        try:
+            return import_instance(puzzle_module_name, 'puzzle', Puzzle)
+        except MissingAttribute:
+            return None
 
+    @property
+    def challenge_path(self) -> Path:
         assert self.challenge_module.__file__ is not None
-        challenge_path = Path(self.challenge_module.__file__).parent
+        return Path(self.challenge_module.__file__).parent
 
-        for filename in challenge_path.iterdir():
-            if not filename.is_file():
-                continue
+    def load_one(self, *args: str) -> Puzzle:
+        if len(args) != 1:
+            raise ValidationError(f'1 id argument expected, got {len(args)}.')
 
-            if filename.suffix != '.py':
+        puzzle_id = args[0]
+
+        # Only modules whose name give the requested id are imported. Later
+        # modules win on duplicated ids, as they do when loading everything.
+        candidates: list[str] = []
+        for entry in list_directory(self.challenge_path):
+            if entry.is_dir or entry.path.suffix != '.py':
                 continue
 
             puzzle_module_name = '.'.join([
                 self.challenge_module.__name__,
-                filename.with_suffix('').name,
+                entry.path.stem,
             ])
+            if self._generate_puzzle_id(puzzle_module_name) == puzzle_id:
+                candidates.append(puzzle_module_name)
 
+        for puzzle_module_name in reversed(candidates):
             try:
-                puzzle = import_instance(puzzle_module_name, 'puzzle', Puzzle)
+                return import_instance(puzzle_module_name, 'puzzle', Puzzle)
             except MissingAttribute:
                 continue
 
+        raise PuzzleNotFound(f"Puzzle '{puzzle_id}' not found.")
+
+    def load(self) -> Challenge:
+        puzzles: dict[str, Puzzle | LazyPuzzle] = {}
+
+        challenge_path = self.challenge_path
+
+        manifest = None
+        if self.lazy and self.cache:
+            manifest = DiscoveryManifest.for_package(
+                challenge_path,
+                self.challenge_module.__name__,
+                self.cache_dir,
+            )
+
+        for entry in list_directory(challenge_path, manifest):
+            if entry.is_dir:
+                continue
+
+            filename = entry.path
+            if filename.suffix != '.py':
+                continue
+
+            puzzle_module_name = '.'.join([
+                self.challenge_module.__name__,
+                filename.stem,
+            ])
+
+            puzzle = self._load_puzzle(
+                puzzle_module_name,
+                filename,
+                manifest,
+            )
+            if puzzle is None:
+                continue
+
             puzzle_id = self._generate_puzzle_id(puzzle_module_name)
             if puzzle_id in puzzles:
                 logger.warning(
@@ -105,4 +184,7 @@ class GenericLoader(ChallengeLoader):
                 )
             puzzles[puzzle_id] = puzzle
 
+        if manifest is not None:
+            manifest.save()
+
         return Challenge(puzzles)
@@ -0,0 +1,244 @@
+"""A persistent cache of puzzle discovery.
+
+The manifest records the content of the challenge directories and the result
+of the static scan of each puzzle module. Entries are revalidated against the
+file modification time and size, so only modified files are scanned again.
+"""
+
+import contextlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from .discovery import ModuleScan, PuzzleInfo, scan_module
+
+__all__ = ['DirEntry', 'DiscoveryManifest', 'list_directory']
+
+logger = logging.getLogger(__name__)
+
+# Bumped each time the manifest file format changes
+MANIFEST_VERSION = 3
+
+MANIFEST_FILENAME = 'saulve-discovery.json'
+
+
+class DirEntry(NamedTuple):
+    path: Path
+    is_dir: bool
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+def _read_directory(directory: Path) -> list[DirEntry]:
+    with os.scandir(directory) as entries:
+        return [
+            DirEntry(Path(entry.path), entry.is_dir())
+            for entry in entries
+        ]
+
+
+class DiscoveryManifest:
+    """On disk cache of directory listings and module scans.
+
+    Arguments:
+        path: The manifest file. It is created on save if it does not
+            exist.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._directories: dict[str, dict[str, Any]] = {}
+        self._modules: dict[str, dict[str, Any]] = {}
+        self._seen: set[str] = set()
+        self._is_dirty = False
+
+        self._read()
+
+    @classmethod
+    def for_package(
+        cls,
+        package_path: Path,
+        package_name: str,
+        cache_dir: Optional[Path] = None,
+    ) -> 'DiscoveryManifest':
+        """Get the manifest of a challenge package.
+
+        The manifest is stored in the package `__pycache__` directory unless
+        a cache directory is given.
+        """
+        if cache_dir is None:
+            return cls(package_path / '__pycache__' / MANIFEST_FILENAME)
+
+        return cls(cache_dir / f'{package_name}.{MANIFEST_FILENAME}')
+
+    def _read(self) -> None:
+        try:
+            with self.path.open(encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if (
+            not isinstance(content, dict)
+            or content.get('version') != MANIFEST_VERSION
+        ):
+            return
+
+        directories = content.get('directories', {})
+        modules = content.get('modules', {})
+        if isinstance(directories, dict) and isinstance(modules, dict):
+            self._directories = directories
+            self._modules = modules
+
+    def list_directory(self, directory: Path) -> list[DirEntry]:
+        """List a directory content, reusing the previous listing if the
+        directory has not been modified.
+        """
+        key = str(directory)
+        mtime_ns = directory.stat().st_mtime_ns
+        self._seen.add(key)
+
+        cached = _cached_listing(
+            directory,
+            self._directories.get(key),
+            mtime_ns,
+        )
+        if cached is not None:
+            return cached
+
+        entries = _read_directory(directory)
+        self._directories[key] = {
+            'mtime_ns': mtime_ns,
+            'entries': [[entry.name, entry.is_dir] for entry in entries],
+        }
+        self._is_dirty = True
+
+        return entries
+
+    def scan(self, path: Path) -> ModuleScan:
+        """Statically scan a module, reusing the previous scan if the file has
+        not been modified.
+        """
+        key = str(path)
+        stat = path.stat()
+        self._seen.add(key)
+
+        cached = _cached_scan(self._modules.get(key), stat)
+        if cached is not None:
+            return cached
+
+        scan = scan_module(path)
+        self._modules[key] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'is_static': scan.is_static,
+            'puzzle': list(scan.puzzle) if scan.puzzle is not None else None,
+        }
+        self._is_dirty = True
+
+        return scan
+
+    def save(self) -> None:
+        """Write the manifest to disk.
+
+        Entries that have not been used since the manifest was read are
+        dropped. Failing to write the manifest is not an error, puzzles will
+        just be scanned again next time.
+        """
+        directories = {
+            key: value
+            for key, value in self._directories.items()
+            if key in self._seen
+        }
+        modules = {
+            key: value
+            for key, value in self._modules.items()
+            if key in self._seen
+        }
+
+        if (
+            not self._is_dirty
+            and len(directories) == len(self._directories)
+            and len(modules) == len(self._modules)
+        ):
+            return
+
+        content = {
+            'version': MANIFEST_VERSION,
+            'directories': directories,
+            'modules': modules,
+        }
+
+        tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open('w', encoding='utf-8') as f:
+                json.dump(content, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.debug(f'Could not write discovery manifest: {e}')
+            with contextlib.suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+            return
+
+        self._directories = directories
+        self._modules = modules
+        self._is_dirty = False
+
+
+def _cached_listing(
+    directory: Path,
+    cached: Any,
+    mtime_ns: int,
+) -> Optional[list[DirEntry]]:
+    """The listing of a manifest directory entry. None if the directory was
+    modified, or if the entry is malformed.
+    """
+    try:
+        if cached is None or cached['mtime_ns'] != mtime_ns:
+            return None
+        return [
+            DirEntry(directory / name, bool(is_dir))
+            for name, is_dir in cached['entries']
+        ]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _cached_scan(cached: Any, stat: os.stat_result) -> Optional[ModuleScan]:
+    """The scan of a manifest module entry. None if the module was modified,
+    or if the entry is malformed.
+    """
+    try:
+        if (
+            cached is None
+            or cached['mtime_ns'] != stat.st_mtime_ns
+            or cached['size'] != stat.st_size
+        ):
+            return None
+        puzzle = cached['puzzle']
+        return ModuleScan(
+            is_static=bool(cached['is_static']),
+            puzzle=(
+                PuzzleInfo(*puzzle)._replace(answers=tuple(puzzle[-1]))
+                if puzzle is not None
+                else None
+            ),
+        )
+    except (KeyError, TypeError, ValueError, IndexError):
+        return None
+
+
+def list_directory(
+    directory: Path,
+    manifest: Optional[DiscoveryManifest] = None,
+) -> list[DirEntry]:
+    """List a directory content, using the manifest if one is given."""
+    if manifest is None:
+        return _read_directory(directory)
+
+    return manifest.list_directory(directory)
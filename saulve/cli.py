@@ -1,9 +1,50 @@
-from typing import Optional
+"""The saulve command line interface.
+
+Modules only needed by some commands are imported by these commands, to keep
+the startup of the command line interface fast.
+"""
+
+import json
+import re
+import sys
+import traceback
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    Optional,
+    Sequence,
+    TypeVar,
+)
 
 import click
 
 from .app import App, import_app
-from .errors import PuzzleNotFound, ValidationError
+from .challenges.base import ChallengeLoader, PuzzleView, load_one
+from .daemon import default_socket_path, run_in_daemon, uses_daemon
+from .errors import (
+    PuzzleNotFound,
+    SaulveError,
+    StepCrashed,
+    ValidationError,
+)
+
+if TYPE_CHECKING:
+    from .bench import Regression, StepBenchmark
+    from .history import RunHistory, StepRun
+    from .puzzle.cache import ResultCache
+    from .puzzle.core import Puzzle, PuzzleSolution
+    from .puzzle.isolation import StepLimits
+    from .puzzle.metrics import StepMetrics
+    from .puzzle.profiler import StepProfileResult, StepSamples
+    from .runner import PuzzleTask, TaskResult
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+T = TypeVar('T')
 
 
 def display_challenges(app: App) -> None:
@@ -12,7 +53,341 @@ def display_challenges(app: App) -> None:
         click.echo(f'  {challenge_name}')
 
 
-@click.group(invoke_without_command=True)
+def format_metrics(metrics: 'StepMetrics') -> str:
+    formatted = (
+        f'{metrics.wall_time * 1000:.2f} ms wall, '
+        f'{metrics.cpu_time * 1000:.2f} ms cpu'
+    )
+    if metrics.peak_memory is not None:
+        formatted += f', {metrics.peak_memory / 1024:.1f} KiB peak'
+
+    return formatted
+
+
+def format_answer(solution: 'PuzzleSolution') -> str:
+    from .puzzle.core import StepStatus
+
+    if solution.status not in (StepStatus.COMPLETED, StepStatus.OVER_BUDGET):
+        return solution.status.value
+
+    answer = solution.solution if solution.solution is not None else 'unsolved'
+    if solution.status is StepStatus.OVER_BUDGET:
+        answer += ' (over budget)'
+
+    return answer
+
+
+def display_solution(
+    solution: 'PuzzleSolution',
+    timings: bool = False,
+    profile_top: int = 0,
+) -> None:
+    line = f'  {format_answer(solution)}'
+    if solution.case is not None:
+        line = f'  [{solution.case}] {format_answer(solution)}'
+    if timings and solution.from_cache:
+        line += '  (cached)'
+    elif timings and solution.metrics is not None:
+        line += f'  ({format_metrics(solution.metrics)})'
+
+    # click flushes the output, so that each answer shows up as soon as its
+    # step is finished.
+    click.echo(line)
+
+    if profile_top and solution.profile is not None:
+        display_profile(solution.profile, profile_top)
+
+
+def display_solutions(
+    solutions: list['PuzzleSolution'],
+    timings: bool = False,
+    profile_top: int = 0,
+) -> None:
+    for solution in solutions:
+        display_solution(solution, timings, profile_top)
+
+
+def display_profile(profile: 'StepProfileResult', top: int) -> None:
+    """Display the functions a step spent the most time in, and its most
+    sampled call path if it was sampled.
+    """
+    from .puzzle.profiler import StepSamples
+
+    click.echo(f'    {"own":>12} {"cumulative":>12} {"calls":>8}  function')
+    for function in profile.top(top):
+        calls = function.calls if function.calls is not None else '-'
+        click.echo(
+            f'    {format_duration(function.own_time):>12} '
+            f'{format_duration(function.cumulative_time):>12} '
+            f'{calls:>8}  {function.name}'
+        )
+
+    if isinstance(profile, StepSamples):
+        display_hot_path(profile)
+
+
+def display_hot_path(samples: 'StepSamples') -> None:
+    click.echo(f'    hot path ({samples.sample_count} samples):')
+    for frame in samples.hot_path():
+        line = f'    {frame.share * 100:>11.1f}%  {frame.name}'
+        if frame.depth > 1:
+            line += f' x{frame.depth}'
+        click.echo(line)
+
+
+def save_profile(
+    profile: 'StepProfileResult',
+    directory: Path,
+    puzzle_id: Sequence[str],
+    step: int,
+) -> None:
+    """Save the profile of a step in a collapsed stacks file for flame graph
+    tools, and in a pstats file if all calls were profiled.
+    """
+    from .puzzle.profiler import StepProfile
+
+    stem = re.sub(r'[^\w.-]', '_', '-'.join([*puzzle_id, f'step{step + 1}']))
+    directory.mkdir(parents=True, exist_ok=True)
+    if isinstance(profile, StepProfile):
+        profile.dump(directory / f'{stem}.pstats')
+    profile.dump_collapsed_stacks(directory / f'{stem}.collapsed')
+
+
+def save_profiles(
+    solutions: Iterator['PuzzleSolution'],
+    directory: Path,
+    puzzle_id: Sequence[str],
+) -> Iterator['PuzzleSolution']:
+    """Save the profile of each solution as soon as it is available."""
+    for step, solution in enumerate(solutions):
+        if solution.profile is not None:
+            save_profile(solution.profile, directory, puzzle_id, step)
+        yield solution
+
+
+def solution_as_dict(solution: 'PuzzleSolution') -> dict[str, Any]:
+    """A JSON serializable representation of a solution."""
+    return {
+        'solution': solution.solution,
+        'is_correct': solution.is_correct,
+        'from_cache': solution.from_cache,
+        'status': solution.status.value,
+        'metrics': metrics_as_dict(solution.metrics),
+        'case': solution.case,
+    }
+
+
+class MemorySize(click.ParamType):
+    """A size in bytes, with an optional K, M or G suffix."""
+    name = 'size'
+
+    UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+    def convert(
+        self,
+        value: Any,
+        param: Optional[click.Parameter],
+        ctx: Optional[click.Context],
+    ) -> int:
+        if isinstance(value, int):
+            return value
+
+        text = str(value).strip().upper()
+        unit = text[-1:] if text[-1:] in self.UNITS else ''
+        try:
+            size = int(float(text[:len(text) - len(unit)]) * self.UNITS[unit])
+        except ValueError:
+            self.fail(f'{value!r} is not a valid size.', param, ctx)
+
+        if size <= 0:
+            self.fail(f'{value!r} is not a positive size.', param, ctx)
+
+        return size
+
+
+def limit_options(fn: F) -> F:
+    """Add options setting the default resource limits of steps."""
+    fn = click.option(
+        '--max-memory',
+        type=MemorySize(),
+        help='Memory limit of each step (ex: 512M). Steps run in a child '
+             'process.',
+    )(fn)
+    fn = click.option(
+        '--timeout',
+        type=click.FloatRange(min=0, min_open=True),
+        help='Time limit of each step, in seconds. Steps run in a child '
+             'process.',
+    )(fn)
+    return fn
+
+
+def profile_options(fn: F) -> F:
+    """Add options profiling the steps."""
+    fn = click.option(
+        '--sample-interval',
+        type=click.FloatRange(min=0, min_open=True),
+        help='Interval between two samples of --sample, in seconds of CPU '
+             'time. Defaults to 0.005.',
+    )(fn)
+    fn = click.option(
+        '--sample',
+        is_flag=True,
+        help='Profile each step by sampling its call stack at a regular '
+             'interval, with a low overhead. Saves a collapsed stacks file '
+             'per step.',
+    )(fn)
+    fn = click.option(
+        '--profile-top',
+        type=click.IntRange(min=0),
+        default=10,
+        show_default=True,
+        help='Number of functions displayed for each profiled step.',
+    )(fn)
+    fn = click.option(
+        '--profile-dir',
+        type=click.Path(file_okay=False, path_type=Path),
+        default='saulve-profiles',
+        show_default=True,
+        help='Directory of the profile files.',
+    )(fn)
+    fn = click.option(
+        '--profile',
+        is_flag=True,
+        help='Profile each step, and save a pstats file and a collapsed '
+             'stacks file per step.',
+    )(fn)
+    return fn
+
+
+def sample_interval_option(
+    profile: bool,
+    sample: bool,
+    sample_interval: Optional[float],
+) -> Optional[float]:
+    """Get the interval at which the steps call stack is sampled, None if
+    the steps are not sampled.
+    """
+    from .puzzle.profiler import DEFAULT_SAMPLE_INTERVAL
+
+    if not sample:
+        if sample_interval is not None:
+            raise click.UsageError('--sample-interval requires --sample.')
+        return None
+
+    if profile:
+        raise click.UsageError('--profile can not be used with --sample.')
+
+    return sample_interval or DEFAULT_SAMPLE_INTERVAL
+
+
+def history_file_option(fn: F) -> F:
+    """Add an option selecting the run history database."""
+    return click.option(
+        '--history-file',
+        type=click.Path(dir_okay=False, path_type=Path),
+        envvar='SAULVE_HISTORY_FILE',
+        help='Run history database. Defaults to '
+             '~/.local/share/saulve/history.sqlite3.',
+    )(fn)
+
+
+def open_history(path: Optional[Path]) -> 'RunHistory':
+    from .history import RunHistory, default_history_path
+
+    try:
+        return RunHistory(path or default_history_path())
+    except SaulveError as e:
+        raise click.ClickException(str(e)) from e
+
+
+def app_directory(app_module: str) -> Path:
+    """The directory of an imported application module."""
+    app_file = getattr(sys.modules[app_module], '__file__', None)
+    return Path(app_file).parent if app_file is not None else Path.cwd()
+
+
+def record_run(
+    ctx: click.Context,
+    history_file: Optional[Path],
+    puzzle_id: Sequence[str],
+    solutions: list['PuzzleSolution'],
+) -> None:
+    """Record the run of a puzzle in the history, under the id of its view.
+
+    A history that can't be written is reported without failing the command,
+    the puzzle having been solved.
+    """
+    from .history import RunEnvironment, RunHistory, default_history_path
+
+    environment = RunEnvironment.current(app_directory(ctx.obj['APP_MODULE']))
+    try:
+        with RunHistory(history_file or default_history_path()) as history:
+            history.record(
+                ctx.obj['CHALLENGE_ID'],
+                view_id(ctx.obj['LOADER'], puzzle_id).split(),
+                enumerate(solutions),
+                environment,
+            )
+    except SaulveError as e:
+        click.echo(f'Run not recorded. {e}', err=True)
+
+
+def view_id(loader: ChallengeLoader, puzzle_id: Sequence[str]) -> str:
+    """The id of a puzzle, as found by `Challenge.find`, given an id as
+    typed by the user, such as `2022 1` for `2022 01`.
+    """
+    from .challenges.filters import id_starts_with
+
+    for view in loader.load().find():
+        if (
+            len(view.id.split()) == len(puzzle_id)
+            and id_starts_with(view.id, puzzle_id)
+        ):
+            return view.id
+
+    return ' '.join(puzzle_id)
+
+
+def collect(items: Iterator[T], collected: list[T]) -> Iterator[T]:
+    """Yield items, keeping them in a list."""
+    for item in items:
+        collected.append(item)
+        yield item
+
+
+def load_puzzle(loader: ChallengeLoader, puzzle_id: list[str]) -> 'Puzzle':
+    try:
+        return load_one(loader, *puzzle_id)
+    except ValidationError as e:
+        raise click.ClickException(f'Invalid puzzle id. {e}') from e
+    except PuzzleNotFound as e:
+        raise click.ClickException('Puzzle not found.') from e
+
+
+class SaulveGroup(click.Group):
+    """Commands of an application, like serve, or of one of its challenges.
+
+    Names that are not application commands are challenge ids, followed by
+    a challenge command.
+    """
+
+    def get_command(
+        self,
+        ctx: click.Context,
+        cmd_name: str,
+    ) -> Optional[click.Command]:
+        return super().get_command(ctx, cmd_name) or challenge
+
+
+@click.group(
+    cls=SaulveGroup,
+    invoke_without_command=True,
+    subcommand_metavar='CHALLENGE COMMAND [ARGS]...',
+    help='Solve the puzzles of the challenges of an application. Run '
+         '`saulve CHALLENGE --help` to list the commands of a challenge, '
+         'and without arguments to list the challenges.',
+)
 @click.option(
     '-a', '--app',
     'app_module',
@@ -20,48 +395,1301 @@ def display_challenges(app: App) -> None:
     envvar='SAULVE_CHALLENGES',
     help='Application module.',
 )
-@click.argument('chall', required=False)
 @click.pass_context
-def cli(ctx: click.Context, app_module: str, chall: Optional[str]) -> None:
+def cli(ctx: click.Context, app_module: str) -> None:
     ctx.ensure_object(dict)
     app = import_app(app_module)
+    ctx.obj['APP'] = app
+    ctx.obj['APP_MODULE'] = app_module
 
-    if chall is None:
+    if ctx.invoked_subcommand is None:
         display_challenges(app)
-        return
 
-    challenge = app.get_challenge(chall)
-    ctx.obj['CHALLENGE'] = challenge
 
+@click.group(help='Commands of a challenge.')
+@click.pass_context
+def challenge(ctx: click.Context) -> None:
+    # Challenges are loaded by the subcommands, that may only need some of
+    # its puzzles.
+    try:
+        ctx.obj['LOADER'] = ctx.obj['APP'].get_loader(ctx.info_name)
+    except SaulveError as e:
+        raise click.ClickException(str(e)) from e
+    ctx.obj['CHALLENGE_ID'] = ctx.info_name
+
+
+def run_command(args: list[str]) -> int:
+    """Run a command line in the current process.
 
-@cli.command(name='list', help='List all puzzles.')
+    Returns:
+        The command exit code.
+    """
+    try:
+        cli.main(args, prog_name='saulve')
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        click.echo(e.code, err=True)
+        return 1
+
+    return 0
+
+
+@cli.command(
+    help='Keep the application loaded, and run the list, solve and bench '
+         'commands sent by clients, until interrupted. Clients find the '
+         'daemon at the socket set with SAULVE_SOCKET, or at the default '
+         'one.',
+)
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar='SAULVE_SOCKET',
+    help='Unix socket to listen on. Defaults to a socket in the user '
+         'runtime directory, or in a private temporary directory.',
+)
+@click.pass_context
+def serve(ctx: click.Context, socket_path: Optional[Path]) -> None:
+    from .daemon import DaemonServer
+    from .import_module import locate_module
+
+    app_module = ctx.obj['APP_MODULE']
+    path = socket_path or default_socket_path()
+    app_file = getattr(sys.modules[app_module], '__file__', None)
+    roots = [Path(app_file).parent] if app_file is not None else []
+
+    try:
+        server = DaemonServer(
+            path,
+            run_command,
+            roots,
+            locate_module(app_module),
+        )
+    except (SaulveError, OSError) as e:
+        raise click.ClickException(f'Could not start the daemon: {e}') from e
+
+    click.echo(f'Listening on {path}, press Ctrl+C to stop.', err=True)
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main() -> None:
+    """Entry point of the saulve command.
+
+    List, solve and bench commands are run by the daemon, if one is running
+    for their application.
+    """
+    args = sys.argv[1:]
+    if uses_daemon(args):
+        exit_code = run_in_daemon(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    cli()
+
+
+@challenge.command(
+    name='list',
+    help='List puzzles, all of them or those matching FILTERS. Filters are '
+         'year:2022, day:1..10, steps:2, name:text, name~regex, solved, '
+         'unsolved, budget, or id prefixes.',
+)
 @click.argument('filters', nargs=-1)
 @click.pass_context
 def list_puzzles(ctx: click.Context, filters: list[str]) -> None:
-    """List all puzzles in the selected challenge."""
-    challenge = ctx.obj['CHALLENGE']
-
-    for puzzle in challenge.find():
+    """List the puzzles of the selected challenge matching the filters."""
+    for puzzle in find_puzzles(ctx.obj['LOADER'], filters):
         click.echo(f'{puzzle.id} - {puzzle.name}')
 
 
-@cli.command(help='Solve a given puzzle.')
+def find_puzzles(
+    loader: ChallengeLoader,
+    filters: list[str],
+) -> list[PuzzleView]:
+    """Get the views of the puzzles matching the filters, without running
+    nor, for lazily discovered challenges, importing them.
+    """
+    from .challenges.filters import PuzzleFilter
+
+    try:
+        puzzle_filter = PuzzleFilter.parse(filters)
+    except ValidationError as e:
+        raise click.UsageError(str(e)) from e
+
+    return puzzle_filter.select(loader.load().find())
+
+
+# Marks of the status grid, by puzzle completion
+STATUS_MARKS = {
+    'solved': '*',
+    'partial': '+',
+    'unsolved': '.',
+    'unknown': '?',
+}
+
+# Days of an advent of code calendar
+CALENDAR_DAYS = range(1, 26)
+
+
+def completion(view: PuzzleView) -> str:
+    """Whether the steps of a puzzle declare their expected answer: solved,
+    partial, unsolved or unknown.
+    """
+    if view.steps is None or view.solved_steps is None:
+        return 'unknown'
+    if view.solved_steps == 0:
+        return 'unsolved'
+    if view.solved_steps < view.steps:
+        return 'partial'
+
+    return 'solved'
+
+
+def format_calendar(views: list[PuzzleView]) -> list[str]:
+    """Format the completion grid of calendar puzzles, a row per year and a
+    column per day.
+    """
+    marks: dict[int, dict[int, str]] = {}
+    for view in views:
+        assert view.year is not None and view.day is not None
+        marks.setdefault(view.year, {})[view.day] = (
+            STATUS_MARKS[completion(view)]
+        )
+
+    last_day = max([CALENDAR_DAYS[-1], *(view.day or 0 for view in views)])
+    days = range(1, last_day + 1)
+
+    lines = ['    ' + ''.join(f'{day:>3}' for day in days)]
+    for year, year_marks in sorted(marks.items()):
+        row = ''.join(f'{year_marks.get(day, ""):>3}' for day in days)
+        lines.append(f'{year:>4}{row}'.rstrip())
+
+    return lines
+
+
+@challenge.command(
+    help='Show which puzzles declare their expected answers, without running '
+         'them. Calendar puzzles are shown as a grid. FILTERS are those of '
+         'list.',
+)
+@click.argument('filters', nargs=-1)
+@click.option(
+    '--answers',
+    is_flag=True,
+    help='Display the expected answer of each step.',
+)
+@click.pass_context
+def status(ctx: click.Context, filters: list[str], answers: bool) -> None:
+    """Display the completion of the puzzles matching the filters, from
+    their statically declared expected answers.
+    """
+    views = find_puzzles(ctx.obj['LOADER'], filters)
+
+    if answers:
+        for view in views:
+            click.echo(f'{view.id} - {view.name}:')
+            expected = view.answers if view.answers is not None else (None,)
+            for answer in expected:
+                click.echo(f'  {"?" if answer is None else answer}')
+        return
+
+    calendar = [
+        view for view in views
+        if view.year is not None and view.day is not None
+    ]
+    others = [view for view in views if view not in calendar]
+
+    if calendar:
+        for line in format_calendar(calendar):
+            click.echo(line)
+        click.echo()
+
+    for view in others:
+        progress = (
+            f'{view.solved_steps}/{view.steps}'
+            if completion(view) != 'unknown' else '?'
+        )
+        click.echo(
+            f'{STATUS_MARKS[completion(view)]} {view.id} - {view.name} '
+            f'({progress} steps solved)'
+        )
+    if others:
+        click.echo()
+
+    counts = dict.fromkeys(STATUS_MARKS, 0)
+    for view in views:
+        counts[completion(view)] += 1
+    click.echo(', '.join(
+        f'{STATUS_MARKS[key]} {count} {key}'
+        for key, count in counts.items()
+    ))
+
+
+@challenge.command(help='Solve a given puzzle.')
 @click.argument('puzzle_id', nargs=-1, required=True)
+@click.option(
+    '--timings',
+    is_flag=True,
+    help='Display time and peak memory used by each step.',
+)
+@click.option(
+    '--format',
+    'output_format',
+    type=click.Choice(['text', 'json', 'jsonl']),
+    default='text',
+    help='Output format. jsonl prints a JSON object per step, as soon as it '
+         'is solved.',
+)
+@click.option(
+    '--cache/--no-cache',
+    'use_cache',
+    default=False,
+    envvar='SAULVE_CACHE',
+    help='Reuse answers of steps that did not change since their last run.',
+)
+@click.option(
+    '--refresh',
+    is_flag=True,
+    help='Run all steps again and update their cached answers.',
+)
+@click.option(
+    '--cache-dir',
+    type=click.Path(file_okay=False, path_type=Path),
+    envvar='SAULVE_CACHE_DIR',
+    help='Directory of the answers cache.',
+)
+@click.option(
+    '--watch',
+    is_flag=True,
+    help='Solve the puzzle again each time its modules are modified.',
+)
+@click.option(
+    '--history/--no-history',
+    'use_history',
+    default=True,
+    envvar='SAULVE_HISTORY',
+    help='Record the run in the run history. Profiled, watched and '
+         'parallel runs are not recorded.',
+)
+@history_file_option
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Run the steps in this number of worker processes.',
+)
+@click.option(
+    '--strict',
+    is_flag=True,
+    help='Exit with an error status if a step returned a wrong answer, or '
+         'exceeded its limits or budget.',
+)
+@limit_options
+@profile_options
 @click.pass_context
-def solve(ctx: click.Context, puzzle_id: list[str]) -> None:
+def solve(
+    ctx: click.Context,
+    puzzle_id: list[str],
+    timings: bool,
+    output_format: str,
+    use_cache: bool,
+    refresh: bool,
+    cache_dir: Optional[Path],
+    watch: bool,
+    use_history: bool,
+    history_file: Optional[Path],
+    jobs: Optional[int],
+    strict: bool,
+    timeout: Optional[float],
+    max_memory: Optional[int],
+    profile: bool,
+    profile_dir: Path,
+    profile_top: int,
+    sample: bool,
+    sample_interval: Optional[float],
+) -> None:
     """Solve a puzzle in the selected challenge."""
-    challenge = ctx.obj['CHALLENGE']
+    from .puzzle.cache import ResultCache, default_cache_dir
+    from .puzzle.isolation import StepLimits
+
+    puzzle = load_puzzle(ctx.obj['LOADER'], puzzle_id)
+
+    cache = None
+    if use_cache or refresh:
+        cache = ResultCache(cache_dir or default_cache_dir(), refresh=refresh)
+
+    limits = StepLimits(timeout, max_memory)
+    sample_interval = sample_interval_option(profile, sample, sample_interval)
+    profile = profile or sample
+    profile_to = profile_dir if profile else None
+
+    if watch and jobs is not None:
+        raise click.UsageError('--watch can not be used with --jobs.')
+
+    if watch:
+        watch_puzzle(
+            lambda: load_puzzle(ctx.obj['LOADER'], puzzle_id),
+            puzzle_id,
+            output_format,
+            timings,
+            cache,
+            limits,
+            profile_to,
+            profile_top,
+            sample_interval,
+        )
+        return
+
+    if jobs is not None:
+        solutions = solve_in_pool(
+            ctx,
+            puzzle,
+            puzzle_id,
+            jobs,
+            timings,
+            cache,
+            limits,
+            profile,
+            sample_interval,
+        )
+    else:
+        solutions = puzzle.iter_solve(
+            trace_memory=timings,
+            cache=cache,
+            limits=limits,
+            profile=profile,
+            sample_interval=sample_interval,
+        )
+
+    solved: list['PuzzleSolution'] = []
+    solutions = collect(solutions, solved)
 
     try:
-        puzzle = challenge.get(*puzzle_id)
-    except ValidationError as e:
-        raise click.ClickException(f'Invalid puzzle id. {e}') from e
-    except PuzzleNotFound as e:
-        raise click.ClickException('Puzzle not found.') from e
+        display_puzzle_solutions(
+            puzzle,
+            solutions,
+            output_format,
+            timings,
+            puzzle_id,
+            profile_to,
+            profile_top,
+        )
+    except StepCrashed as e:
+        raise click.ClickException(str(e)) from e
+
+    # Profiling slows steps down, and steps run in parallel compete for
+    # CPUs, their timings are not recorded.
+    if use_history and not profile and jobs is None and solved:
+        record_run(ctx, history_file, puzzle_id, solved)
+
+    failed = sum(solution.is_failed for solution in solved)
+    if strict and failed:
+        raise click.ClickException(f'{failed} step(s) failed.')
+
+
+def solve_in_pool(
+    ctx: click.Context,
+    puzzle: 'Puzzle',
+    puzzle_id: Sequence[str],
+    jobs: int,
+    trace_memory: bool,
+    cache: Optional['ResultCache'],
+    limits: 'StepLimits',
+    profile: bool,
+    sample_interval: Optional[float],
+) -> Iterator['PuzzleSolution']:
+    """Solve the steps of a puzzle in a pool of worker processes.
+
+    The puzzle input is parsed once, and shared with the workers through
+    shared memory. Solutions are yielded in the steps order, each one as
+    soon as it and the steps before it are done.
+    """
+    from .runner import PuzzleTask, TaskResult, run_tasks
+    from .shared import SharedInputs
+
+    tasks = [
+        PuzzleTask(tuple(puzzle_id), step)
+        for step in range(len(puzzle.steps))
+    ]
+    done: dict[Optional[int], TaskResult] = {}
+    next_step = 0
 
-    solutions = puzzle.solve()
+    with SharedInputs() as shared:
+        shared_inputs = {}
+        if jobs > 1 and any(
+            step.parsing_puzzle is puzzle for step in puzzle.steps
+        ):
+            try:
+                shared_inputs[tuple(puzzle_id)] = shared.share(
+                    puzzle.parse(trace_memory),
+                )
+            except SaulveError as e:
+                click.echo(f'Parsed input not shared. {e}', err=True)
 
+        for result in run_tasks(
+            ctx.obj['APP_MODULE'],
+            ctx.obj['CHALLENGE_ID'],
+            tasks,
+            jobs=jobs,
+            limits=limits,
+            profile=profile,
+            sample_interval=sample_interval,
+            trace_memory=trace_memory,
+            cache=cache,
+            shared_inputs=shared_inputs,
+        ):
+            done[result.task.step] = result
+            while next_step in done:
+                result = done.pop(next_step)
+                if result.error is not None:
+                    raise click.ClickException(
+                        f'Step {next_step + 1} failed.\n{result.error}'
+                    )
+                yield from result.solutions
+                next_step += 1
+
+
+def display_puzzle_solutions(
+    puzzle: 'Puzzle',
+    solutions: Iterator['PuzzleSolution'],
+    output_format: str,
+    timings: bool,
+    puzzle_id: Sequence[str] = (),
+    profile_dir: Optional[Path] = None,
+    profile_top: int = 0,
+) -> None:
+    """Display the solutions of a puzzle.
+
+    If a profile directory is given, the profiles of the steps are saved in
+    it, and the functions they spent the most time in are displayed in text
+    format.
+    """
+    if profile_dir is not None:
+        solutions = save_profiles(solutions, profile_dir, puzzle_id)
+    else:
+        profile_top = 0
+
+    if output_format == 'json':
+        display_json(puzzle, list(solutions))
+    elif output_format == 'jsonl':
+        display_json_lines(puzzle, solutions)
+    else:
+        display_text(puzzle, solutions, timings, profile_top)
+
+    if profile_dir is not None:
+        click.echo(f'Profiles saved in {profile_dir}', err=True)
+
+
+def watch_puzzle(
+    load: Callable[[], 'Puzzle'],
+    puzzle_id: Sequence[str],
+    output_format: str,
+    timings: bool,
+    cache: Optional['ResultCache'],
+    limits: 'StepLimits',
+    profile_dir: Optional[Path] = None,
+    profile_top: int = 0,
+    sample_interval: Optional[float] = None,
+) -> None:
+    """Solve a puzzle each time its modules are modified, until interrupted.
+    """
+    from .watch import WatchSession
+
+    session = WatchSession(load)
+
+    solve_again = True
+    while True:
+        if solve_again:
+            try:
+                display_puzzle_solutions(
+                    session.puzzle,
+                    session.iter_solve(
+                        timings,
+                        cache,
+                        limits,
+                        profile=profile_dir is not None,
+                        sample_interval=sample_interval,
+                    ),
+                    output_format,
+                    timings,
+                    puzzle_id,
+                    profile_dir,
+                    profile_top,
+                )
+            except Exception:
+                click.echo(traceback.format_exc(), err=True)
+
+        click.echo('Watching for changes, press Ctrl+C to stop.', err=True)
+        try:
+            session.wait_and_reload()
+        except KeyboardInterrupt:
+            return
+        except Exception:
+            click.echo(traceback.format_exc(), err=True)
+            solve_again = False
+        else:
+            solve_again = True
+
+
+def metrics_as_dict(metrics: Optional['StepMetrics']) -> Optional[dict]:
+    return metrics._asdict() if metrics is not None else None
+
+
+def display_json(puzzle: 'Puzzle', solutions: list['PuzzleSolution']) -> None:
+    click.echo(json.dumps({
+        'puzzle': puzzle.name,
+        'parse_metrics': metrics_as_dict(puzzle.parse_metrics),
+        'solutions': [solution_as_dict(s) for s in solutions],
+    }))
+
+
+def display_json_lines(
+    puzzle: 'Puzzle',
+    solutions: Iterator['PuzzleSolution'],
+) -> None:
+    """Print a JSON object per solution, as soon as it is available.
+
+    Steps are numbered from 1, as in the text output.
+    """
+    for step, solution in enumerate(solutions, start=1):
+        click.echo(json.dumps({
+            'puzzle': puzzle.name,
+            'step': step,
+            'parse_metrics': metrics_as_dict(puzzle.parse_metrics),
+            **solution_as_dict(solution),
+        }))
+
+
+def display_text(
+    puzzle: 'Puzzle',
+    solutions: Iterator['PuzzleSolution'],
+    timings: bool,
+    profile_top: int = 0,
+) -> None:
     click.echo(f'{puzzle.name}:')
+
+    parse_displayed = False
     for solution in solutions:
-        click.echo('  ', nl=False)
-        click.echo(solution.solution if solution.is_solved else 'unsolved')
+        # The input is parsed by the first step needing it
+        if (
+            timings
+            and not parse_displayed
+            and puzzle.parse_metrics is not None
+        ):
+            click.echo(f'  parsed  ({format_metrics(puzzle.parse_metrics)})')
+            parse_displayed = True
+
+        display_solution(solution, timings, profile_top)
+
+
+def format_duration(seconds: float) -> str:
+    return f'{seconds * 1000:.2f} ms'
+
+
+def compare_benchmarks(
+    bench_id: str,
+    benchmarks: list['StepBenchmark'],
+    baseline_path: Path,
+    threshold: float,
+) -> list['Regression']:
+    from .bench import compare_to_baseline, load_baseline
+
+    try:
+        baseline = load_baseline(baseline_path)
+    except SaulveError as e:
+        raise click.ClickException(str(e)) from e
+
+    if bench_id not in baseline:
+        raise click.ClickException(f'{bench_id} is not in the baseline.')
+
+    regressions = compare_to_baseline(
+        benchmarks,
+        baseline[bench_id],
+        threshold,
+    )
+    for regression in regressions:
+        click.echo(
+            f'  step {regression.step + 1} regressed: median '
+            f'{format_duration(regression.median)} vs '
+            f'{format_duration(regression.baseline)} '
+            f'(+{(regression.ratio - 1) * 100:.1f}%)'
+        )
+
+    return regressions
+
+
+@challenge.command(help='Benchmark the steps of a puzzle.')
+@click.argument('puzzle_id', nargs=-1, required=True)
+@click.option(
+    '-r', '--repeat',
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help='Number of timed runs of each step.',
+)
+@click.option(
+    '-w', '--warmup',
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help='Number of untimed runs of each step.',
+)
+@click.option(
+    '--gc/--no-gc',
+    'keep_gc',
+    default=False,
+    help='Keep the garbage collector enabled during timed runs.',
+)
+@click.option(
+    '--save',
+    type=click.Path(dir_okay=False, path_type=Path),
+    help='Save results in a JSON baseline file.',
+)
+@click.option(
+    '--compare',
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help='Compare results with a JSON baseline file.',
+)
+@click.option(
+    '--threshold',
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help='Relative median slowdown considered as a regression.',
+)
+@click.pass_context
+def bench(
+    ctx: click.Context,
+    puzzle_id: list[str],
+    repeat: int,
+    warmup: int,
+    keep_gc: bool,
+    save: Optional[Path],
+    compare: Optional[Path],
+    threshold: float,
+) -> None:
+    """Benchmark a puzzle in the selected challenge."""
+    from .bench import benchmark_puzzle, save_baseline
+
+    puzzle = load_puzzle(ctx.obj['LOADER'], puzzle_id)
+
+    try:
+        benchmarks = benchmark_puzzle(
+            puzzle,
+            repeat=repeat,
+            warmup=warmup,
+            disable_gc=not keep_gc,
+        )
+    except SaulveError as e:
+        raise click.ClickException(str(e)) from e
+
+    click.echo(f'{puzzle.name}:')
+    if puzzle.parse_metrics is not None:
+        click.echo(
+            f'  parsed once: {format_duration(puzzle.parse_metrics.wall_time)}'
+        )
+    for benchmark in benchmarks:
+        click.echo(
+            f'  step {benchmark.step + 1}: '
+            f'min {format_duration(benchmark.min)}, '
+            f'median {format_duration(benchmark.median)}, '
+            f'p95 {format_duration(benchmark.p95)}, '
+            f'stddev {format_duration(benchmark.stddev)}'
+        )
+
+    bench_id = ' '.join(puzzle_id)
+    regressions = []
+
+    if compare is not None:
+        regressions = compare_benchmarks(
+            bench_id,
+            benchmarks,
+            compare,
+            threshold,
+        )
+
+    if save is not None:
+        try:
+            save_baseline(save, bench_id, benchmarks)
+        except SaulveError as e:
+            raise click.ClickException(str(e)) from e
+
+    if regressions:
+        raise click.ClickException(
+            f'{len(regressions)} step(s) regressed against the baseline.'
+        )
+
+
+def format_step_run(run: 'StepRun') -> str:
+    commit = (run.environment.git_commit or '-')[:10]
+    solution = run.solution
+    if solution.from_cache:
+        duration = 'cached'
+    elif solution.metrics is not None:
+        duration = format_duration(solution.metrics.wall_time)
+    else:
+        duration = '-'
+
+    answer = format_answer(solution)
+    if solution.is_correct is False:
+        answer += ' (wrong)'
+
+    local_time = run.started_at.astimezone()
+    return (
+        f'  {local_time:%Y-%m-%d %H:%M}  {commit:<10}  {duration:>12}  '
+        f'{answer}'
+    )
+
+
+@challenge.command(help='Show the recorded runs of puzzles.')
+@click.argument('selectors', nargs=-1)
+@click.option(
+    '-n', '--runs',
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help='Number of runs displayed for each step.',
+)
+@history_file_option
+@click.pass_context
+def history(
+    ctx: click.Context,
+    selectors: list[str],
+    runs: int,
+    history_file: Optional[Path],
+) -> None:
+    """Show the latest runs of the steps of all puzzles whose id starts with
+    the given selectors, from the oldest.
+    """
+    import statistics
+
+    with open_history(history_file) as run_history:
+        try:
+            step_runs = run_history.step_runs(
+                ctx.obj['CHALLENGE_ID'],
+                selectors,
+                limit=runs,
+            )
+        except SaulveError as e:
+            raise click.ClickException(str(e)) from e
+
+    if not step_runs:
+        click.echo('No recorded run.')
+        return
+
+    by_step: dict[tuple[str, int], list[StepRun]] = {}
+    for run in step_runs:
+        by_step.setdefault((run.puzzle_id, run.step), []).append(run)
+
+    for (puzzle_id, step), runs_of_step in sorted(by_step.items()):
+        click.echo(f'{puzzle_id} step {step + 1}:')
+        for run in reversed(runs_of_step):
+            click.echo(format_step_run(run))
+
+        times = [
+            run.solution.metrics.wall_time
+            for run in runs_of_step
+            if run.is_timed and run.solution.metrics is not None
+        ]
+        if times:
+            click.echo(
+                f'  median {format_duration(statistics.median(times))} '
+                f'over {len(times)} timed run(s)'
+            )
+
+
+@challenge.command(help='Find steps whose time regressed in the run history.')
+@click.argument('selectors', nargs=-1)
+@click.option(
+    '-n', '--runs',
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help='Number of runs the latest runs are compared to.',
+)
+@click.option(
+    '-w', '--window',
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help='Number of latest runs whose median time is compared.',
+)
+@click.option(
+    '--threshold',
+    type=click.FloatRange(min=0),
+    default=0.1,
+    show_default=True,
+    help='Relative median slowdown considered as a regression.',
+)
+@history_file_option
+@click.pass_context
+def regressions(
+    ctx: click.Context,
+    selectors: list[str],
+    runs: int,
+    window: int,
+    threshold: float,
+    history_file: Optional[Path],
+) -> None:
+    """Compare the median time of the latest runs of the steps of all
+    puzzles whose id starts with the given selectors, to the median time of
+    the runs preceding them.
+
+    Exits with an error status if any step regressed.
+    """
+    from .history import find_regressions
+
+    with open_history(history_file) as run_history:
+        try:
+            step_runs = run_history.step_runs(
+                ctx.obj['CHALLENGE_ID'],
+                selectors,
+            )
+        except SaulveError as e:
+            raise click.ClickException(str(e)) from e
+
+    regressed = find_regressions(step_runs, window, runs, threshold)
+    for puzzle_id, step_regressions in regressed.items():
+        click.echo(f'{puzzle_id}:')
+        for regression in step_regressions:
+            click.echo(
+                f'  step {regression.step + 1} regressed: median '
+                f'{format_duration(regression.median)} vs '
+                f'{format_duration(regression.baseline)} '
+                f'(+{(regression.ratio - 1) * 100:.1f}%)'
+            )
+
+    count = sum(len(steps) for steps in regressed.values())
+    if count:
+        raise click.ClickException(f'{count} step(s) regressed.')
+
+    click.echo('No regression.')
+
+
+def build_tasks(
+    loader: ChallengeLoader,
+    selectors: list[str],
+    split_steps: bool,
+) -> list['PuzzleTask']:
+    """Get the tasks solving all puzzles whose id starts with the selectors.
+
+    Steps are split according to the puzzle views, so that lazily discovered
+    puzzles are only imported by the workers.
+    """
+    from .runner import PuzzleTask
+
+    challenge = loader.load()
+    tasks: list[PuzzleTask] = []
+
+    for view in challenge.find():
+        puzzle_id = tuple(view.id.split())
+        if puzzle_id[:len(selectors)] != tuple(selectors):
+            continue
+
+        # Puzzles are not loaded here, the steps of those whose steps are
+        # unknown without importing them are solved by a single task.
+        if not split_steps or view.steps is None:
+            tasks.append(PuzzleTask(puzzle_id))
+            continue
+
+        tasks.extend(PuzzleTask(puzzle_id, step) for step in range(view.steps))
+
+    return tasks
+
+
+def display_task_result(result: 'TaskResult', profile_top: int = 0) -> None:
+    title = ' '.join(result.task.puzzle_id)
+    if result.name is not None:
+        title += f' - {result.name}'
+    if result.task.step is not None:
+        title += f' (step {result.task.step + 1})'
+
+    click.echo(f'{title}:')
+
+    if result.error is not None:
+        click.echo('  error', err=True)
+        click.echo(result.error, err=True)
+        return
+
+    display_solutions(result.solutions, profile_top=profile_top)
+
+
+def save_task_profiles(
+    result: 'TaskResult',
+    directory: Path,
+) -> dict[str, 'StepProfileResult']:
+    """Save the profiles of the steps of a task.
+
+    Returns:
+        The profiles, by step title.
+    """
+    profiles = {}
+    for index, solution in enumerate(result.solutions):
+        if solution.profile is not None:
+            step = result.task.step if result.task.step is not None else index
+            save_profile(
+                solution.profile,
+                directory,
+                result.task.puzzle_id,
+                step,
+            )
+            title = f'{" ".join(result.task.puzzle_id)} step {step + 1}'
+            profiles[title] = solution.profile
+
+    return profiles
+
+
+def display_hottest_steps(
+    profiles: dict[str, 'StepProfileResult'],
+    count: int,
+) -> None:
+    """Display the profiled steps that took the most time, with the function
+    they spent the most time in.
+    """
+    click.echo('Hottest steps:')
+    hottest = sorted(
+        profiles.items(),
+        key=lambda item: item[1].total_time,
+        reverse=True,
+    )
+    for title, profile in hottest[:count]:
+        line = f'  {format_duration(profile.total_time):>12}  {title}'
+        if (top := profile.top(1)):
+            line += f'  ({top[0].name})'
+        click.echo(line)
+
+
+def save_all_collapsed_stacks(
+    profiles: dict[str, 'StepProfileResult'],
+    path: Path,
+) -> None:
+    """Save the profiles of many steps in a single collapsed stacks file,
+    whose outermost frames are the steps.
+    """
+    path.write_text(''.join(
+        f'{title.replace(";", ":")};{line}\n'
+        for title, profile in profiles.items()
+        for line in profile.collapsed_stacks()
+    ))
+
+
+@challenge.command(name='solve-all', help='Solve many puzzles in parallel.')
+@click.argument('selectors', nargs=-1)
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of worker processes. Defaults to the number of CPUs. With '
+         '--asyncio, number of steps run at the same time.',
+)
+@click.option(
+    '--steps',
+    'split_steps',
+    is_flag=True,
+    help='Dispatch each puzzle step separately.',
+)
+@click.option(
+    '--asyncio',
+    'use_asyncio',
+    is_flag=True,
+    help='Run puzzles and their steps concurrently in an event loop, for '
+         'I/O bound steps.',
+)
+@limit_options
+@profile_options
+@click.pass_context
+def solve_all(
+    ctx: click.Context,
+    selectors: list[str],
+    jobs: Optional[int],
+    split_steps: bool,
+    use_asyncio: bool,
+    timeout: Optional[float],
+    max_memory: Optional[int],
+    profile: bool,
+    profile_dir: Path,
+    profile_top: int,
+    sample: bool,
+    sample_interval: Optional[float],
+) -> None:
+    """Solve all puzzles whose id starts with the given selectors.
+
+    Results are displayed as soon as they are available. Exits with an error
+    status if any puzzle failed or returned a wrong answer.
+    """
+    import asyncio
+
+    from .puzzle.isolation import StepLimits
+    from .runner import run_tasks, run_tasks_async
+
+    sample_interval = sample_interval_option(profile, sample, sample_interval)
+    profile = profile or sample
+    if profile and use_asyncio:
+        # Concurrent steps would be profiled together
+        raise click.UsageError(
+            '--profile and --sample can not be used with --asyncio.'
+        )
+
+    tasks = build_tasks(ctx.obj['LOADER'], selectors, split_steps)
+    limits = StepLimits(timeout, max_memory)
+
+    if use_asyncio:
+        failed = asyncio.run(display_task_results_async(
+            run_tasks_async(
+                ctx.obj['APP_MODULE'],
+                ctx.obj['CHALLENGE_ID'],
+                tasks,
+                concurrency=jobs,
+                limits=limits,
+            ),
+        ))
+    else:
+        failed = display_task_results(
+            run_tasks(
+                ctx.obj['APP_MODULE'],
+                ctx.obj['CHALLENGE_ID'],
+                tasks,
+                jobs=jobs,
+                limits=limits,
+                profile=profile,
+                sample_interval=sample_interval,
+            ),
+            profile_dir if profile else None,
+            profile_top,
+        )
+
+    if failed:
+        raise click.ClickException(f'{failed} of {len(tasks)} tasks failed.')
+
+
+def display_task_results(
+    results: Iterator['TaskResult'],
+    profile_dir: Optional[Path] = None,
+    profile_top: int = 0,
+) -> int:
+    """Display task results as they are available.
+
+    If a profile directory is given, the profiles of the steps are saved in
+    it. Once all tasks are done, the profiles of all steps are saved in a
+    single collapsed stacks file, and the steps that took the most time are
+    displayed.
+
+    Returns:
+        The number of failed tasks.
+    """
+    failed = 0
+    profiles: dict[str, StepProfileResult] = {}
+    for result in results:
+        if profile_dir is not None:
+            profiles.update(save_task_profiles(result, profile_dir))
+        display_task_result(result, profile_top)
+        failed += result.is_failed
+
+    if profile_dir is not None:
+        if profiles:
+            save_all_collapsed_stacks(
+                profiles,
+                profile_dir / 'all-steps.collapsed',
+            )
+        if profile_top:
+            display_hottest_steps(profiles, profile_top)
+        click.echo(f'Profiles saved in {profile_dir}', err=True)
+
+    return failed
+
+
+async def display_task_results_async(
+    results: AsyncIterator['TaskResult'],
+) -> int:
+    """Display task results as they are available.
+
+    Returns:
+        The number of failed tasks.
+    """
+    failed = 0
+    async for result in results:
+        display_task_result(result)
+        failed += result.is_failed
+
+    return failed
+
+
+def task_durations(
+    challenge_id: str,
+    tasks: list['PuzzleTask'],
+    history_file: Optional[Path],
+) -> dict['PuzzleTask', float]:
+    """Estimate the duration of tasks from the run history.
+
+    A history that can't be read is reported, tasks then being dispatched
+    in their original order.
+    """
+    from .distributed import estimate_durations
+    from .history import RunHistory, default_history_path
+
+    try:
+        with RunHistory(history_file or default_history_path()) as history:
+            runs = history.step_runs(challenge_id, limit=10)
+    except SaulveError as e:
+        click.echo(f'Run history not used. {e}', err=True)
+        return {}
+
+    return estimate_durations(runs, tasks)
+
+
+@challenge.command(
+    help='Dispatch puzzles to workers, on this or other machines.',
+)
+@click.argument('selectors', nargs=-1)
+@click.option(
+    '--bind',
+    'address',
+    default='localhost:7878',
+    show_default=True,
+    help='Address to listen on for workers. Use 0.0.0.0:PORT to accept '
+         'workers of other machines.',
+)
+@click.option(
+    '--steps',
+    'split_steps',
+    is_flag=True,
+    help='Dispatch each puzzle step separately.',
+)
+@click.option(
+    '--retries',
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help='Number of times a task is dispatched again when its worker is '
+         'lost.',
+)
+@click.option(
+    '--task-timeout',
+    type=click.FloatRange(min=0, min_open=True),
+    help='Seconds a worker has to solve a task. The worker is then '
+         'considered lost, and the task dispatched again.',
+)
+@click.option(
+    '--wait',
+    'worker_timeout',
+    type=click.FloatRange(min=0, min_open=True),
+    default=600,
+    show_default=True,
+    help='Seconds to wait while no worker is connected, before giving up.',
+)
+@limit_options
+@history_file_option
+@click.pass_context
+def coordinator(
+    ctx: click.Context,
+    selectors: list[str],
+    address: str,
+    split_steps: bool,
+    retries: int,
+    task_timeout: Optional[float],
+    worker_timeout: float,
+    timeout: Optional[float],
+    max_memory: Optional[int],
+    history_file: Optional[Path],
+) -> None:
+    """Solve all puzzles whose id starts with the given selectors, on the
+    workers connecting to the coordinator.
+
+    Results are displayed as soon as they are available. Exits with an error
+    status if any puzzle failed or returned a wrong answer.
+    """
+    from .distributed import Coordinator, parse_address, schedule_tasks
+    from .puzzle.isolation import StepLimits
+
+    try:
+        bind_address = parse_address(address)
+    except ValidationError as e:
+        raise click.BadParameter(str(e), param_hint='--bind') from e
+
+    tasks = build_tasks(ctx.obj['LOADER'], selectors, split_steps)
+    tasks = schedule_tasks(
+        tasks,
+        task_durations(ctx.obj['CHALLENGE_ID'], tasks, history_file),
+    )
+
+    try:
+        server = Coordinator(
+            bind_address,
+            ctx.obj['CHALLENGE_ID'],
+            tasks,
+            StepLimits(timeout, max_memory),
+            retries,
+            task_timeout,
+        )
+    except SaulveError as e:
+        raise click.ClickException(str(e)) from e
+
+    with server:
+        host, port = server.address
+        click.echo(
+            f'Waiting for workers on {host}:{port}, {len(tasks)} tasks.',
+            err=True,
+        )
+        try:
+            failed = display_task_results(server.results(worker_timeout))
+        except SaulveError as e:
+            raise click.ClickException(str(e)) from e
+
+    for stats in server.workers.values():
+        line = (
+            f'Worker {stats.name}: {stats.tasks} tasks, '
+            f'{format_duration(stats.busy_time)} busy'
+        )
+        if stats.lost_tasks:
+            line += f', {stats.lost_tasks} lost'
+        click.echo(line, err=True)
+
+    if failed:
+        raise click.ClickException(f'{failed} of {len(tasks)} tasks failed.')
+
+
+@challenge.command(help='Solve the puzzles dispatched by a coordinator.')
+@click.argument('address')
+@click.option(
+    '-j', '--jobs',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='Number of worker processes.',
+)
+@click.pass_context
+def worker(ctx: click.Context, address: str, jobs: int) -> None:
+    """Connect to the coordinator at ADDRESS (host:port), and solve the
+    puzzles it sends until it is done.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .distributed import parse_address, run_worker
+
+    try:
+        coordinator_address = parse_address(address)
+    except ValidationError as e:
+        raise click.BadParameter(str(e), param_hint='ADDRESS') from e
+
+    args = (
+        coordinator_address,
+        ctx.obj['APP_MODULE'],
+        ctx.obj['CHALLENGE_ID'],
+    )
+    try:
+        if jobs == 1:
+            solved = run_worker(*args)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = [
+                    executor.submit(run_worker, *args) for _ in range(jobs)
+                ]
+                solved = sum(future.result() for future in futures)
+    except SaulveError as e:
+        raise click.ClickException(str(e)) from e
+
+    click.echo(f'{solved} tasks solved.', err=True)
@@ -0,0 +1,475 @@
+"""A daemon running saulve commands, and its client.
+
+The daemon keeps imported challenges and parsed puzzle inputs in memory
+between commands, saving the interpreter startup and application import of
+each run. Modules modified since the previous command are reloaded before
+running a command, and inputs are parsed again if the inputs of their parser,
+such as input files, changed.
+
+The daemon listens on a Unix socket, only accessible to its user, and clients
+only connect to sockets owned by their user. Messages are JSON objects, one per
+line.
+A client sends a single request, along with the file of the application
+package it would import:
+
+    {"args": ["--app", "challenges", "aoc", "solve", "2022", "1"],
+     "cwd": "/home/user/project", "env": {"SAULVE_CACHE": "1"},
+     "app": "/home/user/project/challenges/__init__.py"}
+
+The daemon runs the command and answers with its output, as soon as it is
+written, followed by the command exit code:
+
+    {"stdout": "Calorie Counting:\\n"}
+    {"stderr": "..."}
+    {"exit_code": 0}
+
+A daemon only runs the commands of the application it was started for, other
+requests are answered with `{"refused": "..."}`, and run by the client itself.
+
+Commands are run one at a time.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import traceback
+import weakref
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, TextIO
+
+from .errors import SaulveError
+from .import_module import locate_module
+
+if TYPE_CHECKING:
+    from .puzzle import Puzzle
+
+__all__ = [
+    'DAEMON_COMMANDS',
+    'DaemonServer',
+    'default_socket_path',
+    'run_in_daemon',
+    'uses_daemon',
+]
+
+logger = logging.getLogger(__name__)
+
+# Commands that can be run by the daemon
+DAEMON_COMMANDS = frozenset(['list', 'status', 'solve', 'bench'])
+
+# Prefix of the client environment variables forwarded to the daemon
+ENV_PREFIX = 'SAULVE_'
+
+
+def default_socket_path() -> Path:
+    """The daemon socket, that can be set with the SAULVE_SOCKET environment
+    variable.
+
+    Defaults to the user runtime directory. Otherwise, the socket is in a
+    directory of the temporary directory, private to the user.
+    """
+    if (path := os.environ.get('SAULVE_SOCKET')):
+        return Path(path)
+
+    if (runtime_dir := os.environ.get('XDG_RUNTIME_DIR')):
+        return Path(runtime_dir) / 'saulve.sock'
+
+    private_dir = Path(tempfile.gettempdir()) / f'saulve-{os.getuid()}'
+    return private_dir / 'daemon.sock'
+
+
+def _send(stream: Any, message: dict[str, Any]) -> None:
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+class _MessageWriter(io.RawIOBase):
+    """Sends everything written to it as messages of a given kind."""
+
+    def __init__(self, stream: Any, kind: str) -> None:
+        self.stream = stream
+        self.kind = kind
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        _send(self.stream, {self.kind: bytes(data).decode(errors='replace')})
+        return len(data)
+
+
+def _text_writer(stream: Any, kind: str) -> TextIO:
+    return io.TextIOWrapper(
+        io.BufferedWriter(_MessageWriter(stream, kind)),
+        encoding='utf-8',
+        line_buffering=True,
+    )
+
+
+@contextmanager
+def _request_context(cwd: str, env: dict[str, str]) -> Iterator[None]:
+    """Run in the client working directory, with its saulve environment
+    variables.
+
+    Raises:
+        SaulveError: If the working directory can't be entered.
+    """
+    previous_cwd = os.getcwd()
+    previous_env = {
+        name: value
+        for name, value in os.environ.items()
+        if name.startswith(ENV_PREFIX)
+    }
+
+    try:
+        os.chdir(cwd)
+    except OSError as e:
+        raise SaulveError(f'Could not enter {cwd}: {e}') from e
+
+    try:
+        for name in previous_env:
+            del os.environ[name]
+        os.environ.update({
+            name: value
+            for name, value in env.items()
+            if name.startswith(ENV_PREFIX)
+        })
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        for name in list(os.environ):
+            if name.startswith(ENV_PREFIX):
+                del os.environ[name]
+        os.environ.update(previous_env)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: 'DaemonServer'
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            # The client closed the connection without sending a request,
+            # such as a check that a daemon is listening.
+            return
+
+        try:
+            request = json.loads(line)
+            args = [str(arg) for arg in request['args']]
+            cwd = str(request['cwd'])
+            env = dict(request.get('env', {}))
+            app = request.get('app')
+        except (ValueError, KeyError, TypeError):
+            try:
+                _send(self.wfile, {'stderr': 'Invalid request.\n'})
+                _send(self.wfile, {'exit_code': 2})
+            except OSError:
+                pass
+            return
+
+        if not self.server.serves(app):
+            try:
+                _send(self.wfile, {
+                    'refused': f'The daemon serves {self.server.app}.',
+                })
+            except OSError:
+                pass
+            return
+
+        stdout = _text_writer(self.wfile, 'stdout')
+        stderr = _text_writer(self.wfile, 'stderr')
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                exit_code = self.server.run_command(args, cwd, env)
+            stdout.flush()
+            stderr.flush()
+        except OSError:
+            # The client went away
+            return
+
+        try:
+            _send(self.wfile, {'exit_code': exit_code})
+        except OSError:
+            pass
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Runs saulve commands sent on a Unix socket.
+
+    Arguments:
+        path: The socket path.
+        command: Runs a command line, as a list of arguments, and returns
+            its exit code.
+        roots: Directories whose modified modules are reloaded before each
+            command.
+        app: File of the application package, as found by `locate_module`.
+            Requests for other applications are refused. Any application is
+            served if None.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        command: Callable[[list[str]], int],
+        roots: list[Path],
+        app: Optional[Path] = None,
+    ) -> None:
+        # Imported here, clients don't need it
+        from .watch import ModuleWatcher
+
+        self.path = path
+        self.command = command
+        self.app = app
+        self.watcher = ModuleWatcher(roots)
+        # Digest of the parser inputs of resident puzzles, when their input
+        # was last known to be up to date
+        self._parser_inputs: weakref.WeakKeyDictionary[
+            'Puzzle', Optional[bytes]
+        ] = weakref.WeakKeyDictionary()
+
+        _make_private_directory(path.parent)
+        if path.exists():
+            if _is_listening(path):
+                raise SaulveError(f'A daemon is already listening on {path}.')
+            path.unlink()
+
+        super().__init__(str(path), _RequestHandler)
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        # Other users must not run commands as the daemon user
+        os.chmod(self.path, 0o600)
+
+    def serves(self, app: Optional[str]) -> bool:
+        """Whether the daemon runs the commands of an application, given
+        the file of its package.
+        """
+        return self.app is None or (
+            app is not None and Path(app) == self.app
+        )
+
+    def reload(self) -> None:
+        """Reload the modules modified since the last command."""
+        from .watch import reload_modules
+
+        modified = self.watcher.poll()
+        if not modified:
+            return
+
+        try:
+            reloaded = reload_modules(modified, self.watcher.watched_modules())
+        except Exception:
+            traceback.print_exc()
+            return
+
+        logger.info(f'Reloaded modules: {", ".join(reloaded)}')
+
+    def _resident_puzzles(self) -> list['Puzzle']:
+        """Puzzles with a parser, held by watched modules."""
+        from .puzzle import Puzzle
+
+        return [
+            value
+            for module in self.watcher.watched_modules().values()
+            for value in list(vars(module).values())
+            if isinstance(value, Puzzle) and value.parser_fn is not None
+        ]
+
+    def refresh_parsed_inputs(self) -> None:
+        """Clear the parsed input of puzzles whose parser inputs, such as
+        input files, changed since the previous command.
+        """
+        for puzzle in self._resident_puzzles():
+            digest = _parser_inputs_digest(puzzle)
+            if digest is None or digest != self._parser_inputs.get(puzzle):
+                puzzle.clear_parsed_input()
+            self._parser_inputs[puzzle] = digest
+
+    def _record_parser_inputs(self) -> None:
+        """Record the parser inputs of the puzzles imported by a command."""
+        for puzzle in self._resident_puzzles():
+            if puzzle not in self._parser_inputs:
+                self._parser_inputs[puzzle] = _parser_inputs_digest(puzzle)
+
+    def run_command(
+        self,
+        args: list[str],
+        cwd: str,
+        env: dict[str, str],
+    ) -> int:
+        try:
+            with _request_context(cwd, env):
+                self.reload()
+                self.refresh_parsed_inputs()
+                try:
+                    return self.command(args)
+                except Exception:
+                    traceback.print_exc()
+                    return 1
+                finally:
+                    # Puzzles are imported by the commands
+                    self.watcher.watch_new_modules()
+                    self._record_parser_inputs()
+        except SaulveError as e:
+            print(f'Error: {e}', file=sys.stderr)
+            return 1
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def _parser_inputs_digest(puzzle: 'Puzzle') -> Optional[bytes]:
+    """Digest of the inputs of a puzzle parser, including the content of
+    input files. None if the inputs can't be hashed.
+    """
+    from .puzzle.cache import hash_step_inputs
+
+    assert puzzle.parser_fn is not None
+    digest = hashlib.sha256()
+    if not hash_step_inputs(puzzle.parser_fn, digest):
+        return None
+
+    return digest.digest()
+
+
+def _make_private_directory(directory: Path) -> None:
+    """Create the directory of the socket, only accessible to the current
+    user if it does not exist.
+
+    Raises:
+        SaulveError: If the directory is owned by another user.
+    """
+    try:
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        owner = directory.stat().st_uid
+    except OSError as e:
+        raise SaulveError(f'Could not create {directory}: {e}') from e
+
+    if owner != os.getuid():
+        raise SaulveError(f'{directory} is owned by another user.')
+
+
+def _is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+
+    return True
+
+
+def uses_daemon(args: list[str]) -> bool:
+    """Whether a command line can be run by a daemon.
+
+    The daemon is not used if the SAULVE_NO_DAEMON environment variable is
+    set.
+    """
+    if os.environ.get('SAULVE_NO_DAEMON') or '--watch' in args:
+        return False
+
+    positional = []
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+        elif arg in ('-a', '--app'):
+            skip_next = True
+        elif not arg.startswith('-'):
+            positional.append(arg)
+
+        if len(positional) == 2:
+            break
+
+    return len(positional) == 2 and positional[1] in DAEMON_COMMANDS
+
+
+def _app_module(args: list[str]) -> Optional[str]:
+    """The application module of a command line."""
+    for option, value in zip(args, args[1:], strict=False):
+        if option in ('-a', '--app'):
+            return value
+
+    return os.environ.get('SAULVE_CHALLENGES')
+
+
+def run_in_daemon(
+    args: list[str],
+    path: Optional[Path] = None,
+    stdout: Optional[TextIO] = None,
+    stderr: Optional[TextIO] = None,
+) -> Optional[int]:
+    """Run a command line in a running daemon.
+
+    Arguments:
+        args: The command line arguments.
+        path: The daemon socket. Defaults to `default_socket_path`.
+        stdout: Where to write the command output. Defaults to the standard
+            output.
+        stderr: Where to write the command errors. Defaults to the standard
+            error.
+
+    Returns:
+        The exit code of the command, or None if no daemon is running, if
+        the socket is owned by another user, or if the daemon serves another
+        application.
+    """
+    path = path or default_socket_path()
+    outputs = {
+        'stdout': stdout or sys.stdout,
+        'stderr': stderr or sys.stderr,
+    }
+
+    try:
+        owner = path.stat().st_uid
+    except OSError:
+        return None
+
+    if owner != os.getuid():
+        # Another user could answer in place of the daemon
+        logger.warning(f'Ignoring daemon socket {path} of another user.')
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+
+    app_module = _app_module(args)
+    app = locate_module(app_module) if app_module else None
+    with sock, sock.makefile('rwb') as stream:
+        _send(stream, {
+            'args': args,
+            'cwd': os.getcwd(),
+            'env': {
+                name: value
+                for name, value in os.environ.items()
+                if name.startswith(ENV_PREFIX)
+            },
+            'app': str(app) if app is not None else None,
+        })
+
+        for line in stream:
+            message = json.loads(line)
+            if 'refused' in message:
+                logger.info(f'Not run by the daemon: {message["refused"]}')
+                return None
+            if 'exit_code' in message:
+                return int(message['exit_code'])
+
+            for kind, output in outputs.items():
+                if kind in message:
+                    output.write(message[kind])
+                    output.flush()
+
+    outputs['stderr'].write('The daemon closed the connection.\n')
+    return 1
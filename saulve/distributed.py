@@ -0,0 +1,610 @@
+"""Solve puzzles on many machines.
+
+A coordinator dispatches puzzle tasks to workers connecting to it over TCP.
+Workers import the application themselves, so that the challenges must be
+available on every machine, at the same version.
+
+Messages are JSON objects, one per line. A worker introduces itself with the
+challenge it solves puzzles of:
+
+    {"hello": {"challenge": "aoc", "host": "box-2", "pid": 1234}}
+
+The coordinator then sends it tasks, one at a time, along with the default
+limits of the steps:
+
+    {"task": {"id": 3, "puzzle_id": ["2022", "01"], "step": null,
+              "limits": {"timeout": 60, "max_memory": null}}}
+
+The worker solves the task and sends its result:
+
+    {"result": {"id": 3, "name": "Calorie Counting", "error": null,
+                "solutions": [{"solution": "121", "is_correct": true, ...}]}}
+
+Once all tasks are done, the coordinator sends `{"done": true}` and closes the
+connection. A worker introducing itself with another challenge receives
+`{"error": "..."}` instead.
+
+Workers pull tasks as soon as they are free, so that faster workers solve more
+tasks. Tasks are dispatched from the longest to the shortest, according to
+their duration in the run history, so that long tasks do not end up last on a
+single worker. Tasks never run before are dispatched first.
+
+Tasks in progress on a worker whose connection is lost, because it crashed or
+was killed, are dispatched again to other workers. So are tasks a worker takes
+too long to solve, when the coordinator has a task timeout: the worker is
+disconnected, as it may be stuck.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import platform
+import queue
+import socket
+import socketserver
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from .errors import SaulveError, ValidationError
+from .history import StepRun
+from .puzzle.core import PuzzleSolution, StepStatus
+from .puzzle.isolation import StepLimits
+from .puzzle.metrics import StepMetrics
+from .runner import PuzzleTask, TaskResult, run_task
+
+__all__ = [
+    'Coordinator',
+    'WorkerStats',
+    'estimate_durations',
+    'parse_address',
+    'run_worker',
+    'schedule_tasks',
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 7878
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Parse a `host:port` address. The port defaults to 7878.
+
+    Raises:
+        ValidationError: If the port is not valid.
+    """
+    host, separator, port = address.rpartition(':')
+    if not separator:
+        return address, DEFAULT_PORT
+
+    try:
+        port_number = int(port)
+    except ValueError as e:
+        raise ValidationError(f"'{port}' is not a valid port.") from e
+
+    if not 0 <= port_number < 65536:
+        raise ValidationError(f"'{port}' is not a valid port.")
+
+    return host.strip('[]') or 'localhost', port_number
+
+
+def _id_words(puzzle_id: Sequence[str]) -> tuple[int | str, ...]:
+    """Words of a puzzle id, numeric words being compared as numbers, as
+    puzzle filters do.
+    """
+    return tuple(int(word) if word.isdigit() else word for word in puzzle_id)
+
+
+def estimate_durations(
+    runs: Iterable[StepRun],
+    tasks: Iterable[PuzzleTask],
+) -> dict[PuzzleTask, float]:
+    """Estimate the duration of tasks from the run history.
+
+    The duration of a step is the median wall time of its timed runs. The
+    duration of a whole puzzle is the sum of the durations of its steps.
+
+    Arguments:
+        runs: Runs of the steps of the challenge puzzles.
+        tasks: The tasks to estimate.
+
+    Returns:
+        The estimated duration of the tasks whose steps have been timed, in
+        seconds.
+    """
+    times: dict[tuple[tuple[int | str, ...], int], list[float]] = {}
+    for run in runs:
+        if run.is_timed:
+            assert run.solution.metrics is not None
+            key = (_id_words(run.puzzle_id.split()), run.step)
+            times.setdefault(key, []).append(run.solution.metrics.wall_time)
+
+    steps: dict[tuple[int | str, ...], dict[int, float]] = {}
+    for (puzzle_id, step), step_times in times.items():
+        steps.setdefault(puzzle_id, {})[step] = statistics.median(step_times)
+
+    durations: dict[PuzzleTask, float] = {}
+    for task in tasks:
+        puzzle_steps = steps.get(_id_words(task.puzzle_id), {})
+        if task.step is None and puzzle_steps:
+            durations[task] = sum(puzzle_steps.values())
+        elif task.step is not None and task.step in puzzle_steps:
+            durations[task] = puzzle_steps[task.step]
+
+    return durations
+
+
+def schedule_tasks(
+    tasks: Iterable[PuzzleTask],
+    durations: dict[PuzzleTask, float],
+) -> list[PuzzleTask]:
+    """Order tasks from the longest to the shortest. Tasks of unknown
+    duration come first.
+    """
+    return sorted(
+        tasks,
+        key=lambda task: (task in durations, -durations.get(task, 0)),
+    )
+
+
+def _send(stream: Any, message: dict[str, Any]) -> None:
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+def _receive(stream: Any) -> Optional[dict[str, Any]]:
+    """Read a message. Returns None if the connection is closed."""
+    line = stream.readline()
+    if not line:
+        return None
+
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError('Message is not an object.')
+
+    return message
+
+
+def _solution_as_dict(solution: PuzzleSolution) -> dict[str, Any]:
+    # Profiles are not sent
+    return {
+        'solution': solution.solution,
+        'is_correct': solution.is_correct,
+        'metrics': (
+            list(solution.metrics) if solution.metrics is not None else None
+        ),
+        'from_cache': solution.from_cache,
+        'status': solution.status.value,
+        'case': solution.case,
+    }
+
+
+def _solution_from_dict(data: dict[str, Any]) -> PuzzleSolution:
+    metrics = data['metrics']
+    return PuzzleSolution(
+        solution=data['solution'],
+        is_correct=data['is_correct'],
+        metrics=StepMetrics(*metrics) if metrics is not None else None,
+        from_cache=bool(data['from_cache']),
+        status=StepStatus(data['status']),
+        case=data['case'],
+    )
+
+
+class WorkerStats(NamedTuple):
+    """What a worker did for the coordinator.
+
+    Attributes:
+        name: The worker host and process id.
+        tasks: Number of tasks solved by the worker.
+        busy_time: Wall time of the steps the worker ran, in seconds.
+        lost_tasks: Number of tasks lost when the worker connection was
+            lost.
+    """
+    name: str
+    tasks: int = 0
+    busy_time: float = 0
+    lost_tasks: int = 0
+
+
+class _Dispatch:
+    """Tasks waiting to be solved, shared by the worker connections."""
+
+    def __init__(self, tasks: Sequence[PuzzleTask], retries: int) -> None:
+        self.tasks = list(tasks)
+        self.retries = retries
+        self.pending: deque[int] = deque(range(len(self.tasks)))
+        self.attempts = [0] * len(self.tasks)
+        self.remaining = len(self.tasks)
+        self.is_closed = False
+        self.results: queue.Queue[TaskResult] = queue.Queue()
+        self.condition = threading.Condition()
+
+    def take(self) -> Optional[int]:
+        """Wait for a task to dispatch. Returns None once all tasks are done,
+        or the dispatch is closed.
+        """
+        with self.condition:
+            while not self.pending and self.remaining and not self.is_closed:
+                self.condition.wait()
+
+            if not self.remaining or self.is_closed:
+                return None
+
+            task_id = self.pending.popleft()
+            self.attempts[task_id] += 1
+            return task_id
+
+    def complete(self, task_id: int, result: TaskResult) -> None:
+        with self.condition:
+            self.remaining -= 1
+            self.condition.notify_all()
+        self.results.put(result)
+
+    def close(self) -> None:
+        """Stop dispatching tasks."""
+        with self.condition:
+            self.is_closed = True
+            self.condition.notify_all()
+
+    def lose(self, task_id: int, worker: str) -> None:
+        """Dispatch again a task whose worker has been lost, unless it has
+        been lost too many times.
+        """
+        if self.attempts[task_id] <= self.retries:
+            with self.condition:
+                # Retried first, as it may be a long task
+                self.pending.appendleft(task_id)
+                self.condition.notify_all()
+            return
+
+        self.complete(task_id, TaskResult(
+            self.tasks[task_id],
+            None,
+            [],
+            f'Task lost {self.attempts[task_id]} times, last by worker '
+            f'{worker}.\n',
+        ))
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    server: '_CoordinatorServer'
+
+    def setup(self) -> None:
+        super().setup()
+        # Detect hosts vanishing without closing their connection
+        self.connection.setsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_KEEPALIVE,
+            1,
+        )
+
+    def handle(self) -> None:
+        coordinator = self.server.coordinator
+
+        try:
+            hello = _receive(self.rfile)
+            if hello is None:
+                return
+            info = hello['hello']
+            worker = f'{info["host"]}:{info["pid"]}'
+            challenge_id = str(info['challenge'])
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f'Invalid hello from {self.client_address}')
+            return
+
+        if challenge_id != coordinator.challenge_id:
+            _send(self.wfile, {
+                'error': f'The coordinator solves {coordinator.challenge_id} '
+                         f'puzzles, not {challenge_id}.',
+            })
+            return
+
+        coordinator.connected(worker)
+        try:
+            self._serve(worker)
+        finally:
+            coordinator.disconnected(worker)
+
+    def _serve(self, worker: str) -> None:
+        coordinator = self.server.coordinator
+        dispatch = coordinator.dispatch
+
+        while (task_id := dispatch.take()) is not None:
+            task = dispatch.tasks[task_id]
+            coordinator.busy.add(self.connection)
+            try:
+                _send(self.wfile, {'task': {
+                    'id': task_id,
+                    'puzzle_id': list(task.puzzle_id),
+                    'step': task.step,
+                    'limits': coordinator.limits._asdict(),
+                }})
+                self.connection.settimeout(coordinator.task_timeout)
+                message = _receive(self.rfile)
+                self.connection.settimeout(None)
+                if message is None:
+                    raise ConnectionError('Connection closed.')
+                result = message['result']
+                if result['id'] != task_id:
+                    raise ValueError(f'Result of unknown task {result["id"]}.')
+                task_result = TaskResult(
+                    task,
+                    result['name'],
+                    [
+                        _solution_from_dict(solution)
+                        for solution in result['solutions']
+                    ],
+                    result['error'],
+                )
+            except TimeoutError:
+                logger.warning(
+                    f'Lost worker {worker}: task {task_id} not solved in '
+                    f'{coordinator.task_timeout} seconds'
+                )
+                coordinator.lost(worker)
+                dispatch.lose(task_id, worker)
+                return
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f'Lost worker {worker}: {e}')
+                coordinator.lost(worker)
+                dispatch.lose(task_id, worker)
+                return
+            finally:
+                coordinator.busy.discard(self.connection)
+
+            coordinator.solved(worker, task_result)
+            dispatch.complete(task_id, task_result)
+
+        try:
+            _send(self.wfile, {'done': True})
+        except OSError:
+            pass
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    # Workers are told that the coordinator is done before it exits
+    block_on_close = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        coordinator: 'Coordinator',
+    ) -> None:
+        self.coordinator = coordinator
+        super().__init__(address, _WorkerHandler)
+
+
+class Coordinator:
+    """Dispatches puzzle tasks to the workers connecting to it.
+
+    The coordinator serves workers as soon as it is created.
+
+    Example:
+        >>> with Coordinator(('0.0.0.0', 7878), 'aoc', tasks) as coordinator:
+        ...     for result in coordinator.results():
+        ...         print(result)
+
+    Arguments:
+        address: The host and port to listen on. Port 0 picks a free port.
+        challenge_id: Id of the challenge the puzzles belong to.
+        tasks: The puzzles to solve, in dispatch order.
+        limits: Default resource limits of the puzzle steps.
+        retries: Number of times a task is dispatched again when its worker
+            is lost.
+        task_timeout: Seconds a worker has to solve a task, before it is
+            considered lost. Unlimited if None.
+
+    Raises:
+        SaulveError: If the coordinator can't listen on the address.
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        challenge_id: str,
+        tasks: Sequence[PuzzleTask],
+        limits: Optional[StepLimits] = None,
+        retries: int = 2,
+        task_timeout: Optional[float] = None,
+    ) -> None:
+        self.challenge_id = challenge_id
+        self.limits = limits or StepLimits()
+        self.task_timeout = task_timeout
+        self.dispatch = _Dispatch(tasks, retries)
+        self.workers: dict[str, WorkerStats] = {}
+        # Connections of the workers solving a task
+        self.busy: set[socket.socket] = set()
+        self._lock = threading.Lock()
+        self._connections = 0
+        # Since when no worker is connected, None while some are
+        self._idle_since: Optional[float] = time.monotonic()
+
+        try:
+            self._server = _CoordinatorServer(address, self)
+        except OSError as e:
+            raise SaulveError(f'Could not listen on {address}: {e}') from e
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The address the coordinator listens on."""
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def __enter__(self) -> 'Coordinator':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def connected(self, worker: str) -> None:
+        with self._lock:
+            self.workers.setdefault(worker, WorkerStats(worker))
+            self._connections += 1
+            self._idle_since = None
+        logger.info(f'Worker {worker} connected')
+
+    def disconnected(self, worker: str) -> None:
+        with self._lock:
+            self._connections -= 1
+            if not self._connections:
+                self._idle_since = time.monotonic()
+
+    def solved(self, worker: str, result: TaskResult) -> None:
+        busy_time = sum(
+            solution.metrics.wall_time
+            for solution in result.solutions
+            if solution.metrics is not None
+        )
+        with self._lock:
+            stats = self.workers[worker]
+            self.workers[worker] = stats._replace(
+                tasks=stats.tasks + 1,
+                busy_time=stats.busy_time + busy_time,
+            )
+
+    def lost(self, worker: str) -> None:
+        with self._lock:
+            stats = self.workers[worker]
+            self.workers[worker] = stats._replace(
+                lost_tasks=stats.lost_tasks + 1,
+            )
+
+    def results(
+        self,
+        worker_timeout: Optional[float] = None,
+    ) -> Iterator[TaskResult]:
+        """Wait for the results of all tasks.
+
+        Results are yielded as soon as their task is done, so they don't
+        follow the tasks order.
+
+        Arguments:
+            worker_timeout: Seconds to wait while no worker is connected,
+                before giving up. Waits forever if None.
+
+        Raises:
+            SaulveError: If no worker was connected for `worker_timeout`
+                seconds.
+        """
+        for done in range(len(self.dispatch.tasks)):
+            while True:
+                try:
+                    result = self.dispatch.results.get(
+                        timeout=self._idle_time_left(worker_timeout),
+                    )
+                    break
+                except queue.Empty:
+                    pass
+
+                if self._idle_time_left(worker_timeout) == 0:
+                    raise SaulveError(
+                        f'No worker connected for {worker_timeout} seconds, '
+                        f'{len(self.dispatch.tasks) - done} tasks left.'
+                    )
+
+            yield result
+
+    def _idle_time_left(
+        self,
+        worker_timeout: Optional[float],
+    ) -> Optional[float]:
+        """Seconds left before giving up on workers. While some are
+        connected, they all may disconnect within worker_timeout seconds.
+        """
+        with self._lock:
+            idle_since = self._idle_since
+        if worker_timeout is None or idle_since is None:
+            return worker_timeout
+
+        return max(0, idle_since + worker_timeout - time.monotonic())
+
+    def close(self) -> None:
+        """Stop listening. Idle workers are told that the coordinator is
+        done, and workers still solving a task are disconnected.
+        """
+        self.dispatch.close()
+        for connection in list(self.busy):
+            with contextlib.suppress(OSError):
+                connection.shutdown(socket.SHUT_RDWR)
+
+        self._server.shutdown()
+        self._thread.join()
+        self._server.server_close()
+
+
+def run_worker(
+    address: tuple[str, int],
+    app_module: str,
+    challenge_id: str,
+) -> int:
+    """Solve the tasks sent by a coordinator, until it is done.
+
+    Arguments:
+        address: The coordinator address.
+        app_module: The application module, as given to `import_app`.
+        challenge_id: Id of the challenge the puzzles belong to.
+
+    Returns:
+        The number of solved tasks.
+
+    Raises:
+        SaulveError: If the coordinator can't be reached, or refused the
+            worker.
+    """
+    try:
+        sock = socket.create_connection(address)
+    except OSError as e:
+        raise SaulveError(
+            f'Could not connect to coordinator {address[0]}:{address[1]}: '
+            f'{e}'
+        ) from e
+
+    solved = 0
+    with sock, sock.makefile('rwb') as stream:
+        try:
+            _send(stream, {'hello': {
+                'challenge': challenge_id,
+                'host': platform.node(),
+                'pid': os.getpid(),
+            }})
+
+            while (message := _receive(stream)) is not None:
+                if 'error' in message:
+                    raise SaulveError(
+                        f'Refused by coordinator: {message["error"]}'
+                    )
+                if message.get('done'):
+                    break
+
+                task = message['task']
+                result = run_task(
+                    app_module,
+                    challenge_id,
+                    PuzzleTask(tuple(task['puzzle_id']), task['step']),
+                    StepLimits(**task['limits']),
+                )
+                _send(stream, {'result': {
+                    'id': task['id'],
+                    'name': result.name,
+                    'solutions': [
+                        _solution_as_dict(solution)
+                        for solution in result.solutions
+                    ],
+                    'error': result.error,
+                }})
+                solved += 1
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise SaulveError(f'Lost coordinator: {e}') from e
+
+    return solved
@@ -47,3 +47,15 @@ class WrongStepSolution(SaulveError):
     """Raised when the solution returned by a puzzle step is not the expected
     one.
     """
+
+
+class StepTimeout(SaulveError):
+    """Raised when an isolated solution step exceeds its time limit."""
+
+
+class StepOutOfMemory(SaulveError):
+    """Raised when an isolated solution step exceeds its memory limit."""
+
+
+class StepCrashed(SaulveError):
+    """Raised when an isolated solution step fails or its process dies."""
@@ -0,0 +1,386 @@
+"""Keep the history of puzzle runs in a SQLite database.
+
+Each run of a puzzle is recorded along with the environment it ran in, and
+the answer and timings of its steps. The history tells how the time of a step
+evolved, and which steps got slower.
+"""
+
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+from .bench import Regression
+from .challenges.filters import id_starts_with
+from .errors import SaulveError
+from .puzzle.core import PuzzleSolution, StepStatus
+from .puzzle.metrics import StepMetrics
+
+__all__ = [
+    'RunEnvironment',
+    'RunHistory',
+    'StepRun',
+    'default_history_path',
+    'find_regressions',
+]
+
+# Bumped each time the database schema changes
+SCHEMA_VERSION = 1
+
+_SCHEMA = '''
+CREATE TABLE runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    challenge TEXT NOT NULL,
+    puzzle_id TEXT NOT NULL,
+    git_commit TEXT,
+    python_version TEXT NOT NULL,
+    host TEXT NOT NULL
+);
+
+CREATE INDEX runs_by_puzzle ON runs (challenge, puzzle_id);
+
+CREATE TABLE steps (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    step INTEGER NOT NULL,
+    answer TEXT,
+    is_correct INTEGER,
+    status TEXT NOT NULL,
+    from_cache INTEGER NOT NULL,
+    wall_time REAL,
+    cpu_time REAL,
+    peak_memory INTEGER,
+    PRIMARY KEY (run_id, step)
+);
+'''
+
+
+def default_history_path() -> Path:
+    """The user data file holding the run history."""
+    data_home = os.environ.get('XDG_DATA_HOME')
+    base = Path(data_home) if data_home else Path.home() / '.local' / 'share'
+    return base / 'saulve' / 'history.sqlite3'
+
+
+def git_commit(directory: Path) -> Optional[str]:
+    """The commit checked out in the git repository of a directory, if
+    any.
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    if result.returncode != 0:
+        return None
+
+    return result.stdout.strip() or None
+
+
+class RunEnvironment(NamedTuple):
+    """Where a puzzle has been run.
+
+    Attributes:
+        git_commit: Commit of the challenges repository, if it is a git
+            repository.
+        python_version: Python implementation and version.
+        host: Name of the machine.
+    """
+    git_commit: Optional[str]
+    python_version: str
+    host: str
+
+    @classmethod
+    def current(cls, directory: Path) -> 'RunEnvironment':
+        """The environment of the current process.
+
+        Arguments:
+            directory: A directory of the challenges repository.
+        """
+        return cls(
+            git_commit(directory),
+            f'{platform.python_implementation()} '
+            f'{platform.python_version()}',
+            platform.node(),
+        )
+
+
+class StepRun(NamedTuple):
+    """A recorded run of a solution step.
+
+    Attributes:
+        run_id: Id of the puzzle run the step belongs to.
+        started_at: When the puzzle run started, in UTC.
+        puzzle_id: Id of the puzzle, its words separated with spaces.
+        step: Index of the step, starting from 0.
+        solution: The step solution. Its metrics are None if the step was
+            not run.
+        environment: Where the step ran.
+    """
+    run_id: int
+    started_at: datetime
+    puzzle_id: str
+    step: int
+    solution: PuzzleSolution
+    environment: RunEnvironment
+
+    @property
+    def is_timed(self) -> bool:
+        """Whether the step ran to its end, its time telling how fast the
+        step is.
+        """
+        return (
+            self.solution.status in (
+                StepStatus.COMPLETED,
+                StepStatus.OVER_BUDGET,
+            )
+            and not self.solution.from_cache
+            and self.solution.is_correct is not False
+            and self.solution.metrics is not None
+        )
+
+
+def _optional_bool(value: Optional[int]) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+class RunHistory:
+    """The history of puzzle runs, stored in a SQLite database.
+
+    Arguments:
+        path: The database file. It is created if it does not exist.
+
+    Raises:
+        SaulveError: If the database can't be opened, or has been created
+            by a newer version of saulve.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(path)
+            self._migrate()
+        except (OSError, sqlite3.Error) as e:
+            raise SaulveError(f'Could not open history {path}: {e}') from e
+
+    def __enter__(self) -> 'RunHistory':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _migrate(self) -> None:
+        version, = self.connection.execute('PRAGMA user_version').fetchone()
+        if version > SCHEMA_VERSION:
+            raise SaulveError(
+                f'{self.path} has been created by a newer version of saulve.'
+            )
+
+        if version < SCHEMA_VERSION:
+            with self.connection:
+                self.connection.executescript(_SCHEMA)
+                self.connection.execute(
+                    f'PRAGMA user_version = {SCHEMA_VERSION}'
+                )
+
+    def record(
+        self,
+        challenge_id: str,
+        puzzle_id: Sequence[str],
+        solutions: Iterable[tuple[int, PuzzleSolution]],
+        environment: RunEnvironment,
+        started_at: Optional[datetime] = None,
+    ) -> int:
+        """Record the run of a puzzle.
+
+        Arguments:
+            challenge_id: Id of the challenge of the puzzle.
+            puzzle_id: Words of the puzzle id, as found by `Challenge.find`,
+                so that the runs of a puzzle are all recorded under the same
+                id.
+            solutions: Solutions of the steps that have been run, with the
+                index of their step.
+            environment: Where the puzzle ran.
+            started_at: When the run started. Defaults to now.
+
+        Returns:
+            The id of the recorded run.
+
+        Raises:
+            SaulveError: If the run could not be written.
+        """
+        started_at = started_at or datetime.now(timezone.utc)
+
+        try:
+            with self.connection:
+                cursor = self.connection.execute(
+                    'INSERT INTO runs (started_at, challenge, puzzle_id, '
+                    'git_commit, python_version, host) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (
+                        started_at.isoformat(),
+                        challenge_id,
+                        ' '.join(puzzle_id),
+                        *environment,
+                    ),
+                )
+                run_id = cursor.lastrowid
+                assert run_id is not None
+
+                self.connection.executemany(
+                    'INSERT INTO steps (run_id, step, answer, is_correct, '
+                    'status, from_cache, wall_time, cpu_time, peak_memory) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (
+                            run_id,
+                            step,
+                            solution.solution,
+                            solution.is_correct,
+                            solution.status.value,
+                            solution.from_cache,
+                            *(solution.metrics or (None, None, None)),
+                        )
+                        for step, solution in solutions
+                    ],
+                )
+        except sqlite3.Error as e:
+            raise SaulveError(
+                f'Could not record run in {self.path}: {e}'
+            ) from e
+
+        return run_id
+
+    def step_runs(
+        self,
+        challenge_id: str,
+        selectors: Sequence[str] = (),
+        limit: Optional[int] = None,
+    ) -> list[StepRun]:
+        """Get the recorded runs of the steps of a challenge puzzles, from
+        the most recent.
+
+        Arguments:
+            challenge_id: Id of the challenge.
+            selectors: Only get the puzzles whose id starts with these words,
+                numeric words being compared as numbers.
+            limit: Maximum number of runs of each step.
+        """
+        query = '''
+            SELECT * FROM (
+                SELECT
+                    runs.id, started_at, puzzle_id, step, answer,
+                    is_correct, status, from_cache, wall_time, cpu_time,
+                    peak_memory, git_commit, python_version, host,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY puzzle_id, step ORDER BY runs.id DESC
+                    ) AS position
+                FROM runs JOIN steps ON steps.run_id = runs.id
+                WHERE challenge = ?
+            )
+            WHERE ? IS NULL OR position <= ?
+            ORDER BY id DESC, step
+        '''
+        try:
+            rows = self.connection.execute(
+                query,
+                (challenge_id, limit, limit),
+            ).fetchall()
+        except sqlite3.Error as e:
+            raise SaulveError(
+                f'Could not read history {self.path}: {e}'
+            ) from e
+
+        return [
+            StepRun(
+                run_id,
+                datetime.fromisoformat(started_at),
+                puzzle_id,
+                step,
+                PuzzleSolution(
+                    answer,
+                    _optional_bool(is_correct),
+                    (
+                        StepMetrics(wall_time, cpu_time, peak_memory)
+                        if wall_time is not None else None
+                    ),
+                    bool(from_cache),
+                    StepStatus(status),
+                ),
+                RunEnvironment(commit, python_version, host),
+            )
+            for (
+                run_id, started_at, puzzle_id, step, answer, is_correct,
+                status, from_cache, wall_time, cpu_time, peak_memory,
+                commit, python_version, host, _,
+            ) in rows
+            if id_starts_with(puzzle_id, selectors)
+        ]
+
+
+def find_regressions(
+    runs: Iterable[StepRun],
+    window: int = 3,
+    baseline_runs: int = 10,
+    threshold: float = 0.1,
+) -> dict[str, list[Regression]]:
+    """Find steps whose median time regressed in their recent runs.
+
+    The median wall time of the most recent runs of each step is compared to
+    the median of the runs preceding them. Only timed runs are considered,
+    with the same memory tracing as the most recent run, as tracing memory
+    slows down steps.
+
+    Arguments:
+        runs: Runs of the steps, from the most recent.
+        window: Number of recent runs.
+        baseline_runs: Number of runs the recent ones are compared to.
+        threshold: Relative slowdown above which a step is considered as
+            regressed (0.1 means 10% slower).
+
+    Returns:
+        Regressed steps, by puzzle id.
+    """
+    times: dict[tuple[str, int], list[float]] = {}
+    traced: dict[tuple[str, int], bool] = {}
+
+    for run in runs:
+        if not run.is_timed:
+            continue
+
+        key = (run.puzzle_id, run.step)
+        metrics = run.solution.metrics
+        assert metrics is not None
+        is_traced = metrics.peak_memory is not None
+        if traced.setdefault(key, is_traced) == is_traced:
+            times.setdefault(key, []).append(metrics.wall_time)
+
+    regressions: dict[str, list[Regression]] = {}
+    for (puzzle_id, step), step_times in sorted(times.items()):
+        recent = step_times[:window]
+        baseline = step_times[window:window + baseline_runs]
+        if len(recent) < window or not baseline:
+            continue
+
+        median = statistics.median(recent)
+        baseline_median = statistics.median(baseline)
+        if median > baseline_median * (1 + threshold):
+            regressions.setdefault(puzzle_id, []).append(
+                Regression(step, median, baseline_median),
+            )
+
+    return regressions
@@ -4,7 +4,7 @@
 import importlib.util
 from importlib import import_module
 from pathlib import Path
-from typing import Type, TypeVar
+from typing import Optional, Type, TypeVar
 
 from saulve.errors import MissingAttribute, WrongAttributeType
 
@@ -52,3 +52,25 @@ def append_module_path(module_name: str, sys_path: list[str]) -> None:
         return
 
     sys_path.append(str(cwd))
+
+
+def locate_module(module_name: str) -> Optional[Path]:
+    """Find the file of the top-level package of a module, as it would be
+    imported after `append_module_path`, without importing it.
+
+    Returns:
+        The package or module file, None if it can't be found.
+    """
+    package_name = module_name.partition('.')[0]
+    try:
+        spec = importlib.util.find_spec(package_name)
+    except (ImportError, ValueError):
+        spec = None
+
+    if spec is not None:
+        if spec.origin is None or not spec.has_location:
+            return None
+        return Path(spec.origin).resolve()
+
+    init_file = Path.cwd() / package_name / '__init__.py'
+    return init_file.resolve() if init_file.is_file() else None
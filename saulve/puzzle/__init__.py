@@ -22,6 +22,21 @@ decorator.
     PuzzleSolution(solution=None, is_correct=None)
 ]
 
+Steps often share the same parsed input. An input parser can be registered with
+the Puzzle.parser decorator. The parser is run once, the first time a step
+decorated with Puzzle.with_parsed_input is run, and its result is injected as
+first argument of these steps.
+
+>>> @puzzle.parser
+... @with_input('1 2 3')
+... def parse(puzzle_input):
+...     return [int(n) for n in puzzle_input.split()]
+...
+>>> @puzzle.solution
+... @puzzle.with_parsed_input
+... def solve_sum(numbers):
+...     return sum(numbers)
+
 Some decorators are provided to alter the solutions behaviour.
 
 The with_input decorator injects an initial value as first argument of the solution
@@ -32,6 +47,24 @@ step function.
 >>> def solve_me(puzzle_input):
 ...    ...
 
+The with_inputs decorator registers a step for each of many named inputs, such
+as the examples of the puzzle statement and the real input, each with its
+optional expected answer.
+
+>>> @puzzle.solution
+... @with_inputs({'example': '1 2', 'input': '3 4'}, solutions={'example': 3})
+... def solve_me(puzzle_input):
+...    ...
+
+The with_input_file decorator injects the content of a file, read when the step
+is run. Relative paths are relative to the module declaring the step. Large
+inputs can be streamed line by line, or memory mapped.
+
+>>> @puzzle.solution
+... @with_input_file('input.txt', mode='lines')
+... def solve_me(lines):
+...    ...
+
 The solved decorator will check if the returned solution is equal to the argument
 passed to solved.
 This decorator can be used as a unit test to refactor solutions steps.
@@ -44,9 +77,43 @@ This decorator can be used as a unit test to refactor solutions steps.
 ...
 >>> puzzle.solve()
 [PuzzleSolution(solution=None, is_correct=False)]
+
+The limits decorator runs the solution step in a child process, with a time
+and memory limit. A step exceeding its limits is reported with a TIMED_OUT or
+OUT_OF_MEMORY status instead of hanging the whole run.
+
+>>> @puzzle.solution
+... @limits(timeout=10, max_memory=2 * 1024 ** 3)
+... def solve_me():
+...     ...
+
+The budget decorator declares the time and memory a solution step is expected
+to stay within. A step exceeding its budget still returns its answer, but is
+reported with an OVER_BUDGET status.
+
+>>> @puzzle.solution
+... @solved('expected answer')
+... @budget(max_seconds=1)
+... def solve_me():
+...     ...
 """
 
 from .core import Puzzle
-from .decorators import solved, with_input
+from .decorators import (
+    budget,
+    limits,
+    solved,
+    with_input,
+    with_input_file,
+    with_inputs,
+)
 
-__all__ = ['Puzzle', 'solved', 'with_input']
+__all__ = [
+    'Puzzle',
+    'budget',
+    'limits',
+    'solved',
+    'with_input',
+    'with_input_file',
+    'with_inputs',
+]
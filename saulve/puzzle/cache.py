@@ -0,0 +1,235 @@
+"""A content addressed cache of solution step answers.
+
+Answers are stored on disk, keyed by a hash of the step function code, the
+source of its module, the inputs injected with `with_input` or
+`with_input_file` and the saulve version. Changing any of them makes the step
+to be run again.
+
+The cache size is bounded. Least recently used answers are evicted first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import types
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from .common import PuzzleStepResult, PuzzleStepReturn
+from .decorators import InputFile, get_step_inputs
+
+__all__ = [
+    'ResultCache',
+    'default_cache_dir',
+    'hash_code',
+    'hash_step_inputs',
+    'step_cache_key',
+]
+
+logger = logging.getLogger(__name__)
+
+# Default maximum size of the cache, in bytes
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """The user cache directory for step results."""
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    base = Path(cache_home) if cache_home else Path.home() / '.cache'
+    return base / 'saulve' / 'results'
+
+
+def _saulve_version() -> str:
+    # Imported here, as it noticeably slows down startup
+    from importlib import metadata
+
+    try:
+        return metadata.version('saulve')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def hash_code(code: types.CodeType, digest: 'hashlib._Hash') -> None:
+    """Hash the bytecode, names and constants of a code object."""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            hash_code(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _hash_module_source(module_name: str, digest: 'hashlib._Hash') -> None:
+    module = sys.modules.get(module_name)
+    module_file = getattr(module, '__file__', None)
+    if module_file is None:
+        return
+
+    try:
+        digest.update(Path(module_file).read_bytes())
+    except OSError:
+        pass
+
+
+def hash_step_inputs(fn: Callable, digest: 'hashlib._Hash') -> bool:
+    """Hash the inputs injected in a step function, including the content of
+    input files.
+
+    Returns:
+        False if the inputs can't be hashed.
+    """
+    inputs = get_step_inputs(fn)
+    try:
+        digest.update(pickle.dumps(inputs))
+    except Exception:
+        return False
+
+    for puzzle_input in inputs:
+        if isinstance(puzzle_input, InputFile):
+            try:
+                digest.update(puzzle_input.digest())
+            except OSError:
+                return False
+
+    return True
+
+
+def _hash_function(fn: Callable, digest: 'hashlib._Hash') -> bool:
+    """Hash the code, module source and injected inputs of a function.
+
+    Returns:
+        False if the function can't be hashed.
+    """
+    if not hash_step_inputs(fn, digest):
+        return False
+
+    wrapped: Optional[Callable] = fn
+    while wrapped is not None:
+        code = getattr(wrapped, '__code__', None)
+        if code is None:
+            return False
+        digest.update(
+            f'{wrapped.__module__}.{wrapped.__qualname__}'.encode()
+        )
+        hash_code(code, digest)
+        wrapped = getattr(wrapped, '__wrapped__', None)
+
+    _hash_module_source(fn.__module__, digest)
+
+    return True
+
+
+def step_cache_key(
+    fn: Callable[[], PuzzleStepReturn],
+    dependencies: Iterable[Callable] = (),
+) -> Optional[str]:
+    """Compute the cache key of a step function.
+
+    Arguments:
+        fn: The step function.
+        dependencies: Other functions whose result is used by the step, such
+            as the puzzle input parser.
+
+    Returns:
+        The key, or None if the step inputs can't be hashed.
+    """
+    digest = hashlib.sha256()
+    digest.update(_saulve_version().encode())
+
+    for function in (fn, *dependencies):
+        if not _hash_function(function, digest):
+            return None
+
+    return digest.hexdigest()
+
+
+class CachedAnswer(NamedTuple):
+    """An answer found in the cache."""
+    answer: PuzzleStepResult
+
+
+class ResultCache:
+    """On disk cache of step answers.
+
+    Arguments:
+        path: Directory of the cache.
+        max_size: Maximum size of the cache, in bytes.
+        refresh: If set, cached answers are ignored but new answers are still
+            stored.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_size: int = DEFAULT_MAX_SIZE,
+        refresh: bool = False,
+    ) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.refresh = refresh
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f'{key}.json'
+
+    def get(self, key: str) -> Optional[CachedAnswer]:
+        if self.refresh:
+            return None
+
+        entry = self._entry_path(key)
+        try:
+            content = json.loads(entry.read_text(encoding='utf-8'))
+            answer = content['answer']
+            # The modification time records the last access for eviction
+            os.utime(entry)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable entries, such as truncated ones, are not used
+            return None
+
+        if answer is not None and not isinstance(answer, (int, str)):
+            return None
+
+        return CachedAnswer(answer)
+
+    def set(self, key: str, answer: PuzzleStepResult) -> None:
+        try:
+            content = json.dumps({'answer': answer})
+        except TypeError:
+            logger.debug(f'Answer {answer!r} is not cacheable.')
+            return
+
+        entry = self._entry_path(key)
+        tmp_entry = entry.with_name(f'{entry.name}.{os.getpid()}.tmp')
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_entry.write_text(content, encoding='utf-8')
+            os.replace(tmp_entry, entry)
+        except OSError as e:
+            logger.debug(f'Could not write cached answer: {e}')
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used answers until the cache size is below
+        its maximum size.
+        """
+        entries = []
+        total_size = 0
+        for entry in self.path.glob('*.json'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, entry in entries:
+            if total_size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            total_size -= size
@@ -1,9 +1,14 @@
 """Some common declarations for puzzles.
 """
 
+from typing import Awaitable
 
 # The response of a puzzle step.
 PuzzleStepResponse = int | str
 
 # Return value of a puzzle step. None indicates an unsolved step.
 PuzzleStepResult = PuzzleStepResponse | None
+
+# Return value of a puzzle step function. Coroutine functions can be used as
+# step functions.
+PuzzleStepReturn = PuzzleStepResult | Awaitable[PuzzleStepResult]
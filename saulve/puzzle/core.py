@@ -1,13 +1,75 @@
 """Declare puzzle and their associated solution.
 """
 
-from typing import Callable, NamedTuple
+import threading
+from contextlib import nullcontext
+from enum import Enum
+from functools import wraps
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Concatenate,
+    Iterator,
+    NamedTuple,
+    Optional,
+    ParamSpec,
+    TypeVar,
+    cast,
+)
 
-from ..errors import PuzzleHasNoSolution, WrongStepSolution
-from .common import PuzzleStepResult
+from ..errors import (
+    PuzzleHasNoSolution,
+    SaulveError,
+    StepOutOfMemory,
+    StepTimeout,
+    WrongStepSolution,
+)
+from .cache import ResultCache, step_cache_key
+from .common import PuzzleStepResult, PuzzleStepReturn
+from .decorators import (
+    get_step_budget,
+    get_step_cases,
+    get_step_limits,
+    get_step_solutions,
+    is_async_step,
+    solved,
+    with_input,
+)
+from .isolation import StepLimits, run_isolated
+from .metrics import StepMeter, StepMetrics
+from .profiler import (
+    StepProfiler,
+    StepProfileResult,
+    StepSampler,
+    step_profiler,
+)
+
+if TYPE_CHECKING:
+    import asyncio
 
 __all__ = ['Puzzle']
 
+T = TypeVar('T')
+
+P = ParamSpec('P')
+
+# Attribute of step functions holding the puzzle whose parsed input they use
+STEP_PUZZLE_ATTRIBUTE = '_saulve_parsed_puzzle'
+
+
+class StepStatus(Enum):
+    """How the run of a solution step ended."""
+    # The step returned, with or without an answer
+    COMPLETED = 'completed'
+    # The step exceeded its time limit
+    TIMED_OUT = 'timed out'
+    # The step exceeded its memory limit
+    OUT_OF_MEMORY = 'out of memory'
+    # The step returned, but exceeded its time or memory budget
+    OVER_BUDGET = 'over budget'
+
 
 class PuzzleSolution(NamedTuple):
     """
@@ -15,54 +77,311 @@ class PuzzleSolution(NamedTuple):
     """
     solution: str | None
     is_correct: bool | None
+    metrics: Optional[StepMetrics] = None
+    from_cache: bool = False
+    status: StepStatus = StepStatus.COMPLETED
+    profile: Optional[StepProfileResult] = None
+    case: Optional[str] = None
 
     @property
     def is_solved(self) -> bool:
         return self.solution is not None
 
+    @property
+    def is_failed(self) -> bool:
+        """Whether the step returned a wrong answer, or did not stay within
+        its limits or budget.
+        """
+        return (
+            self.is_correct is False
+            or self.status is not StepStatus.COMPLETED
+        )
+
 
 class PuzzleStep:
-    """A linked linked of solution step functions.
+    """A solution step function.
 
     The solution function can either return a response or None. A None return
     value is considered a solution without implemented response.
+
+    The solution function can be a coroutine function. It is then run in its
+    own event loop by `run_step`, or awaited by `run_step_async`.
+
+    Arguments:
+        fn: The solution function.
+        case: Name of the input the step is run against, for steps
+            registered with `with_inputs`.
     """
-    def __init__(self, fn: Callable[[], PuzzleStepResult]):
+    def __init__(
+        self,
+        fn: Callable[[], PuzzleStepReturn],
+        case: Optional[str] = None,
+    ):
         self.fn = fn
-        self._next: PuzzleStep | None = None
+        self.case = case
+        self.is_async = is_async_step(fn)
 
-    def push_step(self, fn: Callable[[], PuzzleStepResult]) -> 'PuzzleStep':
-        """Add a new solution function step at the end of the structure.
+    @property
+    def parsing_puzzle(self) -> Optional['Puzzle']:
+        """The puzzle whose parsed input is injected in the step, if any."""
+        return getattr(self.fn, STEP_PUZZLE_ATTRIBUTE, None)
+
+    def dependencies(self) -> list[Callable]:
+        """Functions, other than the step function, computing the step
+        answer.
         """
-        if self._next is not None:
-            return self._next.push_step(fn)
+        puzzle = self.parsing_puzzle
+        if puzzle is None or puzzle.parser_fn is None:
+            return []
 
-        self._next = PuzzleStep(fn)
-        return self._next
+        return [puzzle.parser_fn]
 
-    @property
-    def has_next(self) -> bool:
-        return self._next is not None
+    def _cached_solution(self, answer: PuzzleStepResult) -> PuzzleSolution:
+        """Build the solution of a cached answer, checking it against the
+        expected solutions of the step.
+        """
+        if answer is not None and any(
+            answer != expected
+            for expected in get_step_solutions(self.fn)
+        ):
+            return PuzzleSolution(
+                None,
+                is_correct=False,
+                from_cache=True,
+                case=self.case,
+            )
+
+        return PuzzleSolution(
+            solution=str(answer) if answer is not None else None,
+            is_correct=None if answer is None else True,
+            from_cache=True,
+            case=self.case,
+        )
+
+    def _execute(
+        self,
+        trace_memory: bool,
+        profile: bool = False,
+        sample_interval: Optional[float] = None,
+    ) -> tuple[PuzzleStepResult, PuzzleSolution]:
+        """Call the step function.
+
+        Returns:
+            The raw step answer and its solution.
+        """
+        solution = None
+        is_correct = None
+
+        meter = StepMeter(trace_memory)
+        profiler = step_profiler(profile, sample_interval)
+        try:
+            with meter:
+                if self.is_async:
+                    # Imported here, as it is slow to import and only needed
+                    # by coroutine steps.
+                    import asyncio
+                    solution = asyncio.run(self._call_async(profiler))
+                else:
+                    with profiler:
+                        result = self.fn()
+                    solution = cast(PuzzleStepResult, result)
+        except WrongStepSolution:
+            is_correct = False
+        else:
+            is_correct = None if solution is None else True
+
+        return solution, self._solution(
+            solution,
+            is_correct,
+            meter,
+            profiler.profile,
+        )
+
+    async def _call_async(
+        self,
+        profiler: Optional[StepProfiler | StepSampler] = None,
+    ) -> PuzzleStepResult:
+        # The event loop is started before profiling the coroutine
+        with profiler or nullcontext():
+            return await cast(Awaitable[PuzzleStepResult], self.fn())
+
+    async def _execute_async(self) -> tuple[PuzzleStepResult, PuzzleSolution]:
+        """Await the coroutine step function.
 
-    def run(self) -> list[PuzzleSolution]:
-        """Run the step solution functions of this step and the next ones.
+        Returns:
+            The raw step answer and its solution.
         """
         solution = None
         is_correct = None
 
+        meter = StepMeter()
         try:
-            solution = self.fn()
+            with meter:
+                solution = await self._call_async()
         except WrongStepSolution:
             is_correct = False
         else:
             is_correct = None if solution is None else True
 
-        return [
-            PuzzleSolution(
-                solution=str(solution) if solution is not None else None,
-                is_correct=is_correct,
+        return solution, self._solution(solution, is_correct, meter)
+
+    def _solution(
+        self,
+        answer: PuzzleStepResult,
+        is_correct: Optional[bool],
+        meter: StepMeter,
+        profile: Optional[StepProfileResult] = None,
+    ) -> PuzzleSolution:
+        """Build the solution of a run of the step, checking its budget.
+
+        Profiling slows steps down, the budget of profiled steps is not
+        checked.
+        """
+        status = StepStatus.COMPLETED
+        if (
+            profile is None
+            and meter.metrics is not None
+            and get_step_budget(self.fn).is_exceeded(meter.metrics)
+        ):
+            status = StepStatus.OVER_BUDGET
+
+        return PuzzleSolution(
+            solution=str(answer) if answer is not None else None,
+            is_correct=is_correct,
+            metrics=meter.metrics,
+            status=status,
+            profile=profile,
+            case=self.case,
+        )
+
+    def run_step(
+        self,
+        trace_memory: bool = False,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        profile: bool = False,
+        sample_interval: Optional[float] = None,
+    ) -> PuzzleSolution:
+        """Run the solution function of this step only.
+
+        Arguments:
+            trace_memory: Measure the peak memory allocated by the step.
+                Memory is always traced for steps having a memory budget.
+            cache: Where to look for a previously computed answer. The step
+                is run and its answer stored in the cache if not found.
+            limits: Default resource limits, for limits not declared on the
+                step with the `limits` decorator. Steps having limits are run
+                in a child process.
+            profile: Profile the step function. Profiled steps are always
+                run, their answer is not looked for in the cache, and their
+                budget is not checked.
+            sample_interval: Profile the step by sampling its call stack at
+                this interval of CPU time, in seconds, instead of recording
+                all calls. Sampled steps must run in the main thread.
+
+        Raises:
+            StepCrashed: If a step run in a child process failed.
+        """
+        key = self._cache_key(cache)
+        if cache is not None and key is not None and not profile:
+            if (cached := cache.get(key)) is not None:
+                return self._cached_solution(cached.answer)
+
+        # Parsing is done before running the step, so that it is timed
+        # separately and shared with steps run in a child process.
+        if (puzzle := self.parsing_puzzle) is not None:
+            puzzle.parse(trace_memory)
+
+        step_limits = get_step_limits(self.fn).merge(limits or StepLimits())
+        if get_step_budget(self.fn).max_memory is not None:
+            trace_memory = True
+
+        if not step_limits.is_set:
+            answer, solution = self._execute(
+                trace_memory,
+                profile,
+                sample_interval,
             )
-        ] + (self._next.run() if self._next else [])
+        else:
+            try:
+                answer, solution = run_isolated(
+                    lambda: self._execute(
+                        trace_memory,
+                        profile,
+                        sample_interval,
+                    ),
+                    step_limits,
+                )
+            except StepTimeout:
+                return PuzzleSolution(
+                    None,
+                    None,
+                    status=StepStatus.TIMED_OUT,
+                    case=self.case,
+                )
+            except StepOutOfMemory:
+                return PuzzleSolution(
+                    None,
+                    None,
+                    status=StepStatus.OUT_OF_MEMORY,
+                    case=self.case,
+                )
+
+        self._store(cache, key, answer, solution)
+
+        return solution
+
+    async def run_step_async(
+        self,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+    ) -> PuzzleSolution:
+        """Run the solution function of this step in the running event loop.
+
+        Coroutine steps are awaited. Synchronous steps, and steps having
+        resource limits, are run in a worker thread so that they don't block
+        the event loop. Memory is not traced, as concurrent steps would
+        share the same measure.
+
+        See `run_step` for arguments details.
+        """
+        import asyncio
+
+        step_limits = get_step_limits(self.fn).merge(limits or StepLimits())
+        if not self.is_async or step_limits.is_set:
+            return await asyncio.to_thread(self.run_step, False, cache, limits)
+
+        key = self._cache_key(cache)
+        if cache is not None and key is not None:
+            if (cached := cache.get(key)) is not None:
+                return self._cached_solution(cached.answer)
+
+        if (puzzle := self.parsing_puzzle) is not None:
+            await asyncio.to_thread(puzzle.parse)
+
+        answer, solution = await self._execute_async()
+
+        self._store(cache, key, answer, solution)
+
+        return solution
+
+    def _cache_key(self, cache: Optional[ResultCache]) -> Optional[str]:
+        if cache is None:
+            return None
+
+        return step_cache_key(self.fn, self.dependencies())
+
+    @staticmethod
+    def _store(
+        cache: Optional[ResultCache],
+        key: Optional[str],
+        answer: PuzzleStepResult,
+        solution: PuzzleSolution,
+    ) -> None:
+        """Store the answer of a step in the cache, unless it is wrong."""
+        if cache is not None and key is not None:
+            if solution.is_correct is not False:
+                cache.set(key, answer)
 
 
 class Puzzle:
@@ -71,16 +390,29 @@ class Puzzle:
     Some solution functions steps are registered by decorating them with
     the `solution` decorator.
 
+    An input parser can be registered with the `parser` decorator. The
+    parsed input is computed once, the first time a step decorated with
+    `with_parsed_input` is run, and shared by all steps.
+
     Arguments:
         name: A verbose name for this puzzle
 
     Attributes:
         name: A verbose title for the current puzzle
+        parser_fn: The registered input parser.
+        parse_metrics: Resources used to parse the input. None if the input
+            has not been parsed yet.
     """
 
     def __init__(self, name: str) -> None:
         self.name = name
-        self._steps: PuzzleStep | None = None
+        self.parser_fn: Optional[Callable[[], Any]] = None
+        self.parse_metrics: Optional[StepMetrics] = None
+        self._steps: list[PuzzleStep] = []
+        self._is_parsed = False
+        self._parsed: Any = None
+        # Steps run concurrently share a single parsing
+        self._parse_lock = threading.Lock()
 
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__}: {self.name}>'
@@ -90,36 +422,305 @@ class Puzzle:
 
     def solution(
         self,
-        fn: Callable[[], PuzzleStepResult],
+        fn: Callable[[], PuzzleStepReturn],
     ) -> PuzzleStep:
         """Register a solution function for the puzzle.
 
         The function takes the puzzle input as argument and should return a
-        solution.
+        solution. A function decorated with `with_inputs` is registered as
+        a step for each of its inputs.
 
         Example:
             >>> puzzle = Puzzle(title="should be two")
             >>> @puzzle.solution
             ... def get_two():
             ...     return 2
+
+        Returns:
+            The registered step, or the step of the first input of a
+            function decorated with `with_inputs`.
+        """
+        cases = get_step_cases(fn)
+        if not cases:
+            step = PuzzleStep(fn)
+            self._steps.append(step)
+            return step
+
+        steps = []
+        for case in cases:
+            case_fn = with_input(case.puzzle_input)(
+                cast(Callable[[Any], PuzzleStepReturn], fn),
+            )
+            if case.solution is not None:
+                case_fn = solved(case.solution)(case_fn)
+            steps.append(PuzzleStep(case_fn, case.name))
+        self._steps.extend(steps)
+
+        return steps[0]
+
+    @property
+    def steps(self) -> list[PuzzleStep]:
+        """All registered solution steps, in registration order."""
+        return list(self._steps)
+
+    def parser(self, fn: Callable[[], T]) -> Callable[[], T]:
+        """Register the input parser of the puzzle.
+
+        Example:
+            >>> @puzzle.parser
+            ... @with_input('1 2 3')
+            ... def parse(puzzle_input):
+            ...     return [int(n) for n in puzzle_input.split()]
+
+        Raises:
+            SaulveError: If a parser is already registered.
+        """
+        if self.parser_fn is not None:
+            raise SaulveError(f'{self} already has a registered parser.')
+
+        self.parser_fn = fn
+        return fn
+
+    def parse(self, trace_memory: bool = False) -> Any:
+        """Get the parsed input of the puzzle, parsing it on first call.
+
+        Arguments:
+            trace_memory: Measure the peak memory allocated by the parser.
+
+        Raises:
+            SaulveError: If no parser is registered.
+        """
+        if self.parser_fn is None:
+            raise SaulveError(f"{self} don't have a registered parser.")
+
+        with self._parse_lock:
+            if not self._is_parsed:
+                with StepMeter(trace_memory) as meter:
+                    self._parsed = self.parser_fn()
+                self.parse_metrics = meter.metrics
+                self._is_parsed = True
+
+        return self._parsed
+
+    def reuse_parsed_input(self, other: 'Puzzle') -> None:
+        """Use the parsed input of another puzzle, if it has been parsed.
+
+        This is meant to keep the parsed input of a reloaded puzzle whose
+        parser did not change.
+        """
+        with other._parse_lock:
+            if not other._is_parsed:
+                return
+            parsed, metrics = other._parsed, other.parse_metrics
+
+        self.set_parsed_input(parsed, metrics)
+
+    def set_parsed_input(
+        self,
+        parsed: Any,
+        metrics: Optional[StepMetrics] = None,
+    ) -> None:
+        """Use an input parsed elsewhere, such as in another process, instead
+        of running the parser.
+
+        Arguments:
+            parsed: The parsed input.
+            metrics: Resources used to parse it, if known.
+        """
+        with self._parse_lock:
+            self._parsed = parsed
+            self.parse_metrics = metrics
+            self._is_parsed = True
+
+    def clear_parsed_input(self) -> None:
+        """Forget the parsed input, so that it is parsed again when needed."""
+        with self._parse_lock:
+            self._parsed = None
+            self.parse_metrics = None
+            self._is_parsed = False
+
+    def with_parsed_input(
+        self,
+        fn: Callable[Concatenate[Any, P], PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
+        """Injects the parsed input as first argument of the solution step
+        function.
+
+        Example:
+            >>> @puzzle.solution
+            ... @puzzle.with_parsed_input
+            ... def solve(numbers):
+            ...     return sum(numbers)
+        """
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepReturn:
+            return fn(self.parse(), *args, **kwargs)
+
+        setattr(wrapper, STEP_PUZZLE_ATTRIBUTE, self)
+
+        return wrapper
+
+    def solve_step(
+        self,
+        index: int,
+        trace_memory: bool = False,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        profile: bool = False,
+        sample_interval: Optional[float] = None,
+    ) -> PuzzleSolution:
+        """Run a single solution step of this puzzle.
+
+        Arguments:
+            index: Position of the step, starting from 0.
+            trace_memory: Measure the peak memory allocated by the step.
+            cache: A cache of previously computed answers.
+            limits: Default resource limits of the step.
+            profile: Profile the step function.
+            sample_interval: Profile the step by sampling its call stack.
+
+        Raises:
+            IndexError: If there is no step at this index.
+        """
+        return self.steps[index].run_step(
+            trace_memory,
+            cache,
+            limits,
+            profile,
+            sample_interval,
+        )
+
+    def iter_solve(
+        self,
+        trace_memory: bool = False,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        profile: bool = False,
+        sample_interval: Optional[float] = None,
+    ) -> Iterator[PuzzleSolution]:
+        """Run all registered solutions for this puzzle, yielding each
+        solution as soon as its step is finished.
+
+        See `solve` for arguments details.
+
+        Raises:
+            PuzzleHasNoSolution: If no solution have been registered for this
+                puzzle. Raised when called, not when iterating.
         """
-        if self._steps is None:
-            self._steps = PuzzleStep(fn)
-            return self._steps
+        if not self._steps:
+            raise PuzzleHasNoSolution(
+                f"{self} don't have registered solutions"
+            )
 
-        return self._steps.push_step(fn)
+        return (
+            step.run_step(
+                trace_memory,
+                cache,
+                limits,
+                profile,
+                sample_interval,
+            )
+            for step in self.steps
+        )
 
-    def solve(self) -> list[PuzzleSolution]:
+    def solve(
+        self,
+        trace_memory: bool = False,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        profile: bool = False,
+        sample_interval: Optional[float] = None,
+    ) -> list[PuzzleSolution]:
         """Run all registered solutions for this puzzle and return a list of
         solution values.
 
+        Each solution holds the time spent in its step. Memory tracing slows
+        down the steps, and must be explicitly enabled.
+
+        Arguments:
+            trace_memory: Measure the peak memory allocated by each step.
+            cache: A cache of previously computed answers. Answers found in
+                the cache are still checked against the `solved` decorator.
+            limits: Default resource limits of the steps. Steps having
+                limits are run in a child process.
+            profile: Profile each step. The profile of a step, excluding the
+                input parsing, is held by its solution.
+            sample_interval: Profile the steps by sampling their call stack
+                at this interval of CPU time, in seconds, instead of
+                recording all calls. Sampling has a lower overhead.
+
+        Raises:
+            PuzzleHasNoSolution: If no solution have been registered for this
+                puzzle.
+        """
+        return list(self.iter_solve(
+            trace_memory,
+            cache,
+            limits,
+            profile,
+            sample_interval,
+        ))
+
+    async def solve_async(
+        self,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        semaphore: Optional['asyncio.Semaphore'] = None,
+    ) -> list[PuzzleSolution]:
+        """Run all registered solutions for this puzzle concurrently, in the
+        running event loop.
+
+        Arguments:
+            cache: A cache of previously computed answers.
+            limits: Default resource limits of the steps.
+            semaphore: Bounds the number of steps run at the same time, and
+                can be shared with other puzzles. Steps are not bounded if
+                None.
+
         Raises:
             PuzzleHasNoSolution: If no solution have been registered for this
                 puzzle.
         """
-        if self._steps is None:
+        import asyncio
+
+        if not self._steps:
             raise PuzzleHasNoSolution(
                 f"{self} don't have registered solutions"
             )
 
-        return self._steps.run()
+        return list(await asyncio.gather(*(
+            self._run_bounded(step, cache, limits, semaphore)
+            for step in self.steps
+        )))
+
+    async def solve_step_async(
+        self,
+        index: int,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        semaphore: Optional['asyncio.Semaphore'] = None,
+    ) -> PuzzleSolution:
+        """Run a single solution step of this puzzle in the running event
+        loop.
+
+        See `solve_async` for arguments details.
+
+        Raises:
+            IndexError: If there is no step at this index.
+        """
+        return await self._run_bounded(
+            self.steps[index],
+            cache,
+            limits,
+            semaphore,
+        )
+
+    @staticmethod
+    async def _run_bounded(
+        step: PuzzleStep,
+        cache: Optional[ResultCache],
+        limits: Optional[StepLimits],
+        semaphore: Optional['asyncio.Semaphore'],
+    ) -> PuzzleSolution:
+        async with semaphore or nullcontext():
+            return await step.run_step_async(cache, limits)
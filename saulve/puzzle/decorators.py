@@ -1,55 +1,448 @@
 """Puzzle step function decorators.
 """
 
+import hashlib
+import inspect
+import mmap
+import os
+import sys
 from functools import wraps
-from typing import Callable, Concatenate, ParamSpec, TypeVar
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Concatenate,
+    Generator,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Optional,
+    ParamSpec,
+    TypeVar,
+    cast,
+    get_args,
+)
 
-from ..errors import WrongStepSolution
-from .common import PuzzleStepResponse, PuzzleStepResult
+from ..errors import SaulveError, WrongStepSolution
+from .common import PuzzleStepResponse, PuzzleStepResult, PuzzleStepReturn
+from .isolation import StepLimits
+from .metrics import StepBudget
 
 U = TypeVar('U')
 
 P = ParamSpec('P')
 
+# Ways an input file can be given to a step function
+InputFileMode = Literal['text', 'bytes', 'lines', 'mmap']
+
+# Attributes of decorated functions listing injected inputs and expected
+# solutions, outermost decorator first.
+STEP_INPUTS_ATTRIBUTE = '_saulve_inputs'
+STEP_SOLUTIONS_ATTRIBUTE = '_saulve_solutions'
+STEP_LIMITS_ATTRIBUTE = '_saulve_limits'
+STEP_BUDGET_ATTRIBUTE = '_saulve_budget'
+STEP_CASES_ATTRIBUTE = '_saulve_cases'
+
+
+def is_async_step(fn: Callable) -> bool:
+    """Whether a step function, once unwrapped from its decorators, is a
+    coroutine function.
+    """
+    return inspect.iscoroutinefunction(inspect.unwrap(fn))
+
+
+def get_step_inputs(fn: Callable) -> tuple:
+    """Get the values injected in a step function by `with_input`, and the
+    files injected by `with_input_file`.
+    """
+    return getattr(fn, STEP_INPUTS_ATTRIBUTE, ())
+
+
+def get_step_solutions(fn: Callable) -> tuple[PuzzleStepResponse, ...]:
+    """Get the expected solutions declared on a step function by `solved`.
+    """
+    return getattr(fn, STEP_SOLUTIONS_ATTRIBUTE, ())
+
+
+def get_step_limits(fn: Callable) -> StepLimits:
+    """Get the resource limits declared on a step function by `limits`."""
+    return getattr(fn, STEP_LIMITS_ATTRIBUTE, StepLimits())
+
+
+def get_step_budget(fn: Callable) -> StepBudget:
+    """Get the resource budget declared on a step function by `budget`."""
+    return getattr(fn, STEP_BUDGET_ATTRIBUTE, StepBudget())
+
+
+class StepCase(NamedTuple):
+    """An input a step function is run against, declared by `with_inputs`.
+
+    Attributes:
+        name: Name of the case, such as 'example' or 'input'.
+        puzzle_input: The value injected as first argument of the step.
+        solution: The expected answer of the step for this input, if known.
+    """
+    name: str
+    puzzle_input: Any
+    solution: Optional[PuzzleStepResponse] = None
+
+
+def get_step_cases(fn: Callable) -> tuple[StepCase, ...]:
+    """Get the inputs a step function is run against, declared by
+    `with_inputs`.
+    """
+    return getattr(fn, STEP_CASES_ATTRIBUTE, ())
+
 
 def with_input(puzzle_input: U) -> Callable[
-    [Callable[Concatenate[U, P], PuzzleStepResult]],
-    Callable[P, PuzzleStepResult],
+    [Callable[Concatenate[U, P], PuzzleStepReturn]],
+    Callable[P, PuzzleStepReturn],
 ]:
     """Injects a value as first argument of the solution step function.
     """
     def decorator(
-        fn: Callable[Concatenate[U, P], PuzzleStepResult],
-    ) -> Callable[P, PuzzleStepResult]:
+        fn: Callable[Concatenate[U, P], PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
         @wraps(fn)
-        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepResult:
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepReturn:
             return fn(puzzle_input, *args, **kwargs)
 
+        setattr(
+            wrapper,
+            STEP_INPUTS_ATTRIBUTE,
+            (puzzle_input,) + get_step_inputs(fn),
+        )
+
         return wrapper
 
     return decorator  # type: ignore[return-value] # pending issue 9
 
 
+def with_inputs(
+    inputs: Mapping[str, U],
+    solutions: Optional[Mapping[str, PuzzleStepResponse]] = None,
+) -> Callable[
+    [Callable[Concatenate[U, P], PuzzleStepReturn]],
+    Callable[P, PuzzleStepReturn],
+]:
+    """Run a solution step function against many named inputs, such as the
+    examples of a puzzle and its real input.
+
+    `Puzzle.solution` registers a step for each input, in the given order.
+    Each input is injected as first argument of the step function, and its
+    expected answer checked as with `solved`.
+
+    Example:
+        >>> @puzzle.solution
+        ... @with_inputs(
+        ...     {'example': EXAMPLE, 'input': PUZZLE_INPUT},
+        ...     solutions={'example': 24000},
+        ... )
+        ... def solve_first_star(puzzle_input):
+        ...     ...
+
+    Arguments:
+        inputs: The injected inputs, by case name.
+        solutions: Expected answers, by case name.
+
+    Raises:
+        SaulveError: If no input is given, or an expected answer is given
+            for an unknown case.
+    """
+    solutions = solutions or {}
+    if not inputs:
+        raise SaulveError('with_inputs needs at least one input.')
+    if (unknown := set(solutions) - set(inputs)):
+        raise SaulveError(
+            f'Solutions given for unknown inputs: {", ".join(sorted(unknown))}'
+        )
+
+    cases = tuple(
+        StepCase(name, puzzle_input, solutions.get(name))
+        for name, puzzle_input in inputs.items()
+    )
+
+    def decorator(
+        fn: Callable[Concatenate[U, P], PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
+        if get_step_cases(fn):
+            raise SaulveError(f'{fn.__qualname__} already has inputs.')
+
+        @wraps(fn)
+        def wrapper(
+            puzzle_input: U,
+            *args: P.args,
+            **kwargs: P.kwargs,
+        ) -> PuzzleStepReturn:
+            return fn(puzzle_input, *args, **kwargs)
+
+        setattr(wrapper, STEP_CASES_ATTRIBUTE, cases)
+
+        # Inputs are injected by the steps registered by Puzzle.solution
+        return cast(Callable[P, PuzzleStepReturn], wrapper)
+
+    return decorator
+
+
+class InputFile(NamedTuple):
+    """An input file injected in a step function by `with_input_file`."""
+    path: Path
+    mode: InputFileMode
+    encoding: str
+
+    def digest(self) -> bytes:
+        """Hash of the file content."""
+        digest = hashlib.sha256()
+        with self.path.open('rb') as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+
+        return digest.digest()
+
+
+def _iter_lines(path: Path, encoding: str) -> Generator[str, None, None]:
+    with path.open(encoding=encoding) as f:
+        for line in f:
+            yield line.rstrip('\n')
+
+
+def _open_input(input_file: InputFile) -> tuple[Any, Callable[[], None]]:
+    """Open an input file.
+
+    Returns:
+        The value to inject in the step function and a function releasing
+        the file resources.
+    """
+    if input_file.mode == 'text':
+        return input_file.path.read_text(encoding=input_file.encoding), _noop
+    if input_file.mode == 'bytes':
+        return input_file.path.read_bytes(), _noop
+    if input_file.mode == 'lines':
+        lines = _iter_lines(input_file.path, input_file.encoding)
+        return lines, lines.close
+
+    with input_file.path.open('rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b'', _noop
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return mapped, mapped.close
+
+
+def _noop() -> None:
+    pass
+
+
+def _release_input(release: Callable[[], None]) -> None:
+    try:
+        release()
+    except BufferError:
+        # The step kept views on the mapped file. It will be unmapped once
+        # they are garbage collected.
+        pass
+
+
+async def _await_step(result: PuzzleStepReturn) -> PuzzleStepResult:
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+def _resolve_input_path(path: str | os.PathLike, fn: Callable) -> Path:
+    """Resolve a relative input path against the step function module
+    directory.
+    """
+    input_path = Path(path)
+    if input_path.is_absolute():
+        return input_path
+
+    module_file = getattr(sys.modules.get(fn.__module__), '__file__', None)
+    if module_file is None:
+        return input_path
+
+    return Path(module_file).parent / input_path
+
+
+def with_input_file(
+    path: str | os.PathLike,
+    mode: InputFileMode = 'text',
+    encoding: str = 'utf-8',
+) -> Callable[
+    [Callable[Concatenate[Any, P], PuzzleStepReturn]],
+    Callable[P, PuzzleStepReturn],
+]:
+    """Injects the content of a file as first argument of the solution step
+    function.
+
+    The file is only read when the step is run. Relative paths are relative
+    to the directory of the module declaring the step.
+
+    Arguments:
+        path: The input file.
+        mode: How the file content is given to the step:
+            - text: the decoded file content, as a string
+            - bytes: the raw file content
+            - lines: an iterator streaming the file lines, without their
+              trailing new line
+            - mmap: a read-only memory map of the file, that can be sliced or
+              wrapped in a memoryview without copying the file content.
+              Empty files are given as empty bytes.
+        encoding: Encoding of the file, for the text and lines modes.
+    """
+    if mode not in get_args(InputFileMode):
+        raise ValueError(f"'{mode}' is not a valid input file mode.")
+
+    def decorator(
+        fn: Callable[Concatenate[Any, P], PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
+        input_file = InputFile(_resolve_input_path(path, fn), mode, encoding)
+
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepReturn:
+            puzzle_input, release = _open_input(input_file)
+            try:
+                return fn(puzzle_input, *args, **kwargs)
+            finally:
+                _release_input(release)
+
+        @wraps(fn)
+        async def async_wrapper(
+            *args: P.args,
+            **kwargs: P.kwargs,
+        ) -> PuzzleStepResult:
+            puzzle_input, release = _open_input(input_file)
+            try:
+                return await _await_step(fn(puzzle_input, *args, **kwargs))
+            finally:
+                _release_input(release)
+
+        step: Callable[P, PuzzleStepReturn] = (
+            async_wrapper if is_async_step(fn) else wrapper
+        )
+
+        setattr(
+            step,
+            STEP_INPUTS_ATTRIBUTE,
+            (input_file,) + get_step_inputs(fn),
+        )
+
+        return step
+
+    return decorator
+
+
 def solved(solution: PuzzleStepResponse) -> Callable[
-    [Callable[P, PuzzleStepResult]],
-    Callable[P, PuzzleStepResult],
+    [Callable[P, PuzzleStepReturn]],
+    Callable[P, PuzzleStepReturn],
 ]:
     """Mark a solution function as solved. The return value of the solution
     function must match the passed argument to considere the response as
     correct.
+
+    Coroutine functions are supported, their answer being checked once
+    awaited.
     """
     def decorator(
-        fn: Callable[P, PuzzleStepResult],
-    ) -> Callable[P, PuzzleStepResult]:
-        @wraps(fn)
-        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepResult:
-            step_solution = fn(*args, **kwargs)
-
+        fn: Callable[P, PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
+        def check(step_solution: PuzzleStepResult) -> PuzzleStepResult:
             if step_solution is not None and step_solution != solution:
                 raise WrongStepSolution()
 
             return step_solution
 
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepReturn:
+            return check(cast(PuzzleStepResult, fn(*args, **kwargs)))
+
+        @wraps(fn)
+        async def async_wrapper(
+            *args: P.args,
+            **kwargs: P.kwargs,
+        ) -> PuzzleStepResult:
+            return check(await _await_step(fn(*args, **kwargs)))
+
+        step: Callable[P, PuzzleStepReturn] = (
+            async_wrapper if is_async_step(fn) else wrapper
+        )
+
+        setattr(
+            step,
+            STEP_SOLUTIONS_ATTRIBUTE,
+            (solution,) + get_step_solutions(fn),
+        )
+
+        return step
+
+    return decorator
+
+
+def limits(
+    timeout: Optional[float] = None,
+    max_memory: Optional[int] = None,
+) -> Callable[
+    [Callable[P, PuzzleStepReturn]],
+    Callable[P, PuzzleStepReturn],
+]:
+    """Run a solution step in a child process with resource limits.
+
+    A step exceeding its time or memory limit is reported as such instead of
+    hanging or exhausting the memory of the whole run.
+
+    Arguments:
+        timeout: Maximum wall time of the step, in seconds.
+        max_memory: Maximum address space of the step process, in bytes.
+    """
+    def decorator(
+        fn: Callable[P, PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepReturn:
+            return fn(*args, **kwargs)
+
+        setattr(
+            wrapper,
+            STEP_LIMITS_ATTRIBUTE,
+            StepLimits(timeout, max_memory).merge(get_step_limits(fn)),
+        )
+
+        return wrapper
+
+    return decorator
+
+
+def budget(
+    max_seconds: Optional[float] = None,
+    max_memory: Optional[int] = None,
+) -> Callable[
+    [Callable[P, PuzzleStepReturn]],
+    Callable[P, PuzzleStepReturn],
+]:
+    """Declare the resources a solution step is expected to stay within.
+
+    A step exceeding its budget still runs to its end, and is reported with
+    an OVER_BUDGET status. This makes performance expectations checked the
+    same way `solved` checks answers.
+
+    Arguments:
+        max_seconds: Maximum wall time of the step, in seconds.
+        max_memory: Maximum peak memory allocated by the step, in bytes. The
+            memory of steps having a memory budget is always traced, which
+            slows them down.
+    """
+    def decorator(
+        fn: Callable[P, PuzzleStepReturn],
+    ) -> Callable[P, PuzzleStepReturn]:
+        @wraps(fn)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> PuzzleStepReturn:
+            return fn(*args, **kwargs)
+
+        setattr(
+            wrapper,
+            STEP_BUDGET_ATTRIBUTE,
+            StepBudget(max_seconds, max_memory).merge(get_step_budget(fn)),
+        )
+
         return wrapper
 
     return decorator
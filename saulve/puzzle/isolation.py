@@ -0,0 +1,119 @@
+"""Run solution steps in a child process with resource limits.
+
+The child process is forked, so step functions don't need to be picklable.
+Only their return value is sent back to the parent process.
+"""
+
+import multiprocessing
+import traceback
+from multiprocessing.connection import Connection
+from typing import Callable, NamedTuple, Optional, TypeVar
+
+from ..errors import SaulveError, StepCrashed, StepOutOfMemory, StepTimeout
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+__all__ = ['StepLimits', 'run_isolated']
+
+T = TypeVar('T')
+
+
+class StepLimits(NamedTuple):
+    """Resource limits of a solution step.
+
+    Attributes:
+        timeout: Maximum wall time, in seconds.
+        max_memory: Maximum address space of the step process, in bytes.
+            This includes the memory used by the interpreter and the
+            imported modules.
+    """
+    timeout: Optional[float] = None
+    max_memory: Optional[int] = None
+
+    @property
+    def is_set(self) -> bool:
+        return self.timeout is not None or self.max_memory is not None
+
+    def merge(self, defaults: 'StepLimits') -> 'StepLimits':
+        """Get limits where unset values are taken from defaults."""
+        return StepLimits(
+            timeout=self.timeout if self.timeout is not None
+            else defaults.timeout,
+            max_memory=self.max_memory if self.max_memory is not None
+            else defaults.max_memory,
+        )
+
+
+def _run_child(
+    fn: Callable[[], T],
+    max_memory: Optional[int],
+    conn: Connection,
+) -> None:
+    if max_memory is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory, hard))
+
+    try:
+        result = fn()
+    except MemoryError:
+        conn.send(('out_of_memory', None))
+    except BaseException:
+        conn.send(('error', traceback.format_exc()))
+    else:
+        conn.send(('ok', result))
+    finally:
+        conn.close()
+
+
+def run_isolated(fn: Callable[[], T], limits: StepLimits) -> T:
+    """Call a function in a forked child process, within resource limits.
+
+    Raises:
+        StepTimeout: If the function did not return within the timeout.
+        StepOutOfMemory: If the function exceeded its memory limit.
+        StepCrashed: If the function raised an exception or its process
+            died.
+        SaulveError: If the platform can't fork processes or limit their
+            memory.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        raise SaulveError('Isolated steps require a platform with fork.')
+    if limits.max_memory is not None and resource is None:
+        raise SaulveError('Memory limits are not supported on this platform.')
+
+    context = multiprocessing.get_context('fork')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_child,
+        args=(fn, limits.max_memory, child_conn),
+        daemon=True,
+    )
+    process.start()
+    child_conn.close()
+
+    try:
+        if not parent_conn.poll(limits.timeout):
+            raise StepTimeout(f'Step did not finish in {limits.timeout}s.')
+
+        try:
+            status, value = parent_conn.recv()
+        except EOFError as e:
+            raise StepCrashed('Step process died unexpectedly.') from e
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        parent_conn.close()
+
+    if status == 'out_of_memory':
+        raise StepOutOfMemory(
+            f'Step exceeded its memory limit of {limits.max_memory} bytes.'
+        )
+    if status == 'error':
+        raise StepCrashed(f'Step raised an exception:\n{value}')
+
+    result: T = value
+    return result
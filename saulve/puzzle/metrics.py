@@ -0,0 +1,116 @@
+"""Measure the resources used by solution steps.
+"""
+
+import time
+import tracemalloc
+from typing import NamedTuple, Optional
+
+__all__ = ['StepBudget', 'StepMetrics', 'StepMeter']
+
+
+class StepMetrics(NamedTuple):
+    """Resources used by the run of a solution step.
+
+    Attributes:
+        wall_time: Elapsed time, in seconds.
+        cpu_time: CPU time of the current process, in seconds.
+        peak_memory: Peak memory allocated by the step, in bytes. None if
+            memory was not traced.
+    """
+    wall_time: float
+    cpu_time: float
+    peak_memory: Optional[int] = None
+
+
+class StepBudget(NamedTuple):
+    """Resources a solution step is expected to stay within.
+
+    Unlike limits, budgets don't interrupt the step: a step exceeding its
+    budget is run to its end, and reported as over budget.
+
+    Attributes:
+        max_seconds: Maximum wall time, in seconds.
+        max_memory: Maximum peak memory allocated by the step, in bytes.
+    """
+    max_seconds: Optional[float] = None
+    max_memory: Optional[int] = None
+
+    @property
+    def is_set(self) -> bool:
+        return self.max_seconds is not None or self.max_memory is not None
+
+    def merge(self, defaults: 'StepBudget') -> 'StepBudget':
+        """Get a budget where unset values are taken from defaults."""
+        return StepBudget(
+            max_seconds=self.max_seconds if self.max_seconds is not None
+            else defaults.max_seconds,
+            max_memory=self.max_memory if self.max_memory is not None
+            else defaults.max_memory,
+        )
+
+    def is_exceeded(self, metrics: StepMetrics) -> bool:
+        """Whether measured resources exceed the budget. The memory budget
+        is only checked if memory was traced.
+        """
+        if self.max_seconds is not None and (
+            metrics.wall_time > self.max_seconds
+        ):
+            return True
+
+        return (
+            self.max_memory is not None
+            and metrics.peak_memory is not None
+            and metrics.peak_memory > self.max_memory
+        )
+
+
+class StepMeter:
+    """Context manager measuring the resources used by a block of code.
+
+    Memory tracing uses tracemalloc, that noticeably slows down the measured
+    code. It is then disabled by default.
+
+    Example:
+        >>> with StepMeter(trace_memory=True) as meter:
+        ...     solve()
+        >>> meter.metrics
+        StepMetrics(wall_time=0.12, cpu_time=0.11, peak_memory=1024)
+
+    Arguments:
+        trace_memory: Whether the peak allocated memory should be measured.
+    """
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.metrics: Optional[StepMetrics] = None
+        self._started_tracing = False
+        self._memory_start = 0
+        self._wall_start = 0.0
+        self._cpu_start = 0.0
+
+    def __enter__(self) -> 'StepMeter':
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            self._memory_start, _ = tracemalloc.get_traced_memory()
+
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        wall_time = time.perf_counter() - self._wall_start
+        cpu_time = time.process_time() - self._cpu_start
+
+        peak_memory = None
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            peak_memory = max(peak - self._memory_start, 0)
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+        self.metrics = StepMetrics(wall_time, cpu_time, peak_memory)
@@ -0,0 +1,516 @@
+"""Profile solution steps.
+
+Steps can be profiled with cProfile, recording every function call, or by
+sampling their call stack at a regular interval. Sampling has a low overhead,
+that does not depend on the number of function calls, but misses functions
+where little time is spent.
+
+Only the functions called by the step are profiled. Functions of saulve, such
+as the wrappers of the step decorators, are removed from the profile along
+with the library functions only they called, so that it only shows the
+solution code.
+
+Only the thread running the step is profiled.
+"""
+
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import sysconfig
+import threading
+import time
+import types
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, cast
+
+from ..errors import SaulveError
+
+__all__ = [
+    'FunctionTime',
+    'HotFrame',
+    'StepProfile',
+    'StepProfileResult',
+    'StepProfiler',
+    'StepSampler',
+    'StepSamples',
+    'step_profiler',
+]
+
+# Identifies a profiled function: file name, line number and function name
+FunctionKey = tuple[str, int, str]
+
+# Primitive calls, calls, own time and cumulative time of a function, and
+# the same values by caller.
+FunctionStats = tuple[int, int, float, float, dict[FunctionKey, Any]]
+
+# Directory of the saulve package, whose functions are not profiled
+_SAULVE_DIR = os.path.join(Path(__file__).resolve().parent.parent, '')
+
+# Directory of the standard library, and of the installed packages
+_STDLIB_DIR = os.path.join(sysconfig.get_paths()['stdlib'], '')
+_PACKAGES_DIRS = tuple(
+    os.path.join(sysconfig.get_paths()[name], '')
+    for name in ('purelib', 'platlib')
+)
+
+# File name of builtin functions
+_BUILTIN_FILE = '~'
+
+# Default interval between two samples of the call stack, in seconds of CPU
+# time.
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+class FunctionTime(NamedTuple):
+    """Time spent in a profiled function.
+
+    Attributes:
+        name: Name and location of the function.
+        calls: Number of calls. None if the function was sampled.
+        own_time: Time spent in the function, excluding the functions it
+            called, in seconds.
+        cumulative_time: Time spent in the function and the functions it
+            called, in seconds.
+    """
+    name: str
+    calls: Optional[int]
+    own_time: float
+    cumulative_time: float
+
+
+def _function_name(func: FunctionKey) -> str:
+    filename, line, name = func
+    if filename == _BUILTIN_FILE:
+        return name.strip('<>')
+
+    return f'{name} ({Path(filename).name}:{line})'
+
+
+def _collapsed_frame(name: str) -> str:
+    # Semicolons separate the frames of a collapsed stack
+    return name.replace(';', ':')
+
+
+def _dump_lines(path: Path, lines: list[str]) -> None:
+    path.write_text(''.join(f'{line}\n' for line in lines))
+
+
+class StepProfile(NamedTuple):
+    """Functions called by a solution step, and the time spent in them.
+
+    Attributes:
+        stats: Profile statistics, in the format of `pstats.Stats.stats`.
+    """
+    stats: dict[FunctionKey, FunctionStats]
+
+    @property
+    def total_time(self) -> float:
+        """Time spent in the profiled functions, in seconds."""
+        return sum(tt for _, _, tt, _, _ in self.stats.values())
+
+    def to_stats(self) -> pstats.Stats:
+        stats = pstats.Stats()
+        stats.stats = dict(self.stats)  # type: ignore[attr-defined]
+        stats.get_top_level_stats()
+        return stats
+
+    def dump(self, path: Path) -> None:
+        """Save the profile in a file readable by `pstats.Stats`."""
+        self.to_stats().dump_stats(path)
+
+    def top(self, count: int) -> list[FunctionTime]:
+        """The functions the step spent the most time in, excluding the time
+        spent in the functions they called.
+        """
+        functions = [
+            FunctionTime(_function_name(func), nc, tt, ct)
+            for func, (_, nc, tt, ct, _) in self.stats.items()
+        ]
+        functions.sort(key=lambda function: function.own_time, reverse=True)
+
+        return functions[:count]
+
+    def collapsed_stacks(self) -> list[str]:
+        """The profile in the collapsed stacks format read by flame graph
+        tools: a line per call stack, with the time spent in its last
+        function, in microseconds.
+
+        cProfile only records callers of functions, not whole stacks. The
+        time of a function called from many stacks is split between them in
+        proportion of the time spent in the function by each caller.
+        """
+        callees: dict[FunctionKey, dict[FunctionKey, float]] = {
+            func: {} for func in self.stats
+        }
+        for func, (_, _, _, _, callers) in self.stats.items():
+            for caller, (_, _, _, caller_ct) in callers.items():
+                if caller in callees:
+                    callees[caller][func] = caller_ct
+
+        times: dict[str, float] = {}
+        to_visit: list[tuple[FunctionKey, tuple[FunctionKey, ...], float]] = [
+            (func, (), 1.0)
+            for func, (_, _, _, _, callers) in self.stats.items()
+            if not callers
+        ]
+        while to_visit:
+            func, stack, share = to_visit.pop()
+            _, _, tt, ct, _ = self.stats[func]
+            stack = (*stack, func)
+
+            line = ';'.join(_collapsed_frame(_function_name(f)) for f in stack)
+            times[line] = times.get(line, 0) + tt * share
+
+            for callee, callee_ct in callees[func].items():
+                total_ct = self.stats[callee][3]
+                callee_share = share * callee_ct / total_ct if total_ct else 0
+                # Recursive calls are already included in the own time of
+                # the function, and stacks too short to show up are skipped.
+                if callee in stack or total_ct * callee_share < 1e-6:
+                    continue
+                to_visit.append((callee, stack, callee_share))
+
+        return sorted(
+            f'{line} {round(time * 1_000_000)}'
+            for line, time in times.items()
+            if round(time * 1_000_000) > 0
+        )
+
+    def dump_collapsed_stacks(self, path: Path) -> None:
+        """Save the profile in the collapsed stacks format."""
+        _dump_lines(path, self.collapsed_stacks())
+
+
+class HotFrame(NamedTuple):
+    """A function of the most sampled call path.
+
+    Attributes:
+        name: Name and location of the function.
+        depth: Number of consecutive recursive calls of the function.
+        share: Part of the sampled time, from 0 to 1, spent in the path up to
+            this function.
+    """
+    name: str
+    depth: int
+    share: float
+
+
+class StepSamples(NamedTuple):
+    """Call stacks of a solution step, sampled at a regular interval of CPU
+    time.
+
+    Each sample is weighted by the CPU time elapsed since the previous one,
+    as timers may fire less often than requested. Builtin functions are not
+    sampled: their time is attributed to the function calling them.
+
+    Attributes:
+        stacks: CPU time of each sampled call stack, in seconds. Stacks are
+            function names, from the outermost function.
+        sample_count: Number of samples.
+    """
+    stacks: dict[tuple[str, ...], float]
+    sample_count: int
+
+    @property
+    def total_time(self) -> float:
+        """Sampled CPU time, in seconds."""
+        return sum(self.stacks.values())
+
+    def top(self, count: int) -> list[FunctionTime]:
+        """The functions the step spent the most time in, excluding the
+        functions they called.
+        """
+        own: dict[str, float] = {}
+        cumulative: dict[str, float] = {}
+        for stack, stack_time in self.stacks.items():
+            own[stack[-1]] = own.get(stack[-1], 0) + stack_time
+            for name in set(stack):
+                cumulative[name] = cumulative.get(name, 0) + stack_time
+
+        functions = [
+            FunctionTime(name, None, own.get(name, 0), cumulative_time)
+            for name, cumulative_time in cumulative.items()
+        ]
+        functions.sort(key=lambda function: function.own_time, reverse=True)
+
+        return functions[:count]
+
+    def hot_path(self) -> list[HotFrame]:
+        """The most sampled call path, following the most sampled callee of
+        each function from the outermost one.
+
+        Consecutive recursive calls of a function are merged in a single
+        frame, whose share is the one of its outermost call.
+        """
+        total = self.total_time
+        path: list[HotFrame] = []
+        stacks = list(self.stacks.items())
+        depth = 0
+
+        while True:
+            times: dict[str, float] = {}
+            for stack, stack_time in stacks:
+                if len(stack) > depth:
+                    name = stack[depth]
+                    times[name] = times.get(name, 0) + stack_time
+            if not times:
+                return path
+
+            name = max(times, key=lambda name: times[name])
+            if path and path[-1].name == name:
+                path[-1] = path[-1]._replace(depth=path[-1].depth + 1)
+            else:
+                share = times[name] / total if total else 0
+                path.append(HotFrame(name, 1, share))
+
+            stacks = [
+                (stack, stack_time)
+                for stack, stack_time in stacks
+                if len(stack) > depth and stack[depth] == name
+            ]
+            depth += 1
+
+    def collapsed_stacks(self) -> list[str]:
+        """The samples in the collapsed stacks format read by flame graph
+        tools: a line per call stack, with its CPU time in microseconds.
+        """
+        return sorted(
+            f'{";".join(_collapsed_frame(name) for name in stack)} '
+            f'{round(stack_time * 1_000_000)}'
+            for stack, stack_time in self.stacks.items()
+            if round(stack_time * 1_000_000) > 0
+        )
+
+    def dump_collapsed_stacks(self, path: Path) -> None:
+        """Save the samples in the collapsed stacks format."""
+        _dump_lines(path, self.collapsed_stacks())
+
+
+# Profile of a step, recording all calls or sampled
+StepProfileResult = StepProfile | StepSamples
+
+
+def _is_saulve(filename: str) -> bool:
+    return filename.startswith(_SAULVE_DIR)
+
+
+def _is_library(func: FunctionKey) -> bool:
+    """Whether a function is a builtin or belongs to the standard library."""
+    filename = func[0]
+    return filename == _BUILTIN_FILE or (
+        filename.startswith(_STDLIB_DIR)
+        and not filename.startswith(_PACKAGES_DIRS)
+    )
+
+
+def _exclude_saulve(
+    stats: dict[FunctionKey, FunctionStats],
+) -> dict[FunctionKey, FunctionStats]:
+    """Remove functions of saulve from profile statistics, along with the
+    library functions only they called.
+
+    Functions without callers have been called by frames entered before
+    profiling started, that belong to saulve.
+    """
+    removed = {func for func in stats if _is_saulve(func[0])}
+    changed = True
+    while changed:
+        called_by_removed = {
+            func
+            for func, (_, _, _, _, callers) in stats.items()
+            if func not in removed
+            and _is_library(func)
+            and callers.keys() <= removed
+        }
+        changed = bool(called_by_removed)
+        removed |= called_by_removed
+
+    kept = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        if func in removed:
+            continue
+
+        kept_callers = {
+            caller: caller_stats
+            for caller, caller_stats in callers.items()
+            if caller not in removed
+        }
+        if _is_library(func) and len(kept_callers) != len(callers):
+            # Only count the calls made by the solution code
+            cc, nc, tt, ct = (
+                sum(caller_stats[i] for caller_stats in kept_callers.values())
+                for i in range(4)
+            )
+
+        kept[func] = (cc, nc, tt, ct, kept_callers)
+
+    return kept
+
+
+class StepProfiler:
+    """Context manager profiling a block of code.
+
+    Profiling slows down the profiled code, and is then disabled by default.
+
+    Example:
+        >>> with StepProfiler(enabled=True) as profiler:
+        ...     solve()
+        >>> profiler.profile.top(1)
+        [FunctionTime(name='solve (day_01.py:12)', calls=1, ...)]
+
+    Arguments:
+        enabled: Whether the code should be profiled.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.profile: Optional[StepProfile] = None
+        self._profiler: Optional[cProfile.Profile] = None
+
+    def __enter__(self) -> 'StepProfiler':
+        if self.enabled:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._profiler is None:
+            return
+
+        self._profiler.disable()
+        self._profiler.create_stats()
+        # Times are floats, not integers as annotated in typeshed
+        stats = cast(
+            dict[FunctionKey, FunctionStats],
+            self._profiler.stats,
+        )
+        self.profile = StepProfile(_exclude_saulve(stats))
+        self._profiler = None
+
+
+class StepSampler:
+    """Context manager sampling the call stack of a block of code.
+
+    A SIGPROF timer interrupts the process at each interval of CPU time, and
+    the stack of the running code is recorded. Samples taken while the code
+    is not running, such as a suspended coroutine, are ignored.
+
+    The timer uses a signal, so only the main thread can be sampled, on
+    platforms supporting `signal.setitimer`.
+
+    Example:
+        >>> with StepSampler(enabled=True) as sampler:
+        ...     solve()
+        >>> sampler.profile.hot_path()
+        [HotFrame(name='solve (day_01.py:12)', depth=1, share=1.0), ...]
+
+    Arguments:
+        enabled: Whether the code should be sampled.
+        interval: Interval between two samples, in seconds of CPU time.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ) -> None:
+        self.enabled = enabled
+        self.interval = interval
+        self.profile: Optional[StepSamples] = None
+        self._base: Optional[types.FrameType] = None
+        self._samples: dict[tuple[types.CodeType, ...], float] = {}
+        self._sample_count = 0
+        self._last_sample = 0.0
+        self._previous_handler: Any = None
+        self._previous_timer = (0.0, 0.0)
+
+    def __enter__(self) -> 'StepSampler':
+        if not self.enabled:
+            return self
+
+        if not hasattr(signal, 'setitimer'):
+            raise SaulveError('Sampling is not supported on this platform.')
+        if threading.current_thread() is not threading.main_thread():
+            raise SaulveError('Steps can only be sampled in the main thread.')
+
+        # Frames below the one entering the sampler are not sampled
+        self._base = sys._getframe(1)
+        self._samples = {}
+        self._sample_count = 0
+        self._last_sample = time.process_time()
+        self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+        self._previous_timer = signal.setitimer(
+            signal.ITIMER_PROF,
+            self.interval,
+            self.interval,
+        )
+
+        return self
+
+    def _sample(self, signum: int, frame: Optional[types.FrameType]) -> None:
+        now = time.process_time()
+        elapsed = now - self._last_sample
+        self._last_sample = now
+
+        codes = []
+        while frame is not None and frame is not self._base:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+
+        if frame is None:
+            # The sampled code is not running
+            return
+
+        stack = tuple(codes)
+        self._samples[stack] = self._samples.get(stack, 0) + elapsed
+        self._sample_count += 1
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._base is None:
+            return
+
+        signal.setitimer(signal.ITIMER_PROF, *self._previous_timer)
+        signal.signal(
+            signal.SIGPROF,
+            self._previous_handler or signal.SIG_DFL,
+        )
+        self._base = None
+
+        names: dict[types.CodeType, str] = {}
+        stacks: dict[tuple[str, ...], float] = {}
+        for codes, elapsed in self._samples.items():
+            for code in codes:
+                if code not in names:
+                    names[code] = _function_name(
+                        (code.co_filename, code.co_firstlineno, code.co_name),
+                    )
+
+            stack = tuple(
+                names[code]
+                for code in reversed(codes)
+                if not _is_saulve(code.co_filename)
+            )
+            if stack:
+                stacks[stack] = stacks.get(stack, 0) + elapsed
+
+        self.profile = StepSamples(stacks, self._sample_count)
+
+
+def step_profiler(
+    profile: bool,
+    sample_interval: Optional[float] = None,
+) -> StepProfiler | StepSampler:
+    """Get the profiler of a solution step.
+
+    Arguments:
+        profile: Whether the step is profiled.
+        sample_interval: Sample the call stack of the step at this interval
+            of CPU time, in seconds, instead of recording all calls.
+    """
+    if sample_interval is not None:
+        return StepSampler(profile, sample_interval)
+
+    return StepProfiler(profile)
@@ -0,0 +1,279 @@
+"""Solve many puzzles in parallel.
+
+Puzzles, or individual puzzle steps, are dispatched to a pool of worker
+processes. Each worker imports the application once and loads only the
+puzzles it has been given.
+
+Puzzles having I/O bound steps can instead be run concurrently in the current
+process, with an asyncio event loop.
+"""
+
+import asyncio
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import (
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
+
+from .app import App, import_app
+from .challenges.base import load_one
+from .puzzle.cache import ResultCache
+from .puzzle.core import PuzzleSolution
+from .puzzle.isolation import StepLimits
+from .shared import SharedInput, load_shared
+
+__all__ = [
+    'PuzzleTask',
+    'TaskResult',
+    'run_task',
+    'run_task_async',
+    'run_tasks',
+    'run_tasks_async',
+]
+
+# Default number of steps run at the same time by the asyncio runner. Same as
+# the default number of threads running synchronous steps.
+DEFAULT_CONCURRENCY = min(32, (os.cpu_count() or 1) + 4)
+
+
+class PuzzleTask(NamedTuple):
+    """A puzzle, or one of its steps, to solve.
+
+    Attributes:
+        puzzle_id: Id of the puzzle, as given to `Challenge.get`.
+        step: Index of the step to run. All steps are run if None.
+    """
+    puzzle_id: tuple[str, ...]
+    step: Optional[int] = None
+
+
+class TaskResult(NamedTuple):
+    """The result of a puzzle task.
+
+    Attributes:
+        task: The task that has been run.
+        name: Name of the solved puzzle. None if the puzzle could not be
+            loaded.
+        solutions: Solutions of the solved steps.
+        error: A formatted traceback if the task failed.
+    """
+    task: PuzzleTask
+    name: Optional[str]
+    solutions: list[PuzzleSolution]
+    error: Optional[str] = None
+
+    @property
+    def is_failed(self) -> bool:
+        return self.error is not None or any(
+            solution.is_failed for solution in self.solutions
+        )
+
+
+# Applications imported by the current process, by module name
+_apps: dict[str, App] = {}
+
+
+def _get_app(app_module: str) -> App:
+    if app_module not in _apps:
+        _apps[app_module] = import_app(app_module)
+
+    return _apps[app_module]
+
+
+def run_task(
+    app_module: str,
+    challenge_id: str,
+    task: PuzzleTask,
+    limits: Optional[StepLimits] = None,
+    profile: bool = False,
+    sample_interval: Optional[float] = None,
+    trace_memory: bool = False,
+    cache: Optional[ResultCache] = None,
+    shared_input: Optional[SharedInput] = None,
+) -> TaskResult:
+    """Load and solve a single puzzle task.
+
+    Any error raised while loading or solving the puzzle is reported in the
+    task result.
+
+    Arguments:
+        shared_input: The parsed input of the puzzle, shared by the process
+            dispatching the task. The puzzle input is not parsed again.
+    """
+    name = None
+
+    try:
+        loader = _get_app(app_module).get_loader(challenge_id)
+        puzzle = load_one(loader, *task.puzzle_id)
+        name = puzzle.name
+        if shared_input is not None:
+            puzzle.set_parsed_input(load_shared(shared_input))
+
+        if task.step is None:
+            solutions = puzzle.solve(
+                trace_memory=trace_memory,
+                cache=cache,
+                limits=limits,
+                profile=profile,
+                sample_interval=sample_interval,
+            )
+        else:
+            solutions = [puzzle.solve_step(
+                task.step,
+                trace_memory=trace_memory,
+                cache=cache,
+                limits=limits,
+                profile=profile,
+                sample_interval=sample_interval,
+            )]
+    except Exception:
+        return TaskResult(task, name, [], traceback.format_exc())
+
+    return TaskResult(task, name, solutions)
+
+
+def run_tasks(
+    app_module: str,
+    challenge_id: str,
+    tasks: Iterable[PuzzleTask],
+    jobs: Optional[int] = None,
+    limits: Optional[StepLimits] = None,
+    profile: bool = False,
+    sample_interval: Optional[float] = None,
+    trace_memory: bool = False,
+    cache: Optional[ResultCache] = None,
+    shared_inputs: Optional[Mapping[tuple[str, ...], SharedInput]] = None,
+) -> Iterator[TaskResult]:
+    """Solve puzzle tasks in a pool of worker processes.
+
+    Results are yielded as soon as their task is done, so they don't follow
+    the tasks order.
+
+    Arguments:
+        app_module: The application module, as given to `import_app`.
+        challenge_id: Id of the challenge the puzzles belong to.
+        tasks: The puzzles to solve.
+        jobs: Number of worker processes. Defaults to the number of CPUs. If
+            set to 1, tasks are run in the current process.
+        limits: Default resource limits of the puzzle steps.
+        profile: Profile each step. Profiles are sent back with the step
+            solutions.
+        sample_interval: Profile the steps by sampling their call stack at
+            this interval of CPU time, in seconds.
+        trace_memory: Measure the peak memory allocated by each step.
+        cache: A cache of previously computed answers, shared by the
+            workers.
+        shared_inputs: Parsed inputs shared with the workers, by puzzle id.
+            Workers use them instead of parsing the input of these puzzles.
+    """
+    shared_inputs = shared_inputs or {}
+
+    if jobs == 1:
+        for task in tasks:
+            yield run_task(
+                app_module,
+                challenge_id,
+                task,
+                limits,
+                profile,
+                sample_interval,
+                trace_memory,
+                cache,
+                shared_inputs.get(task.puzzle_id),
+            )
+        return
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        futures = [
+            executor.submit(
+                run_task,
+                app_module,
+                challenge_id,
+                task,
+                limits,
+                profile,
+                sample_interval,
+                trace_memory,
+                cache,
+                shared_inputs.get(task.puzzle_id),
+            )
+            for task in tasks
+        ]
+
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+async def run_task_async(
+    app_module: str,
+    challenge_id: str,
+    task: PuzzleTask,
+    semaphore: asyncio.Semaphore,
+    limits: Optional[StepLimits] = None,
+) -> TaskResult:
+    """Load and solve a single puzzle task in the running event loop.
+
+    Steps of the puzzle are run concurrently, bounded by the semaphore. Any
+    error raised while loading or solving the puzzle is reported in the task
+    result.
+    """
+    name = None
+
+    try:
+        loader = _get_app(app_module).get_loader(challenge_id)
+        puzzle = load_one(loader, *task.puzzle_id)
+        name = puzzle.name
+
+        if task.step is None:
+            solutions = await puzzle.solve_async(
+                limits=limits,
+                semaphore=semaphore,
+            )
+        else:
+            solutions = [await puzzle.solve_step_async(
+                task.step,
+                limits=limits,
+                semaphore=semaphore,
+            )]
+    except Exception:
+        return TaskResult(task, name, [], traceback.format_exc())
+
+    return TaskResult(task, name, solutions)
+
+
+async def run_tasks_async(
+    app_module: str,
+    challenge_id: str,
+    tasks: Iterable[PuzzleTask],
+    concurrency: Optional[int] = None,
+    limits: Optional[StepLimits] = None,
+) -> AsyncIterator[TaskResult]:
+    """Solve puzzle tasks concurrently in the running event loop.
+
+    Coroutine steps are awaited, synchronous steps are run in worker threads.
+    Results are yielded as soon as their task is done.
+
+    Arguments:
+        app_module: The application module, as given to `import_app`.
+        challenge_id: Id of the challenge the puzzles belong to.
+        tasks: The puzzles to solve.
+        concurrency: Maximum number of steps run at the same time, all
+            puzzles included.
+        limits: Default resource limits of the puzzle steps.
+    """
+    semaphore = asyncio.Semaphore(concurrency or DEFAULT_CONCURRENCY)
+
+    for result in asyncio.as_completed([
+        run_task_async(app_module, challenge_id, task, semaphore, limits)
+        for task in tasks
+    ]):
+        yield await result
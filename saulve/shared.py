@@ -0,0 +1,172 @@
+"""Share values with worker processes through shared memory.
+
+A value, typically a parsed puzzle input, is pickled once in a shared memory
+segment. Worker processes attach to the segment instead of computing the
+value again or receiving a copy of it with each task.
+
+Buffers of objects supporting out-of-band pickling (pickle protocol 5), such
+as NumPy arrays, are not copied: they are rebuilt in workers as read-only
+views of the segment, so that the memory they use does not grow with the
+number of workers. Other objects are unpickled from the segment by each
+worker.
+
+The process sharing values owns their segments, and removes them once done,
+whether or not workers crashed. Segments left by a killed owner are removed
+by the multiprocessing resource tracker.
+"""
+
+import pickle
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, NamedTuple, Optional
+
+from .errors import SaulveError
+
+__all__ = ['SharedInput', 'SharedInputs', 'load_shared']
+
+# Alignment of the buffers in a segment, suitable for any NumPy dtype
+BUFFER_ALIGNMENT = 64
+
+# Segments attached by the current process, and the values loaded from them,
+# by segment name. Loaded values may be views of their segment, which then
+# stays attached as long as the process lives.
+_attached: dict[str, tuple[SharedMemory, Any]] = {}
+
+# Released segments whose views are still in use
+_retained: list[SharedMemory] = []
+
+
+class SharedInput(NamedTuple):
+    """A handle on a value in shared memory, sent to worker processes.
+
+    Attributes:
+        segment: Name of the shared memory segment.
+        size: Size of the pickled value, at the start of the segment.
+        buffers: Offset and length of each out-of-band buffer of the pickled
+            value, in the segment.
+    """
+    segment: str
+    size: int
+    buffers: tuple[tuple[int, int], ...] = ()
+
+
+def _align(offset: int) -> int:
+    return -(-offset // BUFFER_ALIGNMENT) * BUFFER_ALIGNMENT
+
+
+class SharedInputs:
+    """Context manager owning the segments of values shared with worker
+    processes. Segments are removed when leaving the context.
+
+    Example:
+        >>> with SharedInputs() as shared:
+        ...     handle = shared.share(parsed_input)
+        ...     executor.submit(solve, handle).result()
+    """
+
+    def __init__(self) -> None:
+        self._segments: list[SharedMemory] = []
+
+    def __enter__(self) -> 'SharedInputs':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def share(self, value: Any) -> SharedInput:
+        """Copy a value in a new shared memory segment.
+
+        Raises:
+            SaulveError: If the value can't be pickled, or the segment
+                can't be created.
+        """
+        buffers: list[pickle.PickleBuffer] = []
+        try:
+            data = pickle.dumps(
+                value,
+                protocol=5,
+                buffer_callback=buffers.append,
+            )
+            raw_buffers = [buffer.raw() for buffer in buffers]
+        except (pickle.PicklingError, TypeError, AttributeError,
+                BufferError) as e:
+            raise SaulveError(f'Value can not be shared: {e}') from e
+
+        layout = []
+        offset = len(data)
+        for raw in raw_buffers:
+            offset = _align(offset)
+            layout.append((offset, raw.nbytes))
+            offset += raw.nbytes
+
+        try:
+            segment = SharedMemory(create=True, size=max(offset, 1))
+        except OSError as e:
+            raise SaulveError(f'Could not create shared memory: {e}') from e
+        self._segments.append(segment)
+
+        buf = segment.buf
+        assert buf is not None
+        buf[:len(data)] = data
+        for (start, length), raw in zip(layout, raw_buffers, strict=True):
+            buf[start:start + length] = raw
+        del buf
+
+        return SharedInput(segment.name, len(data), tuple(layout))
+
+    def close(self) -> None:
+        """Remove the segments of all shared values."""
+        for segment in self._segments:
+            _release(segment.name)
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+
+def load_shared(handle: SharedInput) -> Any:
+    """Get a value shared by another process.
+
+    The value is loaded once per process. Its out-of-band buffers are
+    read-only views of the shared memory segment.
+
+    Raises:
+        SaulveError: If the segment does not exist anymore.
+    """
+    if handle.segment in _attached:
+        return _attached[handle.segment][1]
+
+    try:
+        segment = SharedMemory(handle.segment)
+    except OSError as e:
+        raise SaulveError(
+            f'Could not attach shared memory {handle.segment}: {e}'
+        ) from e
+
+    assert segment.buf is not None
+    view = segment.buf.toreadonly()
+    value = pickle.loads(
+        view[:handle.size],
+        buffers=[
+            view[start:start + length]
+            for start, length in handle.buffers
+        ],
+    )
+    _attached[handle.segment] = (segment, value)
+
+    return value
+
+
+def _release(name: str) -> None:
+    """Detach from a segment attached by the current process, if its loaded
+    value is not used anymore.
+    """
+    attached: Optional[tuple[SharedMemory, Any]] = _attached.pop(name, None)
+    if attached is None:
+        return
+
+    segment, _ = attached
+    try:
+        segment.close()
+    except BufferError:
+        # Views of the segment are still in use, it stays mapped until the
+        # process exits.
+        _retained.append(segment)
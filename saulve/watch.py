@@ -0,0 +1,454 @@
+"""Solve a puzzle again each time its source changes.
+
+Source files of the modules imported from the watched directories are polled
+for modifications. Modified modules are reloaded, along with the watched
+modules that depend on them, in the running process. The puzzle is then
+loaded and solved again.
+
+Steps whose code, inputs and watched dependencies did not change are not run
+again: their previous solutions are reused. The parsed input of the puzzle is
+also reused if its parser did not change.
+"""
+
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import logging
+import pickle
+import sys
+import time
+import types
+from graphlib import CycleError, TopologicalSorter
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .puzzle.cache import ResultCache, hash_code, hash_step_inputs
+from .puzzle.core import Puzzle, PuzzleSolution, PuzzleStep, StepStatus
+from .puzzle.isolation import StepLimits
+
+__all__ = ['ModuleWatcher', 'WatchSession', 'reload_modules']
+
+logger = logging.getLogger(__name__)
+
+
+def _module_file(module: types.ModuleType) -> Optional[Path]:
+    module_file = getattr(module, '__file__', None)
+    if module_file is None or not module_file.endswith('.py'):
+        return None
+
+    return Path(module_file).resolve()
+
+
+class ModuleWatcher:
+    """Detects modifications of the imported modules of some directories.
+
+    Only modules already imported are watched. Modules imported later are
+    watched from the next poll on.
+
+    Arguments:
+        roots: Directories whose modules are watched.
+    """
+
+    def __init__(self, roots: Iterable[Path]) -> None:
+        self.roots = [root.resolve() for root in roots]
+        self._mtimes = self._snapshot()
+
+    def is_watched(self, module: types.ModuleType) -> bool:
+        module_file = _module_file(module)
+        return module_file is not None and any(
+            module_file.is_relative_to(root)
+            for root in self.roots
+        )
+
+    def watched_modules(self) -> dict[str, types.ModuleType]:
+        """Watched modules, by name."""
+        return {
+            name: module
+            for name, module in list(sys.modules.items())
+            if module is not None and self.is_watched(module)
+        }
+
+    def _snapshot(self) -> dict[str, int]:
+        mtimes = {}
+        for name, module in self.watched_modules().items():
+            module_file = _module_file(module)
+            assert module_file is not None
+            try:
+                mtimes[name] = module_file.stat().st_mtime_ns
+            except OSError:
+                continue
+
+        return mtimes
+
+    def watch_new_modules(self) -> None:
+        """Start watching the modules imported since the last poll.
+
+        Modifications of these modules done after the call are reported by
+        the next poll.
+        """
+        for name, mtime in self._snapshot().items():
+            self._mtimes.setdefault(name, mtime)
+
+    def poll(self) -> list[str]:
+        """Get the names of the modules modified since the last poll."""
+        mtimes = self._snapshot()
+        modified = [
+            name
+            for name, mtime in mtimes.items()
+            if name in self._mtimes and self._mtimes[name] != mtime
+        ]
+        self._mtimes = mtimes
+
+        return modified
+
+    def wait(self, interval: float = 0.5) -> list[str]:
+        """Block until some watched modules are modified.
+
+        Returns:
+            The names of the modified modules.
+        """
+        while not (modified := self.poll()):
+            time.sleep(interval)
+
+        return modified
+
+
+def _imported_modules(module: types.ModuleType) -> set[str]:
+    """Names of the modules a module imports, or imports objects from.
+
+    Submodules of a package are not considered as imported by the package.
+    """
+    imported = set()
+
+    for value in list(vars(module).values()):
+        name: Any
+        if isinstance(value, types.ModuleType):
+            name = value.__name__
+        else:
+            name = getattr(value, '__module__', None)
+
+        if (
+            isinstance(name, str)
+            and name != module.__name__
+            and not name.startswith(f'{module.__name__}.')
+        ):
+            imported.add(name)
+
+    return imported
+
+
+def _remove_bytecode(module: types.ModuleType) -> None:
+    """Remove the cached bytecode of a module.
+
+    Bytecode is invalidated by the source modification time, in seconds, and
+    size. A source modified twice within a second, keeping its size, would
+    otherwise be reloaded from stale bytecode.
+    """
+    module_file = _module_file(module)
+    if module_file is None:
+        return
+
+    try:
+        Path(importlib.util.cache_from_source(str(module_file))).unlink()
+    except (OSError, NotImplementedError):
+        pass
+
+
+def reload_modules(
+    modified: Iterable[str],
+    watched: dict[str, types.ModuleType],
+) -> list[str]:
+    """Reload modified modules and the watched modules depending on them.
+
+    A module is reloaded after the modules it depends on.
+
+    Arguments:
+        modified: Names of the modified modules.
+        watched: Modules that can be reloaded, by name.
+
+    Returns:
+        Names of the reloaded modules, in reload order.
+    """
+    dependencies = {
+        name: _imported_modules(module) & watched.keys()
+        for name, module in watched.items()
+    }
+
+    to_reload = set(modified) & watched.keys()
+    changed = True
+    while changed:
+        dependents = {
+            name
+            for name, imported in dependencies.items()
+            if imported & to_reload
+        }
+        changed = not dependents <= to_reload
+        to_reload |= dependents
+
+    graph = {
+        name: dependencies[name] & to_reload
+        for name in to_reload
+    }
+    try:
+        order = list(TopologicalSorter(graph).static_order())
+    except CycleError:
+        order = sorted(to_reload)
+
+    for name in set(modified) & to_reload:
+        _remove_bytecode(watched[name])
+
+    for name in order:
+        importlib.reload(watched[name])
+
+    return order
+
+
+def _hash_reference(
+    value: Any,
+    digest: 'hashlib._Hash',
+    is_watched: Callable[[types.ModuleType], bool],
+    seen: set[int],
+) -> bool:
+    """Hash an object used by a step function.
+
+    Objects of unwatched modules can't change while watching, so only their
+    name is hashed.
+
+    Returns:
+        False if the object can't be hashed.
+    """
+    if id(value) in seen:
+        return True
+    seen.add(id(value))
+
+    if isinstance(value, types.ModuleType):
+        digest.update(value.__name__.encode())
+        module_file = _module_file(value)
+        if module_file is not None and is_watched(value):
+            try:
+                digest.update(module_file.read_bytes())
+            except OSError:
+                return False
+        return True
+
+    if isinstance(value, types.BuiltinFunctionType):
+        digest.update(f'{value.__module__}.{value.__qualname__}'.encode())
+        return True
+
+    if isinstance(value, types.FunctionType | type):
+        digest.update(f'{value.__module__}.{value.__qualname__}'.encode())
+        module = sys.modules.get(value.__module__)
+        if module is None or not is_watched(module):
+            return True
+
+        if isinstance(value, types.FunctionType):
+            return _hash_callable(value, digest, is_watched, seen)
+
+        return all(
+            _hash_reference(attr, digest, is_watched, seen)
+            for attr in vars(value).values()
+            if isinstance(attr, types.FunctionType)
+        )
+
+    try:
+        digest.update(pickle.dumps(value))
+    except Exception:
+        return False
+
+    return True
+
+
+def _hash_callable(
+    fn: Callable,
+    digest: 'hashlib._Hash',
+    is_watched: Callable[[types.ModuleType], bool],
+    seen: set[int],
+) -> bool:
+    """Hash the code of a function, and of the watched objects it uses."""
+    wrapped: Optional[Callable] = fn
+    while wrapped is not None:
+        code = getattr(wrapped, '__code__', None)
+        if code is None:
+            return False
+
+        digest.update(f'{wrapped.__module__}.{wrapped.__qualname__}'.encode())
+        hash_code(code, digest)
+
+        namespace = getattr(wrapped, '__globals__', {})
+        for name in _code_names(code):
+            if name in namespace and not _hash_reference(
+                namespace[name],
+                digest,
+                is_watched,
+                seen,
+            ):
+                return False
+
+        wrapped = getattr(wrapped, '__wrapped__', None)
+
+    return True
+
+
+def _code_names(code: types.CodeType) -> Iterator[str]:
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_names(const)
+
+
+def step_fingerprint(
+    fn: Callable,
+    is_watched: Callable[[types.ModuleType], bool],
+    dependencies: Iterable[Callable] = (),
+) -> Optional[str]:
+    """Hash the code and inputs of a step, and the code of the watched
+    functions, classes and modules it uses.
+
+    Arguments:
+        fn: The step function.
+        is_watched: Tells if a module can be reloaded.
+        dependencies: Other functions whose result is used by the step, such
+            as the puzzle input parser.
+
+    Returns:
+        The fingerprint, or None if the step can't be hashed.
+    """
+    digest = hashlib.sha256()
+    seen: set[int] = set()
+
+    for function in (fn, *dependencies):
+        if not hash_step_inputs(function, digest):
+            return None
+        if not _hash_callable(function, digest, is_watched, seen):
+            return None
+
+    return digest.hexdigest()
+
+
+class WatchSession:
+    """Solves a puzzle, and solves it again when its modules are modified.
+
+    Arguments:
+        load: Loads the puzzle. Called again after each reload.
+        roots: Directories whose modules are watched. Defaults to the
+            directories of the puzzle steps modules.
+        interval: Time between two polls of the watched modules, in seconds.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Puzzle],
+        roots: Optional[Iterable[Path]] = None,
+        interval: float = 0.5,
+    ) -> None:
+        self.load = load
+        self.interval = interval
+        self.puzzle = load()
+        if roots is None:
+            roots = self._step_directories(self.puzzle)
+        self.watcher = ModuleWatcher(roots)
+        self._solutions: dict[str, PuzzleSolution] = {}
+        self._parser_fingerprint: Optional[str] = None
+
+    @staticmethod
+    def _step_directories(puzzle: Puzzle) -> set[Path]:
+        directories = set()
+        for step in puzzle.steps:
+            module = sys.modules.get(inspect.unwrap(step.fn).__module__)
+            module_file = _module_file(module) if module else None
+            if module_file is not None:
+                directories.add(module_file.parent)
+
+        return directories
+
+    def _fingerprint(self, step: PuzzleStep) -> Optional[str]:
+        return step_fingerprint(
+            step.fn,
+            self.watcher.is_watched,
+            step.dependencies(),
+        )
+
+    def iter_solve(
+        self,
+        trace_memory: bool = False,
+        cache: Optional[ResultCache] = None,
+        limits: Optional[StepLimits] = None,
+        profile: bool = False,
+        sample_interval: Optional[float] = None,
+    ) -> Iterator[PuzzleSolution]:
+        """Solve the puzzle, reusing the solutions of unchanged steps.
+
+        Reused solutions are flagged as coming from the cache, and keep the
+        profile of their run. See `Puzzle.solve` for arguments details.
+        """
+        for step in self.puzzle.steps:
+            fingerprint = self._fingerprint(step)
+            if fingerprint is not None and fingerprint in self._solutions:
+                yield self._solutions[fingerprint]._replace(from_cache=True)
+                continue
+
+            solution = step.run_step(
+                trace_memory,
+                cache,
+                limits,
+                profile,
+                sample_interval,
+            )
+            if (
+                fingerprint is not None
+                and solution.is_correct is not False
+                and solution.status is StepStatus.COMPLETED
+            ):
+                self._solutions[fingerprint] = solution
+
+            yield solution
+
+        # Steps may import modules when run
+        self.watcher.watch_new_modules()
+
+    def _parser_changed(self, puzzle: Puzzle) -> bool:
+        """Whether the parser of a puzzle changed since the last call."""
+        if puzzle.parser_fn is None:
+            return True
+
+        fingerprint = step_fingerprint(
+            puzzle.parser_fn,
+            self.watcher.is_watched,
+        )
+        changed = (
+            fingerprint is None
+            or fingerprint != self._parser_fingerprint
+        )
+        self._parser_fingerprint = fingerprint
+
+        return changed
+
+    def wait_and_reload(self) -> list[str]:
+        """Wait for watched modules to be modified, then reload them and the
+        puzzle.
+
+        Returns:
+            Names of the reloaded modules.
+
+        Raises:
+            Exception: Any error raised while reloading the modules or the
+                puzzle. The session can still be used to wait for further
+                modifications.
+        """
+        if self.puzzle.parser_fn is not None:
+            # Fingerprint of the parser whose input is currently parsed
+            self._parser_changed(self.puzzle)
+
+        modified = self.watcher.wait(self.interval)
+        reloaded = reload_modules(modified, self.watcher.watched_modules())
+        logger.debug(f'Reloaded modules: {", ".join(reloaded)}')
+
+        previous = self.puzzle
+        self.puzzle = self.load()
+        if self._parser_changed(self.puzzle):
+            self.puzzle.clear_parsed_input()
+        elif self.puzzle is not previous:
+            self.puzzle.reuse_parsed_input(previous)
+
+        return reloaded
@@ -0,0 +1,3 @@
+from saulve import Puzzle
+
+puzzle = Puzzle(name=' '.join(['Dynamic', 'name']))
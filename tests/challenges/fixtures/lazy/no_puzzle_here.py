@@ -0,0 +1 @@
+foobar = 'foobar'
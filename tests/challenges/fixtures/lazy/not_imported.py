@@ -0,0 +1,5 @@
+from saulve import Puzzle
+
+puzzle = Puzzle(name='Not imported')
+
+raise RuntimeError('This module must not be imported by discovery.')
@@ -1,13 +1,24 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
-from saulve.challenges.advent_of_code import AdventOfCodePuzzle, Calendar
+import pytest
+
+from saulve.challenges.advent_of_code import (
+    AdventOfCodeLoader,
+    AdventOfCodePuzzle,
+    Calendar,
+)
+from saulve.errors import PuzzleNotFound, ValidationError
+from saulve.import_module import import_instance
 from saulve.puzzle import Puzzle
 
+from .fixtures import advent_of_code as aoc_fixtures
+
 
 class TestCalendar:
     def test_finds_challenges(self) -> None:
         puzzle = Mock(Puzzle)
         puzzle.name = 'Puzzle name'
+        puzzle.steps = []
         chall = Calendar([AdventOfCodePuzzle(2022, 1, puzzle)])
 
         found_puzzles = chall.find()
@@ -15,3 +26,80 @@ class TestCalendar:
         assert len(found_puzzles) == 1
         assert found_puzzles[0].id == '2022 01'
         assert found_puzzles[0].name == 'Puzzle name'
+        assert found_puzzles[0].year == 2022
+        assert found_puzzles[0].day == 1
+
+    def test_finds_challenges_sorted_by_date(self) -> None:
+        puzzle = Mock(Puzzle)
+        puzzle.name = 'Puzzle name'
+        puzzle.steps = []
+        chall = Calendar([
+            AdventOfCodePuzzle(2022, 2, puzzle),
+            AdventOfCodePuzzle(2021, 10, puzzle),
+            AdventOfCodePuzzle(2022, 1, puzzle),
+        ])
+
+        found_puzzles = chall.find()
+
+        assert [p.id for p in found_puzzles] == ['2021 10', '2022 01', '2022 02']
+
+    def test_get_puzzle(self) -> None:
+        puzzle = Mock(Puzzle)
+        chall = Calendar([
+            AdventOfCodePuzzle(2022, 1, Mock(Puzzle)),
+            AdventOfCodePuzzle(2022, 2, puzzle),
+        ])
+
+        assert chall.get('2022', '02') is puzzle
+
+    def test_get_unexisting_puzzle_raises_exception(self) -> None:
+        chall = Calendar([AdventOfCodePuzzle(2022, 1, Mock(Puzzle))])
+
+        with pytest.raises(PuzzleNotFound):
+            chall.get('2022', '02')
+
+
+class TestAdventOfCodeLoader:
+    def test_loads_calendar(self) -> None:
+        loader = AdventOfCodeLoader(aoc_fixtures)
+
+        chall = loader.load()
+
+        assert sorted((p.id, p.name) for p in chall.find()) == [
+            ('2021 01', 'Sonar Sweep'),
+            ('2022 01', 'Calorie Counting'),
+            ('2022 02', 'Rock Paper Scissors'),
+        ]
+
+    @pytest.mark.parametrize('year, day, expected_name', [
+        ('2022', '01', 'Calorie Counting'),
+        ('2022', '2', 'Rock Paper Scissors'),
+    ])
+    def test_loads_single_puzzle(
+        self,
+        year: str,
+        day: str,
+        expected_name: str,
+    ) -> None:
+        loader = AdventOfCodeLoader(aoc_fixtures)
+
+        with patch(
+            'saulve.challenges.advent_of_code.import_instance',
+            wraps=import_instance,
+        ) as import_mock:
+            puzzle = loader.load_one(year, day)
+
+        assert puzzle.name == expected_name
+        assert import_mock.call_count == 1
+
+    def test_load_single_unexisting_puzzle(self) -> None:
+        loader = AdventOfCodeLoader(aoc_fixtures)
+
+        with pytest.raises(PuzzleNotFound):
+            loader.load_one('2022', '25')
+
+    def test_validates_single_puzzle_id(self) -> None:
+        loader = AdventOfCodeLoader(aoc_fixtures)
+
+        with pytest.raises(ValidationError):
+            loader.load_one('2022')
@@ -0,0 +1,172 @@
+import pytest
+
+import saulve
+from saulve.challenges.base import PuzzleView
+from saulve.challenges.discovery import (
+    LazyPuzzle,
+    NotStaticallyResolvable,
+    PuzzleInfo,
+    resolve_puzzle,
+    scan_puzzle,
+    scan_puzzle_name,
+)
+from saulve.challenges.generic import GenericLoader
+from saulve.puzzle import Puzzle
+
+from .fixtures import lazy as lazy_fixtures
+
+
+class TestScanPuzzleName:
+    @pytest.mark.parametrize('source', [
+        "puzzle = Puzzle(name='A puzzle')",
+        "puzzle = saulve.Puzzle('A puzzle')",
+        "puzzle: Puzzle = Puzzle(name='A puzzle')",
+    ])
+    def test_finds_literal_puzzle_name(self, source: str) -> None:
+        assert scan_puzzle_name(source) == 'A puzzle'
+
+    def test_module_without_puzzle(self) -> None:
+        assert scan_puzzle_name("foobar = 'foobar'") is None
+
+    def test_ignores_puzzle_used_in_decorators(self) -> None:
+        source = (
+            "puzzle = Puzzle(name='A puzzle')\n"
+            "@puzzle.solution\n"
+            "def solve():\n"
+            "    return puzzle.name\n"
+        )
+
+        assert scan_puzzle_name(source) == 'A puzzle'
+
+    @pytest.mark.parametrize('source', [
+        "puzzle = Puzzle(name=NAME)",
+        "puzzle = make_puzzle('A puzzle')",
+        "from .common import puzzle",
+        "from .common import *",
+        "if True:\n    puzzle = Puzzle(name='A puzzle')",
+        "puzzle = Puzzle('A')\npuzzle = Puzzle('B')",
+        "def broken(:",
+    ])
+    def test_cannot_resolve_dynamic_puzzles(self, source: str) -> None:
+        with pytest.raises(NotStaticallyResolvable):
+            scan_puzzle_name(source)
+
+
+class TestScanPuzzle:
+    def test_counts_solution_steps(self) -> None:
+        source = (
+            "puzzle = Puzzle(name='A puzzle')\n"
+            "@puzzle.solution\n"
+            "@solved(12)\n"
+            "def first():\n"
+            "    return 12\n"
+            "puzzle.solution(lambda: None)\n"
+        )
+
+        assert scan_puzzle(source) == PuzzleInfo(
+            'A puzzle',
+            2,
+            1,
+            answers=('12', None),
+        )
+
+    def test_counts_cases_of_steps(self) -> None:
+        source = (
+            "puzzle = Puzzle(name='A puzzle')\n"
+            "@puzzle.solution\n"
+            "@saulve.budget(max_seconds=1)\n"
+            "@saulve.with_inputs({'a': '1', 'b': '2'}, solutions={'a': 1})\n"
+            "def first(puzzle_input):\n"
+            "    return 12\n"
+            "puzzle.solution(solved(ANSWER)(with_input('2')(second)))\n"
+        )
+
+        assert scan_puzzle(source) == PuzzleInfo(
+            'A puzzle',
+            3,
+            2,
+            True,
+            ('1', None, None),
+        )
+
+    def test_cannot_count_dynamic_cases(self) -> None:
+        source = (
+            "puzzle = Puzzle(name='A puzzle')\n"
+            "@puzzle.solution\n"
+            "@with_inputs(EXAMPLES)\n"
+            "def first(puzzle_input):\n"
+            "    return 12\n"
+        )
+
+        with pytest.raises(NotStaticallyResolvable):
+            scan_puzzle(source)
+
+    def test_cannot_count_dynamically_registered_steps(self) -> None:
+        source = (
+            "puzzle = Puzzle(name='A puzzle')\n"
+            "for step in steps:\n"
+            "    puzzle.solution(step)\n"
+        )
+
+        with pytest.raises(NotStaticallyResolvable):
+            scan_puzzle(source)
+
+
+def test_puzzle_info_of_loaded_puzzle() -> None:
+    puzzle = Puzzle(name='A puzzle')
+    puzzle.solution(saulve.solved(1)(lambda: 1))
+    puzzle.solution(saulve.budget(max_seconds=1)(lambda: 2))
+
+    assert PuzzleInfo.of(puzzle) == PuzzleInfo(
+        'A puzzle',
+        2,
+        1,
+        True,
+        ('1', None),
+    )
+
+
+def test_resolve_lazy_puzzle_imports_module() -> None:
+    lazy_puzzle = LazyPuzzle(
+        'tests.challenges.fixtures.generic.contains_puzzle',
+        'A puzzle',
+    )
+
+    puzzle = resolve_puzzle(lazy_puzzle)
+
+    assert isinstance(puzzle, Puzzle)
+    assert puzzle.name == 'A puzzle'
+    assert lazy_puzzle.is_loaded
+
+
+class TestLazyGenericLoader:
+    def test_finds_puzzles_without_importing_them(self) -> None:
+        loader = GenericLoader(lazy_fixtures, lazy=True, cache=False)
+
+        chall = loader.load()
+
+        assert sorted((p.id, p.name) for p in chall.find()) == [
+            ('dynamic_name', 'Dynamic name'),
+            ('not_imported', 'Not imported'),
+        ]
+
+    def test_finds_metadata_without_importing_puzzles(self) -> None:
+        loader = GenericLoader(lazy_fixtures, lazy=True, cache=False)
+
+        views = {view.id: view for view in loader.load().find()}
+
+        assert views['not_imported'] == PuzzleView(
+            'not_imported',
+            'Not imported',
+            steps=0,
+            solved_steps=0,
+            has_budget=False,
+            answers=(),
+        )
+
+    def test_imports_puzzle_on_get(self) -> None:
+        loader = GenericLoader(lazy_fixtures, lazy=True, cache=False)
+        chall = loader.load()
+
+        with pytest.raises(RuntimeError, match='must not be imported'):
+            chall.get('not_imported')
@@ -0,0 +1,64 @@
+import pytest
+
+from saulve.challenges.base import PuzzleView
+from saulve.challenges.filters import Bounds, PuzzleFilter, parse_bounds
+from saulve.errors import ValidationError
+
+DAY_1 = PuzzleView('2022 01', 'Calorie Counting', 2022, 1, 2, 2, False)
+DAY_2 = PuzzleView('2022 02', 'Rock Paper Scissors', 2022, 2, 2, 1, True)
+OLD_DAY = PuzzleView('2015 10', 'Elves Look, Elves Say', 2015, 10, 1, 0, False)
+UNKNOWN = PuzzleView('problem_001', 'Multiples of 3 or 5')
+
+VIEWS = [DAY_1, DAY_2, OLD_DAY, UNKNOWN]
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('12', Bounds(12, 12)),
+    ('1..10', Bounds(1, 10)),
+    ('..10', Bounds(None, 10)),
+    ('2..', Bounds(2, None)),
+])
+def test_parse_bounds(value: str, expected: Bounds) -> None:
+    assert parse_bounds(value) == expected
+
+
+@pytest.mark.parametrize('value', ['', 'a', '1..b', '1...2'])
+def test_parse_invalid_bounds(value: str) -> None:
+    with pytest.raises(ValidationError):
+        parse_bounds(value)
+
+
+@pytest.mark.parametrize('terms, expected', [
+    ([], VIEWS),
+    (['2022'], [DAY_1, DAY_2]),
+    (['2022', '02'], [DAY_2]),
+    (['2022', '1'], [DAY_1]),
+    (['2022', '01', 'extra'], []),
+    (['year:2015..2021'], [OLD_DAY]),
+    (['day:2..'], [DAY_2, OLD_DAY]),
+    (['steps:2'], [DAY_1, DAY_2]),
+    (['name:ELVES'], [OLD_DAY]),
+    (['name~^[A-D]'], [DAY_1]),
+    (['name:s', 'name:c'], [DAY_2]),
+    (['solved'], [DAY_1]),
+    (['unsolved'], [DAY_2, OLD_DAY]),
+    (['budget'], [DAY_2]),
+    (['2022', 'unsolved', 'day:..5'], [DAY_2]),
+])
+def test_selects_matching_puzzles(
+    terms: list[str],
+    expected: list[PuzzleView],
+) -> None:
+    assert PuzzleFilter.parse(terms).select(VIEWS) == expected
+
+
+@pytest.mark.parametrize('term', ['color:red', 'year~20', 'name~(', 'day:x'])
+def test_rejects_invalid_terms(term: str) -> None:
+    with pytest.raises(ValidationError):
+        PuzzleFilter.parse([term])
+
+
+def test_puzzle_without_steps_is_not_solved() -> None:
+    view = PuzzleView('empty', 'Empty', steps=0, solved_steps=0)
+
+    assert not PuzzleFilter.parse(['solved']).matches(view)
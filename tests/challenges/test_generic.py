@@ -36,6 +36,7 @@ class TestChallenge:
     def test_finds_challenges(self) -> None:
         puzzle = Mock(Puzzle)
         puzzle.name = 'Puzzle name'
+        puzzle.steps = []
         chall = Challenge(puzzles={'foo': puzzle})
 
         found_puzzles = chall.find()
@@ -81,3 +82,24 @@ class TestGenericLoader:
                 caplog.text,
             ) is not None
         ), f'"{caplog.text}" does not match expected message.'
+
+    def test_loads_single_puzzle(self) -> None:
+        loader = GenericLoader(generic_fixtures)
+
+        puzzle = loader.load_one('contains_puzzle')
+
+        assert puzzle.name == 'A puzzle'
+
+    def test_loads_single_puzzle_from_regexp_id(self) -> None:
+        loader = GenericLoader(generic_fixtures, id_regexp=r'(contains)')
+
+        puzzle = loader.load_one('contains')
+
+        assert puzzle.name == 'A puzzle'
+
+    @pytest.mark.parametrize('puzzle_id', ['no_puzzle_here', 'missing'])
+    def test_load_single_unexisting_puzzle(self, puzzle_id: str) -> None:
+        loader = GenericLoader(generic_fixtures)
+
+        with pytest.raises(PuzzleNotFound):
+            loader.load_one(puzzle_id)
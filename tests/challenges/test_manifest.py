@@ -0,0 +1,187 @@
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from saulve.challenges.discovery import PuzzleInfo
+from saulve.challenges.generic import GenericLoader
+from saulve.challenges.manifest import MANIFEST_VERSION, DiscoveryManifest
+
+from .fixtures import lazy as lazy_fixtures
+
+
+def _write_module(path: Path, name: str) -> None:
+    path.write_text(
+        'from saulve import Puzzle\n'
+        f'puzzle = Puzzle(name={name!r})\n'
+        '@puzzle.solution\n'
+        '@solved(1)\n'
+        'def solve():\n'
+        '    return 1\n'
+    )
+
+
+class TestDiscoveryManifest:
+    def test_scans_puzzle_module(self, tmp_path: Path) -> None:
+        module = tmp_path / 'day_01.py'
+        _write_module(module, 'A puzzle')
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+
+        scan = manifest.scan(module)
+
+        assert scan.is_static
+        assert scan.puzzle == PuzzleInfo('A puzzle', 1, 1, answers=('1',))
+
+    def test_reuses_saved_scans(self, tmp_path: Path) -> None:
+        module = tmp_path / 'day_01.py'
+        _write_module(module, 'A puzzle')
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        manifest.scan(module)
+        manifest.save()
+
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        with patch('saulve.challenges.manifest.scan_module') as scan_module:
+            scan = manifest.scan(module)
+
+        scan_module.assert_not_called()
+        assert scan.puzzle == PuzzleInfo('A puzzle', 1, 1, answers=('1',))
+
+    def test_scans_modified_modules_again(self, tmp_path: Path) -> None:
+        module = tmp_path / 'day_01.py'
+        _write_module(module, 'A puzzle')
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        manifest.scan(module)
+        manifest.save()
+
+        _write_module(module, 'Renamed puzzle')
+        stat = module.stat()
+        os.utime(module, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        scan = DiscoveryManifest(tmp_path / 'manifest.json').scan(module)
+
+        assert scan.puzzle == PuzzleInfo(
+            'Renamed puzzle',
+            1,
+            1,
+            answers=('1',),
+        )
+
+    def test_reuses_unmodified_directory_listing(self, tmp_path: Path) -> None:
+        challenge_dir = tmp_path / 'challenge'
+        (challenge_dir / 'year_2022').mkdir(parents=True)
+        (challenge_dir / 'day_01.py').touch()
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        manifest.list_directory(challenge_dir)
+        manifest.save()
+
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        with patch('saulve.challenges.manifest._read_directory') as read:
+            entries = manifest.list_directory(challenge_dir)
+
+        read.assert_not_called()
+        assert sorted(entries) == [
+            (challenge_dir / 'day_01.py', False),
+            (challenge_dir / 'year_2022', True),
+        ]
+
+    def test_drops_unused_entries(self, tmp_path: Path) -> None:
+        first = tmp_path / 'day_01.py'
+        second = tmp_path / 'day_02.py'
+        _write_module(first, 'First')
+        _write_module(second, 'Second')
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        manifest.scan(first)
+        manifest.scan(second)
+        manifest.save()
+
+        manifest = DiscoveryManifest(tmp_path / 'manifest.json')
+        manifest.scan(first)
+        manifest.save()
+
+        content = json.loads((tmp_path / 'manifest.json').read_text())
+        assert list(content['modules']) == [str(first)]
+
+    def test_ignores_manifest_from_other_versions(self, tmp_path: Path) -> None:
+        module = tmp_path / 'day_01.py'
+        _write_module(module, 'A puzzle')
+        stat = module.stat()
+        (tmp_path / 'manifest.json').write_text(json.dumps({
+            'version': -1,
+            'directories': {},
+            'modules': {
+                str(module): {
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'is_static': True,
+                    'puzzle': ['Outdated', 0],
+                },
+            },
+        }))
+
+        scan = DiscoveryManifest(tmp_path / 'manifest.json').scan(module)
+
+        assert scan.puzzle == PuzzleInfo('A puzzle', 1, 1, answers=('1',))
+
+
+    @pytest.mark.parametrize('entry', [
+        {},
+        {'is_static': True, 'puzzle': ['Malformed']},
+        ['not', 'an', 'entry'],
+    ])
+    def test_scans_again_malformed_modules(
+        self,
+        tmp_path: Path,
+        entry: object,
+    ) -> None:
+        module = tmp_path / 'day_01.py'
+        _write_module(module, 'A puzzle')
+        stat = module.stat()
+        if isinstance(entry, dict):
+            entry = {'mtime_ns': stat.st_mtime_ns, **entry}
+            entry.setdefault('size', stat.st_size)
+        (tmp_path / 'manifest.json').write_text(json.dumps({
+            'version': MANIFEST_VERSION,
+            'directories': {},
+            'modules': {str(module): entry},
+        }))
+
+        scan = DiscoveryManifest(tmp_path / 'manifest.json').scan(module)
+
+        assert scan.puzzle == PuzzleInfo('A puzzle', 1, 1, answers=('1',))
+
+    @pytest.mark.parametrize('entry', [
+        {},
+        {'entries': [['day_01.py']]},
+        'not an entry',
+    ])
+    def test_lists_again_malformed_directories(
+        self,
+        tmp_path: Path,
+        entry: object,
+    ) -> None:
+        challenge_dir = tmp_path / 'challenge'
+        challenge_dir.mkdir()
+        (challenge_dir / 'day_01.py').touch()
+        if isinstance(entry, dict):
+            entry = {'mtime_ns': challenge_dir.stat().st_mtime_ns, **entry}
+        (tmp_path / 'manifest.json').write_text(json.dumps({
+            'version': MANIFEST_VERSION,
+            'directories': {str(challenge_dir): entry},
+            'modules': {},
+        }))
+
+        entries = DiscoveryManifest(
+            tmp_path / 'manifest.json',
+        ).list_directory(challenge_dir)
+
+        assert entries == [(challenge_dir / 'day_01.py', False)]
+
+
+def test_loader_stores_manifest_in_cache_dir(tmp_path: Path) -> None:
+    loader = GenericLoader(lazy_fixtures, lazy=True, cache_dir=tmp_path)
+
+    loader.load()
+
+    manifest = tmp_path / f'{lazy_fixtures.__name__}.saulve-discovery.json'
+    assert manifest.is_file()
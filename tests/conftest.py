@@ -0,0 +1,11 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def history_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep runs solved by tests out of the user run history."""
+    path = tmp_path / 'history.sqlite3'
+    monkeypatch.setenv('SAULVE_HISTORY_FILE', str(path))
+    return path
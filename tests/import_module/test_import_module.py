@@ -1,7 +1,9 @@
+from pathlib import Path
+
 import pytest
 
 from saulve.errors import MissingAttribute, WrongAttributeType
-from saulve.import_module import import_instance
+from saulve.import_module import import_instance, locate_module
 
 
 def test_module_must_have_attribute() -> None:
@@ -27,3 +29,22 @@ def test_import_module_attribute() -> None:
         str)
 
     assert imported == 'a string'
+
+
+def test_locate_top_level_package() -> None:
+    location = locate_module('tests.import_module.test_module')
+
+    assert location == Path(__file__).parent.parent.resolve() / '__init__.py'
+
+
+def test_locate_package_of_working_directory(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    (tmp_path / 'cwd_app').mkdir()
+    (tmp_path / 'cwd_app' / '__init__.py').touch()
+    monkeypatch.chdir(tmp_path)
+
+    location = locate_module('cwd_app')
+
+    assert location == (tmp_path / 'cwd_app' / '__init__.py').resolve()
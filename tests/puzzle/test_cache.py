@@ -0,0 +1,140 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from saulve.puzzle.cache import ResultCache, step_cache_key
+from saulve.puzzle.core import PuzzleStep
+from saulve.puzzle.decorators import solved, with_input, with_input_file
+
+
+def _add_one(value: int) -> int:
+    return value + 1
+
+
+def _add_two(value: int) -> int:
+    return value + 2
+
+
+class TestStepCacheKey:
+    def test_same_step_has_same_key(self) -> None:
+        assert (
+            step_cache_key(with_input(1)(_add_one))
+            == step_cache_key(with_input(1)(_add_one))
+        )
+
+    def test_key_depends_on_input(self) -> None:
+        assert (
+            step_cache_key(with_input(1)(_add_one))
+            != step_cache_key(with_input(2)(_add_one))
+        )
+
+    def test_key_depends_on_code(self) -> None:
+        assert (
+            step_cache_key(with_input(1)(_add_one))
+            != step_cache_key(with_input(1)(_add_two))
+        )
+
+    def test_key_depends_on_input_file_content(self, tmp_path: Path) -> None:
+        path = tmp_path / 'input.txt'
+        step = with_input_file(path)(_add_one)
+        path.write_text('1')
+        first_key = step_cache_key(step)
+
+        path.write_text('2')
+
+        assert step_cache_key(step) != first_key
+
+    def test_missing_input_file_is_not_cacheable(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        step = with_input_file(tmp_path / 'missing.txt')(_add_one)
+
+        assert step_cache_key(step) is None
+
+    def test_unpicklable_input_is_not_cacheable(self) -> None:
+        assert step_cache_key(with_input(lambda: 1)(_add_one)) is None
+
+
+class TestResultCache:
+    def test_stores_answers(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path)
+
+        cache.set('key', 42)
+
+        cached = cache.get('key')
+        assert cached is not None
+        assert cached.answer == 42
+        assert cache.get('other') is None
+
+    @pytest.mark.parametrize('content', [
+        '[1]',
+        '{"answer": ',
+        '{"other": 42}',
+        '{"answer": [42]}',
+    ])
+    def test_malformed_entries_are_missed(
+        self,
+        tmp_path: Path,
+        content: str,
+    ) -> None:
+        (tmp_path / 'key.json').write_text(content)
+
+        assert ResultCache(tmp_path).get('key') is None
+
+    def test_refresh_ignores_stored_answers(self, tmp_path: Path) -> None:
+        ResultCache(tmp_path).set('key', 42)
+
+        assert ResultCache(tmp_path, refresh=True).get('key') is None
+
+    def test_evicts_least_recently_used_answers(self, tmp_path: Path) -> None:
+        cache = ResultCache(tmp_path, max_size=30)
+        cache.set('first', 1)
+        cache.set('second', 2)
+        os.utime(tmp_path / 'first.json', ns=(0, 0))
+        os.utime(tmp_path / 'second.json', ns=(1, 1))
+
+        cache.set('third', 3)
+
+        assert cache.get('first') is None
+        assert cache.get('second') is not None
+        assert cache.get('third') is not None
+
+
+def test_step_answers_are_reused(tmp_path: Path) -> None:
+    calls = []
+    cache = ResultCache(tmp_path)
+    step = PuzzleStep(with_input(1)(lambda value: calls.append(value) or 12))
+
+    first = step.run_step(cache=cache)
+    second = step.run_step(cache=cache)
+
+    assert len(calls) == 1
+    assert (first.solution, first.from_cache) == ('12', False)
+    assert (second.solution, second.from_cache) == ('12', True)
+    assert second.is_correct is True
+
+
+def test_cached_answers_are_checked(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    step = PuzzleStep(solved(12)(lambda: 12))
+    key = step_cache_key(step.fn)
+    assert key is not None
+    cache.set(key, 13)
+
+    solution = step.run_step(cache=cache)
+
+    assert solution.from_cache is True
+    assert solution.is_correct is False
+    assert solution.solution is None
+
+
+def test_key_depends_on_parser() -> None:
+    def step() -> int:
+        return 1
+
+    assert (
+        step_cache_key(step, [with_input(1)(_add_one)])
+        != step_cache_key(step, [with_input(2)(_add_one)])
+    )
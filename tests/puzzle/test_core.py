@@ -1,37 +1,35 @@
+import asyncio
+from pathlib import Path
 from typing import Callable
 
 import pytest
 
-from saulve.errors import PuzzleHasNoSolution, WrongStepSolution
-from saulve.puzzle.core import Puzzle, PuzzleStep
+from saulve.errors import (
+    PuzzleHasNoSolution,
+    SaulveError,
+    WrongStepSolution,
+)
+from saulve.puzzle.cache import ResultCache
+from saulve.puzzle.core import Puzzle, PuzzleStep, StepStatus
+from saulve.puzzle.decorators import (
+    budget,
+    limits,
+    solved,
+    with_input,
+    with_inputs,
+)
 
 
 def _raise_wrong_step_solution() -> None:
     raise WrongStepSolution('Raised on purpose.')
 
 
-def test_push_next_puzzle_step() -> None:
-    root = PuzzleStep(lambda: 12)
-    second = root.push_step(lambda: 12)
-    third = root.push_step(lambda: 12)
-
-    assert root._next is second
-    assert root._next._next is third
-
-    assert root.has_next is True
-    assert second.has_next is True
-    assert third.has_next is False
-
-
-def test_execute_all_step_functions() -> None:
-    step = PuzzleStep(lambda: 'first')
-    step.push_step(lambda: 'second')
-
-    solutions = step.run()
+def test_register_puzzle_steps_in_order() -> None:
+    puzzle = Puzzle(name='Test Puzzle')
+    first = puzzle.solution(lambda: 12)
+    second = puzzle.solution(lambda: 12)
 
-    assert len(solutions) == 2
-    assert solutions[0].solution == 'first'
-    assert solutions[1].solution == 'second'
+    assert puzzle.steps == [first, second]
 
 
 @pytest.mark.parametrize('fn, expected_correctness', [
@@ -45,10 +43,9 @@ def test_resolve_step_run_correctness(
 ) -> None:
     step = PuzzleStep(fn)
 
-    solutions = step.run()
+    solution = step.run_step()
 
-    assert len(solutions) == 1
-    assert solutions[0].is_correct is expected_correctness
+    assert solution.is_correct is expected_correctness
 
 
 def test_cannot_solve_puzzle_without_registered_solution() -> None:
@@ -68,3 +65,265 @@ def test_solve_puzzle_steps() -> None:
     assert len(solutions) == 2
     assert solutions[0].solution == '12'
     assert solutions[1].solution == 'second one'
+
+
+def test_iter_solve_yields_solutions_as_steps_finish() -> None:
+    puzzle = Puzzle(name='Test Puzzle')
+    calls = []
+    puzzle.solution(lambda: calls.append('first') or 1)
+    puzzle.solution(lambda: calls.append('second') or 2)
+
+    solutions = puzzle.iter_solve()
+
+    assert next(solutions).solution == '1'
+    assert calls == ['first']
+    assert next(solutions).solution == '2'
+    assert calls == ['first', 'second']
+
+
+def test_cannot_iter_solve_puzzle_without_registered_solution() -> None:
+    puzzle = Puzzle(name='Test Puzzle')
+
+    with pytest.raises(PuzzleHasNoSolution):
+        puzzle.iter_solve()
+
+
+def test_solve_single_puzzle_step() -> None:
+    puzzle = Puzzle(name='Test Puzzle')
+    puzzle.solution(lambda: 12)
+    puzzle.solution(lambda: 'second one')
+
+    solution = puzzle.solve_step(1)
+
+    assert len(puzzle.steps) == 2
+    assert solution.solution == 'second one'
+
+
+class TestInputs:
+    def test_register_a_step_per_input(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+
+        @puzzle.solution
+        @with_inputs(
+            {'example': [1, 2], 'input': [3, 4]},
+            solutions={'example': 3, 'input': 8},
+        )
+        def step(numbers: list[int]) -> int:
+            return sum(numbers)
+
+        solutions = puzzle.solve()
+
+        assert step is puzzle.steps[0]
+        assert [s.case for s in puzzle.steps] == ['example', 'input']
+        assert [
+            (s.case, s.solution, s.is_correct)
+            for s in solutions
+        ] == [('example', '3', True), ('input', None, False)]
+
+    def test_cases_are_cached_separately(self, tmp_path: Path) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.solution(with_inputs({'a': 1, 'b': 2})(lambda n: n * 10))
+        cache = ResultCache(tmp_path)
+
+        puzzle.solve(cache=cache)
+        solutions = puzzle.solve(cache=cache)
+
+        assert [(s.solution, s.from_cache) for s in solutions] == [
+            ('10', True),
+            ('20', True),
+        ]
+        assert [s.case for s in solutions] == ['a', 'b']
+
+
+class TestBudget:
+    def test_step_within_budget_is_completed(self) -> None:
+        step = PuzzleStep(budget(max_seconds=60)(lambda: 12))
+
+        solution = step.run_step()
+
+        assert solution.status is StepStatus.COMPLETED
+        assert not solution.is_failed
+
+    def test_step_over_budget_keeps_its_answer(self) -> None:
+        step = PuzzleStep(budget(max_seconds=0)(lambda: 12))
+
+        solution = step.run_step()
+
+        assert solution.solution == '12'
+        assert solution.is_correct is True
+        assert solution.status is StepStatus.OVER_BUDGET
+        assert solution.is_failed
+
+    def test_memory_budget_traces_memory(self) -> None:
+        step = PuzzleStep(budget(max_memory=1024)(lambda: len([0] * 10_000)))
+
+        solution = step.run_step()
+
+        assert solution.metrics is not None
+        assert solution.metrics.peak_memory is not None
+        assert solution.status is StepStatus.OVER_BUDGET
+
+    def test_budget_of_profiled_steps_is_not_checked(self) -> None:
+        step = PuzzleStep(budget(max_seconds=0)(lambda: 12))
+
+        solution = step.run_step(profile=True)
+
+        assert solution.status is StepStatus.COMPLETED
+
+
+class TestProfile:
+    def test_steps_are_not_profiled_by_default(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.solution(lambda: 12)
+
+        assert puzzle.solve()[0].profile is None
+
+    def test_profile_steps(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+
+        @puzzle.solution
+        def step() -> int:
+            return sum(range(10))
+
+        solution = puzzle.solve(profile=True)[0]
+
+        assert solution.solution == '45'
+        assert solution.profile is not None
+        assert {name for _, _, name in solution.profile.stats} == {
+            'step',
+            '<built-in method builtins.sum>',
+        }
+
+    def test_profile_coroutine_steps(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+
+        @puzzle.solution
+        async def step() -> int:
+            await asyncio.sleep(0)
+            return 12
+
+        solution = puzzle.solve(profile=True)[0]
+
+        assert solution.profile is not None
+        names = {name for _, _, name in solution.profile.stats}
+        assert 'step' in names
+        # Frames of the event loop are not profiled
+        assert '_run_once' not in names
+
+    def test_profile_steps_run_in_child_process(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.solution(limits(timeout=10)(lambda: 12))
+
+        solution = puzzle.solve(profile=True)[0]
+
+        assert solution.solution == '12'
+        assert solution.profile is not None
+        assert solution.profile.stats
+
+    def test_profiled_steps_are_not_taken_from_cache(
+        self,
+        tmp_path: Path,
+    ) -> None:
+        cache = ResultCache(tmp_path)
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.solution(lambda: 12)
+        puzzle.solve(cache=cache)
+
+        solution = puzzle.solve(cache=cache, profile=True)[0]
+
+        assert not solution.from_cache
+        assert solution.profile is not None
+
+
+class TestAsyncSteps:
+    def test_run_coroutine_step(self) -> None:
+        async def solve(value: int) -> int:
+            await asyncio.sleep(0)
+            return value * 2
+
+        step = PuzzleStep(solved(42)(with_input(21)(solve)))
+
+        assert step.is_async
+        assert step.run_step().solution == '42'
+
+    def test_check_coroutine_step_solution(self) -> None:
+        async def solve() -> int:
+            return 12
+
+        step = PuzzleStep(solved(42)(solve))
+
+        assert step.run_step().is_correct is False
+
+    def test_solve_steps_concurrently(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        first_started = asyncio.Event()
+
+        @puzzle.solution
+        async def second() -> int:
+            # Would never finish if steps were run one after the other
+            await first_started.wait()
+            return 2
+
+        @puzzle.solution
+        async def first() -> int:
+            first_started.set()
+            return 1
+
+        solutions = asyncio.run(puzzle.solve_async())
+
+        assert [s.solution for s in solutions] == ['2', '1']
+
+    def test_solve_sync_steps_in_threads(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.parser(lambda: [1, 2, 3])
+        puzzle.solution(puzzle.with_parsed_input(sum))
+        puzzle.solution(lambda: 'sync')
+
+        solutions = asyncio.run(
+            puzzle.solve_async(semaphore=asyncio.Semaphore(1)),
+        )
+
+        assert [s.solution for s in solutions] == ['6', 'sync']
+
+
+class TestParser:
+    def test_parses_input_once(self) -> None:
+        calls = []
+        puzzle = Puzzle(name='Test Puzzle')
+
+        @puzzle.parser
+        def parse() -> list[int]:
+            calls.append(1)
+            return [1, 2, 3]
+
+        puzzle.solution(puzzle.with_parsed_input(lambda numbers: sum(numbers)))
+        puzzle.solution(puzzle.with_parsed_input(lambda numbers: max(numbers)))
+
+        solutions = puzzle.solve()
+        puzzle.solve()
+
+        assert [s.solution for s in solutions] == ['6', '3']
+        assert len(calls) == 1
+        assert puzzle.parse_metrics is not None
+
+    def test_parses_lazily(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.parser(lambda: 1 / 0)
+        puzzle.solution(lambda: 12)
+
+        puzzle.solve()
+
+        assert puzzle.parse_metrics is None
+
+    def test_cannot_register_two_parsers(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.parser(lambda: 1)
+
+        with pytest.raises(SaulveError):
+            puzzle.parser(lambda: 2)
+
+    def test_cannot_parse_without_parser(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+
+        with pytest.raises(SaulveError):
+            puzzle.parse()
@@ -1,12 +1,33 @@
+import asyncio
+from pathlib import Path
+
 import pytest
 
-from saulve.errors import WrongStepSolution
-from saulve.puzzle.decorators import solved, with_input
+from saulve.errors import SaulveError, WrongStepSolution
+from saulve.puzzle.decorators import (
+    StepCase,
+    budget,
+    get_step_budget,
+    get_step_cases,
+    get_step_inputs,
+    get_step_solutions,
+    is_async_step,
+    limits,
+    solved,
+    with_input,
+    with_input_file,
+    with_inputs,
+)
+from saulve.puzzle.metrics import StepBudget
 
 
 @pytest.mark.parametrize('decorate', [
     solved(12),
     with_input(12),
+    limits(timeout=12),
+    budget(max_seconds=12),
+    with_inputs({'input': 12}),
+    with_input_file('input.txt'),
 ])
 def test_decorated_functions_are_wrapped(decorate) -> None:  # type: ignore
     def under_test() -> None:
@@ -33,3 +54,122 @@ def test_solved_raises_exception_on_wrong_solution() -> None:
 
     with pytest.raises(WrongStepSolution):
         fn()
+
+
+def test_decorators_record_step_metadata() -> None:
+    fn = solved(12)(with_input(10)(with_input(2)(lambda a, b: a + b)))
+
+    assert get_step_inputs(fn) == (10, 2)
+    assert get_step_solutions(fn) == (12,)
+
+
+def test_decorated_coroutine_functions_stay_coroutine_functions() -> None:
+    async def under_test(value: int) -> int:
+        return value
+
+    fn = solved(12)(with_input(12)(under_test))
+
+    assert is_async_step(fn)
+    assert asyncio.run(fn()) == 12
+
+
+def test_solved_checks_coroutine_function_solution() -> None:
+    async def under_test() -> str:
+        return 'Ni!'
+
+    fn = solved('Ekke Ekke')(under_test)
+
+    with pytest.raises(WrongStepSolution):
+        asyncio.run(fn())
+
+
+class TestWithInputFile:
+    @pytest.fixture
+    def input_file(self, tmp_path: Path) -> Path:
+        path = tmp_path / 'input.txt'
+        path.write_text('spam\neggs\n')
+        return path
+
+    def test_file_is_read_when_step_is_run(self, tmp_path: Path) -> None:
+        path = tmp_path / 'input.txt'
+        fn = with_input_file(path)(lambda s: s.upper())
+
+        path.write_text('spam')
+
+        assert fn() == 'SPAM'
+
+    def test_bytes_mode(self, input_file: Path) -> None:
+        fn = with_input_file(input_file, mode='bytes')(lambda b: b)
+
+        assert fn() == b'spam\neggs\n'
+
+    def test_lines_mode(self, input_file: Path) -> None:
+        fn = with_input_file(input_file, mode='lines')(list)
+
+        assert fn() == ['spam', 'eggs']
+
+    def test_mmap_mode(self, input_file: Path) -> None:
+        fn = with_input_file(input_file, mode='mmap')(lambda m: m[:4])
+
+        assert fn() == b'spam'
+
+    def test_mmap_mode_with_empty_file(self, tmp_path: Path) -> None:
+        path = tmp_path / 'empty.txt'
+        path.touch()
+        fn = with_input_file(path, mode='mmap')(len)
+
+        assert fn() == 0
+
+    def test_relative_path_is_relative_to_step_module(self) -> None:
+        fn = with_input_file('input.txt')(lambda s: s)
+
+        assert get_step_inputs(fn)[0].path == (
+            Path(__file__).parent / 'input.txt'
+        )
+
+    def test_coroutine_step(self, input_file: Path) -> None:
+        async def under_test(lines: list[str]) -> int:
+            return len(list(lines))
+
+        fn = with_input_file(input_file, mode='lines')(under_test)
+
+        assert asyncio.run(fn()) == 2
+
+    def test_rejects_unknown_mode(self) -> None:
+        with pytest.raises(ValueError):
+            with_input_file('input.txt', mode='csv')  # type: ignore[arg-type]
+
+
+def test_budget_is_declared_on_step() -> None:
+    @budget(max_memory=1024)
+    @budget(max_seconds=1, max_memory=2048)
+    def step() -> None:
+        ...
+
+    assert get_step_budget(step) == StepBudget(1, 1024)
+
+
+def test_inputs_are_declared_on_step() -> None:
+    @with_inputs({'example': 1, 'input': 2}, solutions={'example': 3})
+    def step(puzzle_input: int) -> int:
+        return puzzle_input
+
+    assert get_step_cases(step) == (
+        StepCase('example', 1, 3),
+        StepCase('input', 2, None),
+    )
+
+
+def test_inputs_need_known_cases() -> None:
+    with pytest.raises(SaulveError):
+        with_inputs({}, {})
+
+    with pytest.raises(SaulveError):
+        with_inputs({'input': 1}, solutions={'example': 2})
+
+
+def test_inputs_are_declared_once() -> None:
+    decorate = with_inputs({'input': 1})
+
+    with pytest.raises(SaulveError):
+        decorate(decorate(lambda puzzle_input: puzzle_input))
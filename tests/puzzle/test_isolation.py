@@ -0,0 +1,58 @@
+import os
+import time
+
+import pytest
+
+from saulve.errors import StepCrashed, StepOutOfMemory, StepTimeout
+from saulve.puzzle.core import PuzzleStep, StepStatus
+from saulve.puzzle.decorators import limits, solved
+from saulve.puzzle.isolation import StepLimits, run_isolated
+
+
+def _raise_error() -> None:
+    raise RuntimeError('Raised on purpose.')
+
+
+def _allocate() -> int:
+    return len(bytearray(1024 ** 3))
+
+
+class TestRunIsolated:
+    def test_returns_function_result(self) -> None:
+        assert run_isolated(os.getpid, StepLimits(timeout=10)) != os.getpid()
+
+    def test_times_out(self) -> None:
+        with pytest.raises(StepTimeout):
+            run_isolated(lambda: time.sleep(10), StepLimits(timeout=0.1))
+
+    def test_limits_memory(self) -> None:
+        with pytest.raises(StepOutOfMemory):
+            run_isolated(_allocate, StepLimits(max_memory=512 * 1024 ** 2))
+
+    def test_reports_errors(self) -> None:
+        with pytest.raises(StepCrashed, match='Raised on purpose.'):
+            run_isolated(_raise_error, StepLimits(timeout=10))
+
+
+def test_merge_limits() -> None:
+    limits = StepLimits(timeout=1).merge(StepLimits(timeout=2, max_memory=3))
+
+    assert limits == StepLimits(timeout=1, max_memory=3)
+
+
+def test_step_limits_are_declared_by_decorator() -> None:
+    step = PuzzleStep(limits(timeout=0.1)(lambda: time.sleep(10)))
+
+    solution = step.run_step()
+
+    assert solution.status is StepStatus.TIMED_OUT
+    assert solution.solution is None
+
+
+def test_step_with_default_limits_runs_isolated() -> None:
+    step = PuzzleStep(solved(12)(lambda: 13))
+
+    solution = step.run_step(limits=StepLimits(timeout=10))
+
+    assert solution.status is StepStatus.COMPLETED
+    assert solution.is_correct is False
@@ -0,0 +1,51 @@
+import time
+import tracemalloc
+
+from saulve.puzzle.metrics import StepBudget, StepMeter, StepMetrics
+
+
+def test_measures_elapsed_time() -> None:
+    with StepMeter() as meter:
+        time.sleep(0.01)
+
+    assert meter.metrics is not None
+    assert meter.metrics.wall_time >= 0.01
+    assert meter.metrics.cpu_time >= 0
+    assert meter.metrics.peak_memory is None
+
+
+def test_measures_peak_memory() -> None:
+    with StepMeter(trace_memory=True) as meter:
+        allocated = bytearray(1024 * 1024)
+        del allocated
+
+    assert meter.metrics is not None
+    assert meter.metrics.peak_memory is not None
+    assert meter.metrics.peak_memory >= 1024 * 1024
+    assert not tracemalloc.is_tracing()
+
+
+def test_keeps_tracing_memory_if_already_started() -> None:
+    tracemalloc.start()
+    try:
+        with StepMeter(trace_memory=True):
+            pass
+
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_budget_is_exceeded_by_slow_steps() -> None:
+    budget = StepBudget(max_seconds=1)
+
+    assert not budget.is_exceeded(StepMetrics(0.5, 0.5))
+    assert budget.is_exceeded(StepMetrics(1.5, 0.5))
+
+
+def test_memory_budget_is_only_checked_if_memory_was_traced() -> None:
+    budget = StepBudget(max_memory=1024)
+
+    assert not budget.is_exceeded(StepMetrics(0.5, 0.5))
+    assert not budget.is_exceeded(StepMetrics(0.5, 0.5, 512))
+    assert budget.is_exceeded(StepMetrics(0.5, 0.5, 2048))
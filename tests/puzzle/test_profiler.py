@@ -0,0 +1,207 @@
+import pstats
+import signal
+import threading
+import time
+from pathlib import Path
+
+from saulve.errors import SaulveError
+from saulve.puzzle.core import Puzzle
+from saulve.puzzle.decorators import solved, with_input
+from saulve.puzzle.profiler import (
+    HotFrame,
+    StepProfiler,
+    StepSampler,
+    StepSamples,
+)
+
+
+def _count(numbers: range) -> int:
+    return sum(numbers)
+
+
+def _solve() -> int:
+    return _count(range(100_000)) + _count(range(50_000))
+
+
+@solved(4999950000)
+@with_input(range(100_000))
+def _decorated_step(numbers: range) -> int:
+    return _count(numbers)
+
+
+def _busy(duration: float) -> int:
+    """Use the CPU for some time."""
+    count = 0
+    end = time.process_time() + duration
+    while time.process_time() < end:
+        count += 1
+    return count
+
+
+def _profiled_names(profiler: StepProfiler) -> set[str]:
+    assert profiler.profile is not None
+    return {name for _, _, name in profiler.profile.stats}
+
+
+def test_profiles_called_functions() -> None:
+    with StepProfiler(enabled=True) as profiler:
+        _solve()
+
+    assert {'_solve', '_count', '<built-in method builtins.sum>'} <= (
+        _profiled_names(profiler)
+    )
+
+
+def test_does_not_profile_if_disabled() -> None:
+    with StepProfiler() as profiler:
+        _solve()
+
+    assert profiler.profile is None
+
+
+def test_excludes_saulve_functions() -> None:
+    with StepProfiler(enabled=True) as profiler:
+        _decorated_step()
+
+    assert _profiled_names(profiler) == {
+        '_decorated_step',
+        '_count',
+        '<built-in method builtins.sum>',
+    }
+
+
+def test_top_functions_by_own_time() -> None:
+    with StepProfiler(enabled=True) as profiler:
+        _solve()
+
+    assert profiler.profile is not None
+    top = profiler.profile.top(2)
+
+    assert len(top) == 2
+    assert top[0].name == 'built-in method builtins.sum'
+    assert top[0].calls == 2
+    assert top[0].own_time >= top[1].own_time
+
+
+def test_collapsed_stacks() -> None:
+    with StepProfiler(enabled=True) as profiler:
+        _solve()
+
+    assert profiler.profile is not None
+    stacks = dict(
+        line.rsplit(' ', 1)
+        for line in profiler.profile.collapsed_stacks()
+    )
+
+    sum_stack = (
+        f'_solve (test_profiler.py:{_solve.__code__.co_firstlineno});'
+        f'_count (test_profiler.py:{_count.__code__.co_firstlineno});'
+        'built-in method builtins.sum'
+    )
+    assert int(stacks[sum_stack]) > 0
+    assert all(stack.startswith('_solve ') for stack in stacks)
+
+
+def test_dump_pstats(tmp_path: Path) -> None:
+    with StepProfiler(enabled=True) as profiler:
+        _solve()
+
+    assert profiler.profile is not None
+    profiler.profile.dump(tmp_path / 'step.pstats')
+    stats = pstats.Stats(str(tmp_path / 'step.pstats'))
+
+    assert stats.total_calls == 5  # type: ignore[attr-defined]
+
+
+class TestSampler:
+    def test_sample_call_stacks(self) -> None:
+        with StepSampler(enabled=True, interval=0.001) as sampler:
+            _busy(0.05)
+
+        assert sampler.profile is not None
+        assert sampler.profile.sample_count > 0
+        assert sampler.profile.total_time > 0
+        assert all(
+            stack[0].startswith('_busy (test_profiler.py:')
+            for stack in sampler.profile.stacks
+        )
+        assert sampler.profile.top(1)[0].calls is None
+
+    def test_does_not_sample_if_disabled(self) -> None:
+        with StepSampler() as sampler:
+            _busy(0.01)
+
+        assert sampler.profile is None
+
+    def test_restores_signal_handler(self) -> None:
+        previous = signal.getsignal(signal.SIGPROF)
+
+        with StepSampler(enabled=True, interval=0.001):
+            _busy(0.01)
+
+        assert signal.getsignal(signal.SIGPROF) == previous
+        assert signal.getitimer(signal.ITIMER_PROF) == (0.0, 0.0)
+
+    def test_only_samples_main_thread(self) -> None:
+        errors = []
+
+        def sample() -> None:
+            try:
+                with StepSampler(enabled=True):
+                    pass
+            except SaulveError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=sample)
+        thread.start()
+        thread.join()
+
+        assert len(errors) == 1
+
+    def test_sampled_steps_exclude_saulve_functions(self) -> None:
+        puzzle = Puzzle(name='Test Puzzle')
+        puzzle.solution(solved(True)(lambda: _busy(0.05) > 0))
+
+        solution = puzzle.solve(profile=True, sample_interval=0.001)[0]
+
+        assert solution.is_correct
+        assert isinstance(solution.profile, StepSamples)
+        assert all(
+            stack[0].startswith('<lambda> (test_profiler.py:')
+            for stack in solution.profile.stacks
+        )
+
+
+class TestSamples:
+    samples = StepSamples(
+        stacks={
+            ('solve', 'search', 'search', 'score'): 0.5,
+            ('solve', 'search'): 0.25,
+            ('solve', 'parse'): 0.25,
+        },
+        sample_count=4,
+    )
+
+    def test_top_functions(self) -> None:
+        assert self.samples.top(2) == [
+            ('score', None, 0.5, 0.5),
+            ('search', None, 0.25, 0.75),
+        ]
+
+    def test_hot_path(self) -> None:
+        assert self.samples.hot_path() == [
+            HotFrame('solve', depth=1, share=1.0),
+            HotFrame('search', depth=2, share=0.75),
+            HotFrame('score', depth=1, share=0.5),
+        ]
+
+    def test_collapsed_stacks(self) -> None:
+        assert self.samples.collapsed_stacks() == [
+            'solve;parse 250000',
+            'solve;search 250000',
+            'solve;search;search;score 500000',
+        ]
+
+    def test_empty_hot_path(self) -> None:
+        assert StepSamples({}, 0).hot_path() == []
+
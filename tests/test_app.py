@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from saulve.app import App, parse_reference
+from saulve.challenges.in_memory import InMemoryLoader
+from saulve.errors import (
+    ModuleImportError,
+    ValidationError,
+    WrongAttributeType,
+)
+
+LOADER_SOURCE = '''
+from saulve.challenges.in_memory import InMemoryLoader
+
+loader = InMemoryLoader([])
+not_a_loader = 42
+
+
+class LoadOnlyLoader:
+    def load(self):
+        return loader.load()
+
+
+load_only_loader = LoadOnlyLoader()
+'''
+
+
+@pytest.fixture
+def loader_module(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Iterator[str]:
+    (tmp_path / 'referenced_loader.py').write_text(LOADER_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    yield 'referenced_loader'
+
+    sys.modules.pop('referenced_loader', None)
+
+
+@pytest.mark.parametrize('reference,expected', [
+    ('package.module:loader', ('package.module', 'loader')),
+    ('package.module.loader', ('package.module', 'loader')),
+    ('module:loader', ('module', 'loader')),
+])
+def test_parse_reference(reference: str, expected: tuple[str, str]) -> None:
+    assert parse_reference(reference) == expected
+
+
+@pytest.mark.parametrize('reference', [
+    'loader',
+    'module:',
+    ':loader',
+    'package..module:loader',
+    'module:not-valid',
+])
+def test_parse_malformed_reference(reference: str) -> None:
+    with pytest.raises(ValidationError):
+        parse_reference(reference)
+
+
+def test_register_malformed_reference() -> None:
+    app = App()
+
+    with pytest.raises(ValidationError):
+        app.register_challenge('foo', 'not a reference')
+
+    assert 'foo' not in app.loaders
+
+
+def test_referenced_loader_is_imported_when_used(loader_module: str) -> None:
+    app = App()
+    app.register_challenge('foo', f'{loader_module}:loader')
+
+    assert loader_module not in sys.modules
+
+    loader = app.get_loader('foo')
+
+    assert isinstance(loader, InMemoryLoader)
+    assert loader is sys.modules[loader_module].loader
+    assert app.get_loader('foo') is loader
+
+
+def test_referenced_loader_may_only_load_challenges(
+    loader_module: str,
+) -> None:
+    app = App()
+    app.register_challenge('foo', f'{loader_module}:load_only_loader')
+
+    loader = app.get_loader('foo')
+
+    assert loader is sys.modules[loader_module].load_only_loader
+
+
+def test_referenced_attribute_must_be_a_loader(loader_module: str) -> None:
+    app = App()
+    app.register_challenge('foo', f'{loader_module}:not_a_loader')
+
+    with pytest.raises(WrongAttributeType):
+        app.get_loader('foo')
+
+
+def test_referenced_module_must_exist() -> None:
+    app = App()
+    app.register_challenge('foo', 'missing_loader_module:loader')
+
+    with pytest.raises(ModuleImportError, match='missing_loader_module'):
+        app.get_loader('foo')
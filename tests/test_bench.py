@@ -0,0 +1,94 @@
+import gc
+import time
+from pathlib import Path
+
+import pytest
+
+from saulve.bench import (
+    StepBenchmark,
+    benchmark_puzzle,
+    compare_to_baseline,
+    load_baseline,
+    save_baseline,
+)
+from saulve.errors import SaulveError
+from saulve.puzzle import Puzzle, limits
+
+
+class TestStepBenchmark:
+    def test_computes_statistics(self) -> None:
+        benchmark = StepBenchmark(0, [float(t) for t in range(20, 0, -1)])
+
+        assert benchmark.min == 1
+        assert benchmark.median == 10.5
+        assert benchmark.p95 == 19
+        assert benchmark.stddev == pytest.approx(5.916, abs=1e-3)
+
+    def test_single_run_has_no_deviation(self) -> None:
+        benchmark = StepBenchmark(0, [1.0])
+
+        assert benchmark.p95 == 1.0
+        assert benchmark.stddev == 0.0
+
+
+def test_benchmarks_each_puzzle_step() -> None:
+    calls: list[str] = []
+    gc_states: list[bool] = []
+    puzzle = Puzzle(name='Benchmarked')
+    puzzle.solution(lambda: calls.append('first') or 1)
+    puzzle.solution(lambda: gc_states.append(gc.isenabled()) or 2)
+
+    benchmarks = benchmark_puzzle(puzzle, repeat=3, warmup=2)
+
+    assert [b.step for b in benchmarks] == [0, 1]
+    assert all(len(b.times) == 3 for b in benchmarks)
+    assert len(calls) == 5
+    assert gc_states == [True, True, False, False, False]
+    assert gc.isenabled()
+
+
+def _sleep() -> None:
+    time.sleep(2)
+
+
+def test_cannot_benchmark_step_exceeding_its_limits() -> None:
+    puzzle = Puzzle(name='Benchmarked')
+    puzzle.solution(lambda: 1)
+    puzzle.solution(limits(timeout=0.2)(_sleep))
+
+    with pytest.raises(SaulveError, match='Step 2 .* timed out'):
+        benchmark_puzzle(puzzle, repeat=1, warmup=0)
+
+
+def test_saves_and_compares_baseline(tmp_path: Path) -> None:
+    baseline_path = tmp_path / 'baseline.json'
+    save_baseline(baseline_path, '2022 01', [
+        StepBenchmark(0, [1.0]),
+        StepBenchmark(1, [1.0]),
+    ])
+    save_baseline(baseline_path, '2022 02', [StepBenchmark(0, [5.0])])
+
+    baseline = load_baseline(baseline_path)
+    regressions = compare_to_baseline(
+        [StepBenchmark(0, [1.05]), StepBenchmark(1, [1.5])],
+        baseline['2022 01'],
+        threshold=0.1,
+    )
+
+    assert set(baseline) == {'2022 01', '2022 02'}
+    assert len(regressions) == 1
+    assert regressions[0].step == 1
+    assert regressions[0].ratio == 1.5
+
+
+@pytest.mark.parametrize('content', [
+    '{"version": 0}',
+    '{"version": 1}',
+    '{"version": 1, "puzzles": []}',
+])
+def test_rejects_invalid_baseline(tmp_path: Path, content: str) -> None:
+    baseline_path = tmp_path / 'baseline.json'
+    baseline_path.write_text(content)
+
+    with pytest.raises(SaulveError):
+        load_baseline(baseline_path)
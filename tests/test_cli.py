@@ -1,15 +1,65 @@
+import importlib
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
 from click.testing import CliRunner
 
+import saulve
 from saulve import App, Puzzle
+from saulve.challenges.advent_of_code import AdventOfCodePuzzle, Calendar
+from saulve.challenges.base import Challenge, PuzzleView
+from saulve.challenges.generic import GenericLoader
 from saulve.challenges.in_memory import InMemoryLoader
-from saulve.cli import cli
+from saulve.cli import build_tasks, cli, format_calendar
+from saulve.daemon import DaemonServer
+from saulve.runner import PuzzleTask
 
 puzzle = Puzzle(name='Test puzzle')
 puzzle.solution(lambda: 'bar')
 
+parsed_puzzle = Puzzle(name='Parsed puzzle')
+parsed_puzzle.parser(lambda: [1, 2])
+parsed_puzzle.solution(parsed_puzzle.with_parsed_input(sum))
+
+
+slow_puzzle = Puzzle(name='Slow puzzle')
+slow_puzzle.solution(saulve.budget(max_seconds=0)(lambda: 'baz'))
+
+cases_puzzle = Puzzle(name='Cases puzzle')
+cases_puzzle.solution(saulve.with_inputs(
+    {'example': 'a', 'input': 'b'},
+    solutions={'example': 'A'},
+)(str.upper))
+
+
+class LoadOnlyLoader:
+    """A loader without `load_one`."""
+
+    def load(self) -> Challenge:
+        return InMemoryLoader([puzzle]).load()
+
+
+class CalendarLoader:
+    """A calendar, whose days are padded in puzzle ids."""
+
+    def load(self) -> Challenge:
+        return Calendar([AdventOfCodePuzzle(2022, 1, puzzle)])
+
 
 app = App()
-app.register_challenge('test-challenge', InMemoryLoader([puzzle]))
+app.register_challenge(
+    'test-challenge',
+    InMemoryLoader([puzzle, parsed_puzzle]),
+)
+app.register_challenge(
+    'other-challenge',
+    InMemoryLoader([slow_puzzle, cases_puzzle]),
+)
+app.register_challenge('load-only-challenge', LoadOnlyLoader())
+app.register_challenge('calendar', CalendarLoader())
 
 
 def test_list_challenges_if_no_challenge_given() -> None:
@@ -21,6 +71,44 @@ def test_list_challenges_if_no_challenge_given() -> None:
     assert 'test-challenge' in result.output
 
 
+def test_serve_is_an_application_command() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['--app', __name__, '--help'])
+
+    assert result.exit_code == 0
+    assert 'serve' in result.output
+
+
+def test_serve_on_given_socket(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def interrupt(self: DaemonServer) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(DaemonServer, 'serve_forever', interrupt)
+    path = tmp_path / 'daemon' / 'saulve.sock'
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'serve', '--socket', str(path)],
+    )
+
+    assert result.exit_code == 0
+    assert f'Listening on {path}' in result.output
+
+
+def test_unknown_challenge() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ['--app', __name__, 'unknown', 'list'])
+
+    assert result.exit_code == 1
+    assert result.output == 'Error: No challenge exists with id unknown\n'
+
+
 def test_list_puzzles() -> None:
     runner = CliRunner()
 
@@ -28,3 +116,483 @@ def test_list_puzzles() -> None:
 
     assert result.exit_code == 0
     assert '0 - Test puzzle' in result.output
+
+
+def test_list_filtered_puzzles() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'other-challenge', 'list', 'budget'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == '0 - Slow puzzle\n'
+
+
+def test_list_with_invalid_filter() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'list', 'steps:many'],
+    )
+
+    assert result.exit_code == 2
+    assert "'many' is not a number or range." in result.output
+
+
+def test_status() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'other-challenge', 'status'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == (
+        '. 0 - Slow puzzle (0/1 steps solved)\n'
+        '+ 1 - Cases puzzle (1/2 steps solved)\n'
+        '\n'
+        '* 0 solved, + 1 partial, . 1 unsolved, ? 0 unknown\n'
+    )
+
+
+def test_format_calendar() -> None:
+    views = [
+        PuzzleView('2022 01', 'Solved', 2022, 1, 2, 2),
+        PuzzleView('2022 03', 'Partial', 2022, 3, 2, 1),
+        PuzzleView('2021 02', 'Unknown', 2021, 2),
+    ]
+
+    lines = format_calendar(views)
+
+    assert lines[0].split() == [str(day) for day in range(1, 26)]
+    assert lines[1:] == ['2021     ?', '2022  *     +']
+
+
+def test_status_answers() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'other-challenge', 'status', '--answers', '1'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == '1 - Cases puzzle:\n  A\n  ?\n'
+
+
+def test_coordinator_with_invalid_address() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'coordinator', '--bind', 'a:b'],
+    )
+
+    assert result.exit_code == 2
+    assert "'b' is not a valid port." in result.output
+
+
+def test_solve_puzzle() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve', '0'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == 'Test puzzle:\n  bar\n'
+
+
+def test_solve_unknown_puzzle() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve', 'foo'],
+    )
+
+    assert result.exit_code != 0
+    assert 'Puzzle not found.' in result.output
+
+
+def test_solve_all_puzzles() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve-all', '-j', '2'],
+    )
+
+    assert result.exit_code == 0
+    assert '0 - Test puzzle:\n  bar\n' in result.output
+    assert '1 - Parsed puzzle:\n  3\n' in result.output
+
+
+def test_solve_all_puzzles_in_event_loop() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve-all', '--asyncio'],
+    )
+
+    assert result.exit_code == 0
+    assert '0 - Test puzzle:\n  bar\n' in result.output
+    assert '1 - Parsed puzzle:\n  3\n' in result.output
+
+
+def test_solve_all_puzzle_steps() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve-all', '--steps', '1'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == '1 - Parsed puzzle (step 1):\n  3\n'
+
+
+def test_solve_puzzle_with_timings() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve', '0', '--timings'],
+    )
+
+    assert result.exit_code == 0
+    assert re.match(
+        r'Test puzzle:\n  bar  \([\d.]+ ms wall, [\d.]+ ms cpu, [\d.]+ KiB peak\)\n',
+        result.output,
+    )
+
+
+def test_solve_puzzle_as_json() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve', '0', '--format', 'json'],
+    )
+
+    assert result.exit_code == 0
+    output = json.loads(result.output)
+    assert output['puzzle'] == 'Test puzzle'
+    assert output['solutions'][0]['solution'] == 'bar'
+    assert output['solutions'][0]['metrics']['wall_time'] >= 0
+    assert output['solutions'][0]['metrics']['peak_memory'] is None
+
+
+def test_solve_puzzle_as_json_lines() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve', '0', '--format', 'jsonl'],
+    )
+
+    assert result.exit_code == 0
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert len(lines) == 1
+    assert lines[0]['puzzle'] == 'Test puzzle'
+    assert lines[0]['step'] == 1
+    assert lines[0]['solution'] == 'bar'
+
+
+def test_bench_puzzle(tmp_path) -> None:
+    runner = CliRunner()
+    baseline = tmp_path / 'baseline.json'
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'bench', '0',
+        '--repeat', '3', '--save', str(baseline),
+    ])
+
+    assert result.exit_code == 0
+    assert re.match(
+        r'Test puzzle:\n  step 1: min [\d.]+ ms, median [\d.]+ ms, '
+        r'p95 [\d.]+ ms, stddev [\d.]+ ms\n',
+        result.output,
+    )
+    assert '0' in json.loads(baseline.read_text())['puzzles']
+
+
+def test_solve_puzzle_with_cache(tmp_path) -> None:
+    runner = CliRunner()
+    args = [
+        '--app', __name__, 'test-challenge', 'solve', '0',
+        '--cache', '--cache-dir', str(tmp_path), '--timings',
+    ]
+
+    runner.invoke(cli, args)
+    result = runner.invoke(cli, args)
+
+    assert result.exit_code == 0
+    assert result.output == 'Test puzzle:\n  bar  (cached)\n'
+
+
+def test_solve_puzzle_with_limits() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'solve', '0',
+        '--timeout', '10', '--max-memory', '4G',
+    ])
+
+    assert result.exit_code == 0
+    assert result.output == 'Test puzzle:\n  bar\n'
+
+
+def test_solve_puzzle_displays_parse_timings() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'solve', '1', '--timings'],
+    )
+
+    assert result.exit_code == 0
+    assert re.match(
+        r'Parsed puzzle:\n  parsed  \([\d.]+ ms wall.*\)\n  3  \(',
+        result.output,
+    )
+
+
+def test_solve_puzzle_with_profile(tmp_path) -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'solve', '0',
+        '--profile', '--profile-dir', str(tmp_path),
+    ])
+
+    assert result.exit_code == 0
+    assert re.search(r'1  <lambda> \(test_cli\.py:\d+\)\n', result.output)
+    assert (tmp_path / '0-step1.pstats').exists()
+    assert (tmp_path / '0-step1.collapsed').exists()
+
+
+def test_solve_all_puzzles_with_profile(tmp_path) -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'solve-all', '-j', '2',
+        '--profile', '--profile-dir', str(tmp_path), '--profile-top', '0',
+    ])
+
+    assert result.exit_code == 0
+    assert 'function' not in result.output
+    assert sorted(path.name for path in tmp_path.glob('*.pstats')) == [
+        '0-step1.pstats',
+        '1-step1.pstats',
+    ]
+
+
+def test_solve_puzzle_with_samples(tmp_path) -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'solve', '0',
+        '--sample', '--profile-dir', str(tmp_path),
+    ])
+
+    assert result.exit_code == 0
+    assert 'hot path' in result.output
+    assert (tmp_path / '0-step1.collapsed').exists()
+    assert not (tmp_path / '0-step1.pstats').exists()
+
+
+def test_cannot_profile_and_sample() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'solve', '0',
+        '--sample', '--profile',
+    ])
+
+    assert result.exit_code == 2
+
+
+def test_solve_all_puzzles_with_samples(tmp_path) -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'solve-all', '-j', '2',
+        '--sample', '--profile-dir', str(tmp_path),
+    ])
+
+    assert result.exit_code == 0
+    assert 'Hottest steps:\n' in result.output
+    assert (tmp_path / 'all-steps.collapsed').exists()
+
+
+def test_solve_puzzle_records_history(history_file) -> None:
+    runner = CliRunner()
+    args = ['--app', __name__, 'test-challenge', 'solve', '0']
+
+    runner.invoke(cli, args)
+    runner.invoke(cli, [*args, '--no-history'])
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'history'],
+    )
+
+    assert history_file.exists()
+    assert result.exit_code == 0
+    assert re.fullmatch(
+        r'0 step 1:\n'
+        r'  \d{4}-\d\d-\d\d \d\d:\d\d  \S+ +[\d.]+ ms  bar\n'
+        r'  median [\d.]+ ms over 1 timed run\(s\)\n',
+        result.output,
+    )
+
+
+def test_solve_puzzle_records_history_under_view_id() -> None:
+    runner = CliRunner()
+
+    runner.invoke(cli, ['--app', __name__, 'calendar', 'solve', '2022', '1'])
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'calendar', 'history', '2022', '1'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output.startswith('2022 01 step 1:\n')
+
+
+def test_schedules_tasks_from_solved_runs(history_file: Path) -> None:
+    from saulve.cli import task_durations
+    from saulve.distributed import schedule_tasks
+    from saulve.runner import PuzzleTask
+
+    unknown, solved = PuzzleTask(('2021', '01')), PuzzleTask(('2022', '01'))
+    runner = CliRunner()
+
+    runner.invoke(cli, ['--app', __name__, 'calendar', 'solve', '2022', '1'])
+    durations = task_durations('calendar', [solved, unknown], history_file)
+
+    assert list(durations) == [solved]
+    assert schedule_tasks([solved, unknown], durations) == [unknown, solved]
+
+
+def test_regressions_without_history() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'test-challenge', 'regressions'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == 'No regression.\n'
+
+
+def test_regressions_in_history(history_file) -> None:
+    from saulve.history import RunEnvironment, RunHistory
+    from saulve.puzzle.core import PuzzleSolution
+    from saulve.puzzle.metrics import StepMetrics
+
+    environment = RunEnvironment(None, 'CPython', 'host')
+    with RunHistory(history_file) as history:
+        for wall_time in (0.1, 0.1, 0.2, 0.2):
+            history.record(
+                'test-challenge',
+                ['0'],
+                [(0, PuzzleSolution('bar', None, StepMetrics(
+                    wall_time,
+                    wall_time,
+                    None,
+                )))],
+                environment,
+            )
+
+    runner = CliRunner()
+    result = runner.invoke(cli, [
+        '--app', __name__, 'test-challenge', 'regressions', '--window', '2',
+    ])
+
+    assert result.exit_code == 1
+    assert result.output == (
+        '0:\n'
+        '  step 1 regressed: median 200.00 ms vs 100.00 ms (+100.0%)\n'
+        'Error: 1 step(s) regressed.\n'
+    )
+
+
+def test_solve_puzzle_of_loader_without_load_one() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(
+        cli,
+        ['--app', __name__, 'load-only-challenge', 'solve', '0'],
+    )
+
+    assert result.exit_code == 0
+    assert result.output == 'Test puzzle:\n  bar\n'
+
+
+def test_solve_puzzle_over_budget() -> None:
+    runner = CliRunner()
+    args = ['--app', __name__, 'other-challenge', 'solve', '0']
+
+    result = runner.invoke(cli, args)
+    strict_result = runner.invoke(cli, [*args, '--strict'])
+
+    assert result.exit_code == 0
+    assert result.output == 'Slow puzzle:\n  baz (over budget)\n'
+    assert strict_result.exit_code == 1
+    assert strict_result.output.endswith('Error: 1 step(s) failed.\n')
+
+
+def test_solve_puzzle_steps_in_worker_processes() -> None:
+    runner = CliRunner()
+
+    result = runner.invoke(cli, [
+        '--app', __name__, 'other-challenge', 'solve', '1', '--jobs', '2',
+    ])
+
+    assert result.exit_code == 0
+    assert result.output == 'Cases puzzle:\n  [example] A\n  [input] B\n'
+
+
+def test_build_step_tasks_without_importing_puzzles(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    package = tmp_path / 'lazy_steps'
+    package.mkdir()
+    (package / '__init__.py').touch()
+    (package / 'two_steps.py').write_text(
+        'from saulve import Puzzle\n'
+        'puzzle = Puzzle(name="Two steps")\n'
+        '@puzzle.solution\n'
+        'def first():\n'
+        '    return 1\n'
+        '@puzzle.solution\n'
+        'def second():\n'
+        '    return 2\n'
+        'raise RuntimeError("Must not be imported.")\n'
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    loader = GenericLoader(
+        importlib.import_module('lazy_steps'),
+        lazy=True,
+        cache=False,
+    )
+
+    try:
+        tasks = build_tasks(loader, [], split_steps=True)
+    finally:
+        sys.modules.pop('lazy_steps', None)
+
+    assert tasks == [
+        PuzzleTask(('two_steps',), 0),
+        PuzzleTask(('two_steps',), 1),
+    ]
+    assert 'lazy_steps.two_steps' not in sys.modules
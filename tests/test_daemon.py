@@ -0,0 +1,231 @@
+import io
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from saulve.cli import run_command
+from saulve.daemon import (
+    DaemonServer,
+    default_socket_path,
+    run_in_daemon,
+    uses_daemon,
+)
+from saulve.errors import SaulveError
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[Path]:
+    path = tmp_path / 'saulve.sock'
+    server = DaemonServer(path, run_command, [])
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    yield path
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _run(path: Path, args: list[str]) -> tuple[int | None, str, str]:
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+
+    exit_code = run_in_daemon(args, path, stdout, stderr)
+
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_runs_commands(socket_path: Path) -> None:
+    exit_code, stdout, _ = _run(
+        socket_path,
+        ['--app', 'tests.test_cli', 'test-challenge', 'solve', '0'],
+    )
+
+    assert exit_code == 0
+    assert stdout == 'Test puzzle:\n  bar\n'
+
+
+def test_reports_command_errors(socket_path: Path) -> None:
+    exit_code, _, stderr = _run(
+        socket_path,
+        ['--app', 'tests.test_cli', 'test-challenge', 'solve', 'foo'],
+    )
+
+    assert exit_code == 1
+    assert 'Puzzle not found.' in stderr
+
+
+def test_refuses_commands_of_other_applications(tmp_path: Path) -> None:
+    path = tmp_path / 'saulve.sock'
+    other_app = tmp_path / 'other' / '__init__.py'
+    server = DaemonServer(path, run_command, [], other_app)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    try:
+        exit_code, stdout, _ = _run(
+            path,
+            ['--app', 'tests.test_cli', 'test-challenge', 'solve', '0'],
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert exit_code is None
+    assert stdout == ''
+
+
+def test_restores_environment_of_missing_directory(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.delenv('SAULVE_CACHE', raising=False)
+    server = DaemonServer(tmp_path / 'saulve.sock', run_command, [])
+    try:
+        exit_code = server.run_command(
+            ['--app', 'tests.test_cli', 'test-challenge', 'list'],
+            str(tmp_path / 'missing'),
+            {'SAULVE_CACHE': '1'},
+        )
+    finally:
+        server.server_close()
+
+    assert exit_code == 1
+    assert 'Could not enter' in capsys.readouterr().err
+    assert 'SAULVE_CACHE' not in os.environ
+
+
+def test_no_running_daemon(tmp_path: Path) -> None:
+    assert run_in_daemon(['list'], tmp_path / 'missing.sock') is None
+
+
+def test_cannot_run_two_daemons(socket_path: Path) -> None:
+    with pytest.raises(SaulveError):
+        DaemonServer(socket_path, run_command, [])
+
+
+def test_socket_is_private(socket_path: Path) -> None:
+    assert socket_path.stat().st_mode & 0o777 == 0o600
+
+
+def test_ignores_socket_of_other_user(
+    socket_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(os, 'getuid', lambda: socket_path.stat().st_uid + 1)
+
+    assert run_in_daemon(['list'], socket_path) is None
+
+
+def test_refuses_directory_of_other_user(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(os, 'getuid', lambda: tmp_path.stat().st_uid + 1)
+
+    with pytest.raises(SaulveError, match='owned by another user'):
+        DaemonServer(tmp_path / 'saulve.sock', run_command, [])
+
+
+def test_default_socket_is_in_private_directory(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv('SAULVE_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+
+    path = default_socket_path()
+
+    assert path == tmp_path / f'saulve-{os.getuid()}' / 'daemon.sock'
+
+
+def test_replaces_stale_socket(tmp_path: Path) -> None:
+    path = tmp_path / 'saulve.sock'
+    path.touch()
+
+    server = DaemonServer(path, run_command, [])
+    server.server_close()
+
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('args, expected', [
+    (['--app', 'challenges', 'aoc', 'solve', '2022', '1'], True),
+    (['-a', 'challenges', 'aoc', 'list'], True),
+    (['aoc', 'bench', '2022', '1', '--repeat', '3'], True),
+    (['aoc', 'solve', '2022', '1', '--watch'], False),
+    (['--app', 'challenges', 'aoc', 'solve-all'], False),
+    (['--app', 'challenges', 'serve'], False),
+    (['--app', 'challenges'], False),
+])
+def test_uses_daemon(
+    args: list[str],
+    expected: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv('SAULVE_NO_DAEMON', raising=False)
+
+    assert uses_daemon(args) is expected
+
+
+def test_daemon_can_be_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv('SAULVE_NO_DAEMON', '1')
+
+    assert not uses_daemon(['--app', 'challenges', 'aoc', 'list'])
+
+
+APP_SOURCE = '''
+import saulve
+from saulve import App, Puzzle
+from saulve.challenges.in_memory import InMemoryLoader
+
+puzzle = Puzzle(name='Input puzzle')
+
+
+@puzzle.parser
+@saulve.with_input_file('input.txt')
+def parse(puzzle_input):
+    return puzzle_input.strip()
+
+
+puzzle.solution(puzzle.with_parsed_input(str.upper))
+
+app = App()
+app.register_challenge('input-challenge', InMemoryLoader([puzzle]))
+'''
+
+
+def test_parses_modified_input_files_again(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    package = tmp_path / 'daemon_input_app'
+    package.mkdir()
+    (package / '__init__.py').write_text(APP_SOURCE)
+    input_file = package / 'input.txt'
+    input_file.write_text('one\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'daemon_input_app', raising=False)
+
+    server = DaemonServer(tmp_path / 'saulve.sock', run_command, [tmp_path])
+    args = ['--app', 'daemon_input_app', 'input-challenge', 'solve', '0']
+    try:
+        server.run_command(args, str(tmp_path), {})
+        assert capsys.readouterr().out == 'Input puzzle:\n  ONE\n'
+
+        input_file.write_text('two\n')
+        server.run_command(args, str(tmp_path), {})
+        assert capsys.readouterr().out == 'Input puzzle:\n  TWO\n'
+    finally:
+        server.server_close()
+        sys.modules.pop('daemon_input_app', None)
@@ -0,0 +1,209 @@
+import json
+import socket
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from saulve import App, Puzzle, solved
+from saulve.challenges.in_memory import InMemoryLoader
+from saulve.distributed import (
+    Coordinator,
+    estimate_durations,
+    parse_address,
+    run_worker,
+    schedule_tasks,
+)
+from saulve.errors import SaulveError, ValidationError
+from saulve.history import RunEnvironment, StepRun
+from saulve.puzzle.core import PuzzleSolution
+from saulve.puzzle.metrics import StepMetrics
+from saulve.runner import PuzzleTask, TaskResult
+
+correct = Puzzle(name='Correct puzzle')
+correct.solution(lambda: 1)
+correct.solution(lambda: 2)
+
+wrong = Puzzle(name='Wrong puzzle')
+wrong.solution(solved(1)(lambda: 2))
+
+app = App()
+app.register_challenge('test-challenge', InMemoryLoader([correct, wrong]))
+
+TASKS = [PuzzleTask(('0',)), PuzzleTask(('1',))]
+
+
+def _start_workers(
+    coordinator: Coordinator,
+    count: int,
+) -> list[threading.Thread]:
+    workers = [
+        threading.Thread(
+            target=run_worker,
+            args=(coordinator.address, __name__, 'test-challenge'),
+        )
+        for _ in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+
+    return workers
+
+
+def _results(coordinator: Coordinator) -> dict[PuzzleTask, TaskResult]:
+    return {result.task: result for result in coordinator.results()}
+
+
+@pytest.mark.parametrize('address, expected', [
+    ('box-2:9000', ('box-2', 9000)),
+    ('box-2', ('box-2', 7878)),
+    (':9000', ('localhost', 9000)),
+    ('[::1]:9000', ('::1', 9000)),
+])
+def test_parse_address(address: str, expected: tuple[str, int]) -> None:
+    assert parse_address(address) == expected
+
+
+@pytest.mark.parametrize('address', ['box:http', 'box:70000'])
+def test_parse_invalid_address(address: str) -> None:
+    with pytest.raises(ValidationError):
+        parse_address(address)
+
+
+def _step_run(puzzle_id: str, step: int, wall_time: float) -> StepRun:
+    return StepRun(
+        1,
+        datetime.now(timezone.utc),
+        puzzle_id,
+        step,
+        PuzzleSolution('1', None, StepMetrics(wall_time, wall_time)),
+        RunEnvironment(None, 'CPython 3.11.7', 'host'),
+    )
+
+
+def test_estimate_durations_from_history() -> None:
+    runs = [
+        _step_run('2022 01', 0, 1),
+        _step_run('2022 01', 0, 3),
+        _step_run('2022 01', 0, 100),
+        _step_run('2022 01', 1, 2),
+        _step_run('2022 02', 0, 5),
+        _step_run('2022 4', 0, 7),
+    ]
+
+    durations = estimate_durations(runs, [
+        PuzzleTask(('2022', '01')),
+        PuzzleTask(('2022', '02'), 0),
+        PuzzleTask(('2022', '02'), 1),
+        PuzzleTask(('2022', '03')),
+        PuzzleTask(('2022', '04')),
+    ])
+
+    assert durations == {
+        PuzzleTask(('2022', '01')): 5,
+        PuzzleTask(('2022', '02'), 0): 5,
+        PuzzleTask(('2022', '04')): 7,
+    }
+
+
+def test_schedules_longest_tasks_first() -> None:
+    short, long, unknown = (PuzzleTask((str(i),)) for i in range(3))
+
+    scheduled = schedule_tasks([short, long, unknown], {short: 1, long: 10})
+
+    assert scheduled == [unknown, long, short]
+
+
+def test_solves_tasks_on_workers() -> None:
+    with Coordinator(('localhost', 0), 'test-challenge', TASKS) as server:
+        workers = _start_workers(server, 2)
+        results = _results(server)
+
+    for worker in workers:
+        worker.join()
+
+    assert [s.solution for s in results[TASKS[0]].solutions] == ['1', '2']
+    assert results[TASKS[0]].name == 'Correct puzzle'
+    assert results[TASKS[1]].is_failed
+    assert sum(stats.tasks for stats in server.workers.values()) == 2
+
+
+def test_refuses_workers_of_other_challenges() -> None:
+    with Coordinator(('localhost', 0), 'other-challenge', TASKS) as server:
+        with pytest.raises(SaulveError, match='not test-challenge'):
+            run_worker(server.address, __name__, 'test-challenge')
+
+
+def _take_task(address: tuple[str, int], host: str) -> socket.socket:
+    """Take a task as a worker, without solving it."""
+    sock = socket.create_connection(address)
+    stream = sock.makefile('rwb')
+    stream.write(json.dumps({'hello': {
+        'challenge': 'test-challenge',
+        'host': host,
+        'pid': 1,
+    }}).encode() + b'\n')
+    stream.flush()
+    assert 'task' in json.loads(stream.readline())
+    stream.close()
+    return sock
+
+
+def _lose_task(address: tuple[str, int]) -> None:
+    """Take a task as a worker, and die without solving it."""
+    _take_task(address, 'dying').close()
+
+
+def test_retries_tasks_of_lost_workers() -> None:
+    with Coordinator(('localhost', 0), 'test-challenge', TASKS) as server:
+        _lose_task(server.address)
+        workers = _start_workers(server, 1)
+        results = _results(server)
+
+    for worker in workers:
+        worker.join()
+
+    assert set(results) == set(TASKS)
+    assert results[TASKS[0]].error is None
+    assert server.workers['dying:1'].lost_tasks == 1
+
+
+def test_reports_tasks_lost_too_many_times() -> None:
+    with Coordinator(
+        ('localhost', 0),
+        'test-challenge',
+        TASKS[:1],
+        retries=0,
+    ) as server:
+        _lose_task(server.address)
+        results = _results(server)
+
+    error = results[TASKS[0]].error
+    assert error is not None
+    assert 'Task lost 1 times' in error
+
+
+def test_retries_tasks_of_hanging_workers() -> None:
+    with Coordinator(
+        ('localhost', 0),
+        'test-challenge',
+        TASKS,
+        task_timeout=0.2,
+    ) as server:
+        with _take_task(server.address, 'hanging'):
+            workers = _start_workers(server, 1)
+            results = _results(server)
+
+    for worker in workers:
+        worker.join()
+
+    assert set(results) == set(TASKS)
+    assert results[TASKS[0]].error is None
+    assert server.workers['hanging:1'].lost_tasks == 1
+
+
+def test_gives_up_without_workers() -> None:
+    with Coordinator(('localhost', 0), 'test-challenge', TASKS) as server:
+        with pytest.raises(SaulveError, match='No worker connected'):
+            list(server.results(worker_timeout=0.1))
+
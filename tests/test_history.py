@@ -0,0 +1,174 @@
+import platform
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from saulve.errors import SaulveError
+from saulve.history import (
+    RunEnvironment,
+    RunHistory,
+    StepRun,
+    find_regressions,
+    git_commit,
+)
+from saulve.puzzle.core import PuzzleSolution, StepStatus
+from saulve.puzzle.metrics import StepMetrics
+
+environment = RunEnvironment('abc123', 'CPython 3.11.7', 'host')
+
+
+def solution(
+    wall_time: float,
+    peak_memory: int | None = None,
+    **kwargs,
+) -> PuzzleSolution:
+    return PuzzleSolution(
+        'answer',
+        None,
+        StepMetrics(wall_time, wall_time, peak_memory),
+        **kwargs,
+    )
+
+
+def step_runs(*solutions: PuzzleSolution) -> list[StepRun]:
+    """Runs of the first step of a puzzle, from the most recent."""
+    started_at = datetime.now(timezone.utc)
+    return [
+        StepRun(len(solutions) - index, started_at, '1', 0, step, environment)
+        for index, step in enumerate(solutions)
+    ]
+
+
+class TestRunHistory:
+    def test_records_runs(self, tmp_path: Path) -> None:
+        started_at = datetime(2022, 12, 1, tzinfo=timezone.utc)
+        solutions = [
+            PuzzleSolution('42', True, StepMetrics(0.5, 0.4, 1024)),
+            PuzzleSolution(
+                None,
+                None,
+                status=StepStatus.TIMED_OUT,
+            ),
+        ]
+
+        with RunHistory(tmp_path / 'history.sqlite3') as history:
+            history.record(
+                'aoc',
+                ['2022', '1'],
+                enumerate(solutions),
+                environment,
+                started_at,
+            )
+            runs = history.step_runs('aoc')
+
+        assert [run.solution for run in runs] == solutions
+        assert {run.puzzle_id for run in runs} == {'2022 1'}
+        assert [run.step for run in runs] == [0, 1]
+        assert runs[0].started_at == started_at
+        assert runs[0].environment == environment
+
+    def test_gets_latest_runs_of_selected_puzzles(self, tmp_path) -> None:
+        with RunHistory(tmp_path / 'history.sqlite3') as history:
+            for wall_time in (1.0, 2.0, 3.0):
+                for puzzle_id in (['2022', '1'], ['2022', '10'], ['2023']):
+                    history.record(
+                        'aoc',
+                        puzzle_id,
+                        [(0, solution(wall_time))],
+                        environment,
+                    )
+            history.record('other', ['2022', '1'], [], environment)
+
+            runs = history.step_runs('aoc', ['2022', '1'], limit=2)
+
+        assert [run.puzzle_id for run in runs] == ['2022 1', '2022 1']
+        assert [
+            run.solution.metrics.wall_time
+            for run in runs
+            if run.solution.metrics is not None
+        ] == [3.0, 2.0]
+
+    def test_selects_numeric_words_as_numbers(self, tmp_path) -> None:
+        with RunHistory(tmp_path / 'history.sqlite3') as history:
+            history.record(
+                'aoc',
+                ['2022', '01'],
+                [(0, solution(1.0))],
+                environment,
+            )
+
+            runs = history.step_runs('aoc', ['2022', '1'])
+
+        assert [run.puzzle_id for run in runs] == ['2022 01']
+
+    def test_keeps_runs_between_sessions(self, tmp_path) -> None:
+        path = tmp_path / 'history.sqlite3'
+        with RunHistory(path) as history:
+            history.record('aoc', ['1'], [(0, solution(1.0))], environment)
+
+        with RunHistory(path) as history:
+            assert len(history.step_runs('aoc')) == 1
+
+    def test_rejects_newer_databases(self, tmp_path) -> None:
+        path = tmp_path / 'history.sqlite3'
+        with RunHistory(path) as history:
+            history.connection.execute('PRAGMA user_version = 1000')
+
+        with pytest.raises(SaulveError):
+            RunHistory(path)
+
+
+def test_git_commit_outside_of_repository(tmp_path) -> None:
+    assert git_commit(tmp_path) is None
+
+
+def test_current_environment(tmp_path) -> None:
+    current = RunEnvironment.current(tmp_path)
+
+    assert current.git_commit is None
+    assert current.python_version.endswith(platform.python_version())
+    assert current.host == platform.node()
+
+
+class TestFindRegressions:
+    def test_finds_slower_steps(self) -> None:
+        runs = step_runs(*map(solution, [2.0, 2.1, 1.9, 1.0, 1.1, 0.9]))
+
+        regressions = find_regressions(runs, window=3, threshold=0.1)
+
+        assert list(regressions) == ['1']
+        regression, = regressions['1']
+        assert regression.step == 0
+        assert regression.median == 2.0
+        assert regression.baseline == 1.0
+
+    def test_ignores_slowdowns_below_threshold(self) -> None:
+        runs = step_runs(*map(solution, [1.05, 1.05, 1.05, 1.0, 1.0]))
+
+        assert find_regressions(runs, window=3, threshold=0.1) == {}
+
+    def test_needs_enough_runs(self) -> None:
+        runs = step_runs(*map(solution, [2.0, 2.0, 1.0]))
+
+        assert find_regressions(runs, window=3) == {}
+
+    def test_compares_to_given_number_of_runs(self) -> None:
+        runs = step_runs(*map(solution, [2.0, 2.0, 3.0, 1.0]))
+
+        assert find_regressions(runs, window=2, baseline_runs=1) == {}
+
+    def test_ignores_untimed_runs(self) -> None:
+        runs = step_runs(
+            solution(2.0),
+            solution(0.1, from_cache=True),
+            solution(0.1, status=StepStatus.TIMED_OUT),
+            solution(2.0),
+        )
+
+        assert find_regressions(runs, window=1) == {}
+
+    def test_ignores_runs_tracing_memory_differently(self) -> None:
+        runs = step_runs(solution(2.0), solution(1.0, peak_memory=1024))
+
+        assert find_regressions(runs, window=1) == {}
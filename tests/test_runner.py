@@ -0,0 +1,123 @@
+import asyncio
+
+from saulve import App, Puzzle, solved
+from saulve.challenges.in_memory import InMemoryLoader
+from saulve.runner import PuzzleTask, run_tasks, run_tasks_async
+from saulve.shared import SharedInputs
+
+
+def _raise_error() -> None:
+    raise RuntimeError('Raised on purpose.')
+
+
+correct = Puzzle(name='Correct puzzle')
+correct.solution(lambda: 1)
+correct.solution(lambda: 2)
+
+wrong = Puzzle(name='Wrong puzzle')
+wrong.solution(solved(1)(lambda: 2))
+
+failing = Puzzle(name='Failing puzzle')
+failing.solution(_raise_error)
+
+# Its input can only be parsed by the process dispatching it
+parsed = Puzzle(name='Parsed puzzle')
+parsed.parser(_raise_error)
+parsed.solution(parsed.with_parsed_input(sum))
+
+
+app = App()
+app.register_challenge(
+    'test-challenge',
+    InMemoryLoader([correct, wrong, failing, parsed]),
+)
+
+
+def _run(tasks: list[PuzzleTask], jobs: int) -> dict:
+    return {
+        result.task: result
+        for result in run_tasks(__name__, 'test-challenge', tasks, jobs=jobs)
+    }
+
+
+def test_solves_puzzles_in_worker_processes() -> None:
+    tasks = [PuzzleTask(('0',)), PuzzleTask(('1',))]
+
+    results = _run(tasks, jobs=2)
+
+    assert results[tasks[0]].name == 'Correct puzzle'
+    assert [s.solution for s in results[tasks[0]].solutions] == ['1', '2']
+    assert results[tasks[0]].is_failed is False
+    assert results[tasks[1]].is_failed is True
+
+
+def test_solves_single_steps() -> None:
+    task = PuzzleTask(('0',), step=1)
+
+    results = _run([task], jobs=1)
+
+    assert [s.solution for s in results[task].solutions] == ['2']
+
+
+def test_reports_errors() -> None:
+    tasks = [PuzzleTask(('2',)), PuzzleTask(('404',))]
+
+    results = _run(tasks, jobs=2)
+
+    assert 'Raised on purpose.' in results[tasks[0]].error
+    assert results[tasks[0]].name == 'Failing puzzle'
+    assert 'PuzzleNotFound' in results[tasks[1]].error
+    assert results[tasks[1]].name is None
+
+
+async def _collect_async(tasks: list[PuzzleTask]) -> dict:
+    return {
+        result.task: result
+        async for result in run_tasks_async(
+            __name__,
+            'test-challenge',
+            tasks,
+            concurrency=2,
+        )
+    }
+
+
+def test_solves_puzzles_in_event_loop() -> None:
+    tasks = [PuzzleTask(('0',)), PuzzleTask(('1',)), PuzzleTask(('2',))]
+
+    results = asyncio.run(_collect_async(tasks))
+
+    assert [s.solution for s in results[tasks[0]].solutions] == ['1', '2']
+    assert results[tasks[1]].is_failed is True
+    assert 'Raised on purpose.' in results[tasks[2]].error
+
+
+def test_traces_memory_of_steps() -> None:
+    task = PuzzleTask(('0',), step=0)
+
+    result, = run_tasks(
+        __name__,
+        'test-challenge',
+        [task],
+        jobs=2,
+        trace_memory=True,
+    )
+
+    assert result.solutions[0].metrics is not None
+    assert result.solutions[0].metrics.peak_memory is not None
+
+
+def test_uses_shared_parsed_inputs() -> None:
+    task = PuzzleTask(('3',), step=0)
+
+    with SharedInputs() as shared:
+        result, = run_tasks(
+            __name__,
+            'test-challenge',
+            [task],
+            jobs=2,
+            shared_inputs={('3',): shared.share([1, 2, 3])},
+        )
+
+    assert result.error is None
+    assert [s.solution for s in result.solutions] == ['6']
@@ -0,0 +1,86 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, SupportsIndex
+
+import pytest
+
+from saulve.errors import SaulveError
+from saulve.shared import SharedInput, SharedInputs, load_shared
+
+
+class Buffer:
+    """Pickled out-of-band, as NumPy arrays."""
+
+    def __init__(self, data: bytearray | memoryview) -> None:
+        self.data = data
+
+    def __reduce_ex__(self, protocol: SupportsIndex) -> tuple[Any, ...]:
+        return type(self), (pickle.PickleBuffer(self.data),)
+
+
+def _load(handle: SharedInput) -> object:
+    return load_shared(handle)
+
+
+def _load_and_crash(handle: SharedInput) -> None:
+    load_shared(handle)
+    os._exit(1)
+
+
+def _exists(name: str) -> bool:
+    try:
+        SharedMemory(name).close()
+    except FileNotFoundError:
+        return False
+
+    return True
+
+
+def test_shares_values_with_worker_processes() -> None:
+    value = {'numbers': list(range(100)), 'text': 'abc'}
+
+    with SharedInputs() as shared:
+        handle = shared.share(value)
+        with ProcessPoolExecutor(2) as executor:
+            loaded = list(executor.map(_load, [handle] * 2))
+
+    assert loaded == [value, value]
+
+
+def test_buffers_are_read_only_views_of_the_segment() -> None:
+    with SharedInputs() as shared:
+        handle = shared.share(Buffer(bytearray(b'shared data')))
+        loaded = load_shared(handle)
+
+        assert isinstance(loaded, Buffer)
+        assert isinstance(loaded.data, memoryview)
+        assert loaded.data.readonly
+        assert bytes(loaded.data) == b'shared data'
+        assert handle.buffers == ((64, 11),)
+
+
+def test_segments_are_removed_on_exit() -> None:
+    with SharedInputs() as shared:
+        handle = shared.share([1, 2, 3])
+        assert _exists(handle.segment)
+
+    assert not _exists(handle.segment)
+
+
+def test_segments_are_removed_when_workers_crash() -> None:
+    with SharedInputs() as shared:
+        handle = shared.share([1, 2, 3])
+        with ProcessPoolExecutor(1) as executor:
+            with pytest.raises(BrokenProcessPool):
+                executor.submit(_load_and_crash, handle).result()
+
+    assert not _exists(handle.segment)
+
+
+def test_cannot_share_unpicklable_values() -> None:
+    with SharedInputs() as shared:
+        with pytest.raises(SaulveError):
+            shared.share(lambda: 1)
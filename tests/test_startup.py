@@ -0,0 +1,91 @@
+"""Check, with `-X importtime`, that starting the cli does not import
+modules only needed by some commands.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules the cli must not import before running a command
+DEFERRED_MODULES = [
+    'asyncio',
+    'concurrent.futures',
+    'importlib.metadata',
+    'multiprocessing',
+    'saulve.bench',
+    'saulve.challenges.advent_of_code',
+    'saulve.challenges.generic',
+    'saulve.puzzle',
+    'saulve.runner',
+    'saulve.watch',
+]
+
+APP_SOURCE = '''
+from saulve import App
+
+app = App()
+app.register_challenge('lazy', 'lazy_challenge:loader')
+'''
+
+CHALLENGE_SOURCE = '''
+from saulve import Puzzle
+from saulve.challenges.in_memory import InMemoryLoader
+
+puzzle = Puzzle(name='Lazy puzzle')
+puzzle.solution(lambda: 'foo')
+
+loader = InMemoryLoader([puzzle])
+'''
+
+LIST_CHALLENGES = '''
+import contextlib, io, sys
+from saulve.cli import run_command
+
+with contextlib.redirect_stdout(io.StringIO()):
+    assert run_command(['--app', 'lazy_app']) == 0
+print(' '.join(sys.modules))
+'''
+
+
+def _run(args: list[str], cwd: Path) -> subprocess.CompletedProcess:
+    env = dict(os.environ, SAULVE_NO_DAEMON='1')
+    env['PYTHONPATH'] = os.pathsep.join([
+        str(Path(__file__).parent.parent),
+        env.get('PYTHONPATH', ''),
+    ])
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_cli_import_defers_command_dependencies(tmp_path: Path) -> None:
+    result = _run(['-X', 'importtime', '-c', 'import saulve.cli'], tmp_path)
+
+    # Lines are 'import time: self [us] | cumulative | imported package'
+    imported = {
+        line.split('|')[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith('import time:') and line.count('|') == 2
+    }
+
+    assert 'saulve.cli' in imported
+    assert imported.isdisjoint(DEFERRED_MODULES)
+
+
+def test_referenced_challenges_are_not_imported(tmp_path: Path) -> None:
+    (tmp_path / 'lazy_app.py').write_text(APP_SOURCE)
+    (tmp_path / 'lazy_challenge.py').write_text(CHALLENGE_SOURCE)
+
+    # The application is imported with importlib, which -X importtime
+    # does not report
+    result = _run(['-c', LIST_CHALLENGES], tmp_path)
+    imported = set(result.stdout.split())
+
+    assert 'lazy_app' in imported
+    assert 'lazy_challenge' not in imported
+    assert imported.isdisjoint(DEFERRED_MODULES)
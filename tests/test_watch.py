@@ -0,0 +1,144 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from saulve import Puzzle
+from saulve.watch import ModuleWatcher, WatchSession, reload_modules
+
+HELPER_SOURCE = '''
+def double(value):
+    return value * 2
+'''
+
+PUZZLE_SOURCE = '''
+import saulve
+from watched_calls import record
+
+from .helper import double
+
+puzzle = saulve.Puzzle(name='Watched puzzle')
+
+
+@puzzle.parser
+def parse():
+    record('parse')
+    return [1, 2, 3]
+
+
+@puzzle.solution
+@puzzle.with_parsed_input
+def first(numbers):
+    record('first')
+    return sum(numbers)
+
+
+@puzzle.solution
+@puzzle.with_parsed_input
+def second(numbers):
+    record('second')
+    return double(max(numbers))
+'''
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    package_dir = tmp_path / 'watched'
+    package_dir.mkdir()
+    (package_dir / '__init__.py').touch()
+    (package_dir / 'helper.py').write_text(HELPER_SOURCE)
+    (package_dir / 'day_01.py').write_text(PUZZLE_SOURCE)
+
+    lib_dir = tmp_path / 'lib'
+    lib_dir.mkdir()
+    (lib_dir / 'watched_calls.py').write_text(
+        'CALLS = []\n'
+        'def record(call):\n'
+        '    CALLS.append(call)\n'
+    )
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.syspath_prepend(str(lib_dir))
+
+    yield package_dir
+
+    for name in list(sys.modules):
+        if name.split('.')[0] in ('watched', 'watched_calls'):
+            del sys.modules[name]
+
+
+def _modify(path: Path, source: str) -> None:
+    mtime = path.stat().st_mtime_ns
+    path.write_text(source)
+    # Make sure the modification is seen on coarse grained file systems
+    os.utime(path, ns=(mtime + 1_000_000, mtime + 1_000_000))
+
+
+def _load() -> Puzzle:
+    return importlib.import_module('watched.day_01').puzzle
+
+
+def _calls() -> list[str]:
+    return importlib.import_module('watched_calls').CALLS
+
+
+def test_watcher_detects_modified_modules(package: Path) -> None:
+    importlib.import_module('watched.day_01')
+    watcher = ModuleWatcher([package])
+
+    _modify(package / 'helper.py', HELPER_SOURCE + '\n')
+
+    assert watcher.poll() == ['watched.helper']
+    assert watcher.poll() == []
+
+
+def test_reload_modified_modules_and_dependents(package: Path) -> None:
+    importlib.import_module('watched.day_01')
+    watcher = ModuleWatcher([package])
+
+    reloaded = reload_modules(['watched.helper'], watcher.watched_modules())
+
+    assert reloaded == ['watched.helper', 'watched.day_01']
+
+
+def test_only_changed_steps_are_run_again(package: Path) -> None:
+    session = WatchSession(_load, roots=[package])
+    assert [s.solution for s in session.iter_solve()] == ['6', '6']
+
+    _modify(
+        package / 'day_01.py',
+        PUZZLE_SOURCE.replace('double(max(numbers))', 'double(min(numbers))'),
+    )
+    session.wait_and_reload()
+    solutions = list(session.iter_solve())
+
+    assert [s.solution for s in solutions] == ['6', '2']
+    assert [s.from_cache for s in solutions] == [True, False]
+    assert _calls() == ['parse', 'first', 'second', 'second']
+
+
+def test_steps_using_modified_helpers_are_run_again(package: Path) -> None:
+    session = WatchSession(_load, roots=[package])
+    list(session.iter_solve())
+
+    _modify(package / 'helper.py', HELPER_SOURCE.replace('* 2', '* 3'))
+    session.wait_and_reload()
+    solutions = list(session.iter_solve())
+
+    assert [s.solution for s in solutions] == ['6', '9']
+    assert [s.from_cache for s in solutions] == [True, False]
+
+
+def test_input_is_parsed_again_when_parser_changes(package: Path) -> None:
+    session = WatchSession(_load, roots=[package])
+    list(session.iter_solve())
+
+    _modify(package / 'day_01.py', PUZZLE_SOURCE.replace('2, 3', '2, 4'))
+    session.wait_and_reload()
+    solutions = list(session.iter_solve())
+
+    assert [s.solution for s in solutions] == ['7', '8']
+    assert _calls().count('parse') == 2